@@ -1,12 +1,16 @@
 """API routes for AlTi RAG Service."""
 
+import asyncio
+import hashlib
 import logging
 import time
 import uuid
+from functools import partial
 from pathlib import Path
 from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
@@ -15,7 +19,15 @@ from ingestion import IngestionPipeline
 from retrieval import RetrievalEngine
 from retrieval.engine import QueryMode, QueryResult, Source
 from utils.logging import QueryMetrics, get_metrics_logger, log_full_query
-from utils.cache import get_response_cache, get_cache_stats, invalidate_cache
+from utils.cache import (
+    get_cache_stats,
+    get_response_cache,
+    get_search_cache,
+    invalidate_cache,
+    invalidate_collection,
+)
+from utils.metrics import REQUEST_DURATION, get_latency_summary
+from utils.warming import CacheWarmer, WarmQuery
 from utils.resilience import (
     CircuitBreakerOpenError,
     get_circuit_breaker,
@@ -323,6 +335,7 @@ class IngestRequest(BaseModel):
         default=None,
         description="File extensions to include"
     )
+    force: bool = Field(default=False, description="Re-ingest files even if unchanged since the last run")
 
 
 class IngestFileRequest(BaseModel):
@@ -330,6 +343,7 @@ class IngestFileRequest(BaseModel):
 
     file_path: str = Field(..., description="Path to file")
     domain: str = Field(default="investments", description="Domain: investments, estate_planning, etc.")
+    force: bool = Field(default=False, description="Re-ingest the file even if unchanged")
 
 
 class CustomQueryRequest(BaseModel):
@@ -363,6 +377,13 @@ class IngestResponse(BaseModel):
     documents_created: int
     collection_count: int
     errors: List[dict]
+    files_unchanged: int = 0
+    chunks_purged: int = 0
+    files: List[dict] = Field(default_factory=list, description="Per-file status, load time, document count and error")
+    workers: int = 1
+    duration_seconds: Optional[float] = None
+    embeddings_cached: int = 0
+    embeddings_computed: int = 0
 
 
 # =============================================================================
@@ -392,6 +413,66 @@ def get_collection_for_domain(domain: str) -> str:
     return collection
 
 
+def v1_cache_params(
+    endpoint: str,
+    mode: QueryMode,
+    top_k: int,
+    min_similarity: float,
+    custom_prompt: Optional[str] = None,
+) -> dict:
+    """V1 retrieval/synthesis settings that are part of the response cache key."""
+    params = {
+        "endpoint": endpoint,
+        "mode": mode.value,
+        "top_k": top_k,
+        "min_similarity": min_similarity,
+    }
+    if custom_prompt:
+        params["custom_prompt"] = hashlib.sha256(custom_prompt.encode()).hexdigest()[:16]
+    return params
+
+
+def _on_collection_change(collection: str, reason: str = "changed") -> int:
+    """Invalidate a changed collection's retrievers and cached answers, then re-warm its domains."""
+    from graph.nodes.retrieve import invalidate_retrievers
+
+    # Before the cache: answers recomputed after the version bump must see the new chunks
+    invalidate_retrievers(collection)
+    count = invalidate_collection(collection, reason)
+    if settings.cache_enabled and settings.cache_warm_enabled:
+        domains = {d for d, c in settings.domain_collections.items() if c == collection}
+        get_cache_warmer().request(domains)
+    return count
+
+
+def get_collection_fingerprints() -> dict[str, str]:
+    """
+    Ingestion manifest hash and document count per configured collection.
+
+    Stored with cache snapshots, so collections changed while the service
+    was down (e.g. by an offline ingestion run) don't serve old answers.
+    The manifest hash catches re-ingests that keep the same chunk count.
+    """
+    import chromadb
+
+    from ingestion.manifest import IngestionManifest
+
+    fingerprints = {}
+    try:
+        client = chromadb.PersistentClient(path=str(settings.chroma_persist_dir))
+        for collection in sorted(set(settings.domain_collections.values())):
+            try:
+                count = client.get_collection(name=collection).count()
+            except Exception:
+                fingerprints[collection] = "missing"
+                continue
+            manifest = IngestionManifest.for_collection(settings.chroma_persist_dir, collection)
+            fingerprints[collection] = f"{manifest.content_fingerprint()}:{count}"
+    except Exception as e:
+        logger.warning(f"Could not fingerprint collections: {e}")
+    return fingerprints
+
+
 # Domain-keyed engine caches (one engine per domain)
 _retrieval_engines: dict[str, RetrievalEngine] = {}
 _ingestion_pipelines: dict[str, IngestionPipeline] = {}
@@ -459,6 +540,15 @@ def get_ingestion_pipeline(domain: str = "investments") -> IngestionPipeline:
             base_url=base_url,
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap,
+            # Re-ingesting a domain only invalidates (and re-warms) answers from its collection
+            on_change=_on_collection_change,
+            workers=settings.ingest_workers,
+            index_batch_size=settings.ingest_index_batch_size,
+            queue_size=settings.ingest_queue_size,
+            embed_batch_size=settings.embed_batch_size,
+            embed_concurrency=settings.embed_concurrency,
+            embed_max_retries=settings.embed_max_retries,
+            embedding_cache=settings.embedding_cache_enabled,
         )
         logger.info(f"Created ingestion pipeline for domain '{domain}' → collection '{collection_name}'")
 
@@ -504,6 +594,13 @@ async def query_documents(request: QueryRequest):
     Uses RAG to retrieve relevant documents and synthesize an answer.
     Domain determines which collection to search.
     """
+    cache = get_response_cache()
+    params = v1_cache_params("v1_query", request.mode, request.top_k, request.min_similarity)
+    cached = cache.get(query=request.query, domain=request.domain, params=params)
+    if cached:
+        logger.info(f"Cache hit for query: {request.query[:50]}...")
+        return QueryResult(**cached)
+
     try:
         engine = get_retrieval_engine(domain=request.domain)
         result = engine.query(
@@ -512,6 +609,12 @@ async def query_documents(request: QueryRequest):
             top_k=request.top_k,
             min_similarity=request.min_similarity,
         )
+        cache.set(
+            query=request.query,
+            domain=request.domain,
+            response=result.model_dump(),
+            params=params,
+        )
         return result
     except HTTPException:
         raise
@@ -528,12 +631,24 @@ async def search_documents(request: SearchRequest):
     Returns raw document chunks matching the query.
     Domain determines which collection to search.
     """
+    cache = get_search_cache()
+    params = {"endpoint": "search", "top_k": request.top_k}
+    cached = cache.get(query=request.query, domain=request.domain, params=params)
+    if cached:
+        return [Source(**source) for source in cached["sources"]]
+
     try:
         engine = get_retrieval_engine(domain=request.domain)
         sources = engine.search(
             query_text=request.query,
             top_k=request.top_k,
         )
+        cache.set(
+            query=request.query,
+            domain=request.domain,
+            response={"sources": [source.model_dump() for source in sources]},
+            params=params,
+        )
         return sources
     except HTTPException:
         raise
@@ -554,7 +669,25 @@ async def custom_query(request: CustomQueryRequest):
     Domain determines which collection to search.
     When app_context is provided, the query is enhanced with the user's actual
     computed results for specific interpretation rather than generic education.
+
+    Responses are cached (shared with the V2 -> V1 fallback); contextual ones
+    under an app_context fingerprint with a shorter TTL.
     """
+    cache = get_response_cache()
+    params = v1_cache_params(
+        "v1_prompt", request.mode, request.top_k, request.min_similarity, request.custom_prompt,
+    )
+    cached = cache.get(
+        query=request.query,
+        domain=request.domain,
+        prompt_name=request.prompt_name,
+        app_context=request.app_context,
+        params=params,
+    )
+    if cached:
+        logger.info(f"Cache hit for query: {request.query[:50]}...")
+        return QueryResult(**cached)
+
     # Initialize metrics
     metrics = QueryMetrics(
         query_id=str(uuid.uuid4())[:8],
@@ -584,6 +717,9 @@ async def custom_query(request: CustomQueryRequest):
 
         # Collect metrics
         metrics.total_time_ms = (time.perf_counter() - start_time) * 1000
+        REQUEST_DURATION.observe(
+            metrics.total_time_ms / 1000, endpoint="v1_custom", domain=request.domain, intent="none",
+        )
         metrics.documents_retrieved = len(result.sources)
         if result.sources:
             scores = [s.relevance_score for s in result.sources]
@@ -596,6 +732,15 @@ async def custom_query(request: CustomQueryRequest):
         metrics.answer_length = len(result.answer)
         metrics.log()
 
+        cache.set(
+            query=request.query,
+            domain=request.domain,
+            response=result.model_dump(),
+            prompt_name=request.prompt_name,
+            params=params,
+            app_context=request.app_context,
+        )
+
         return result
     except HTTPException:
         raise
@@ -627,6 +772,8 @@ async def ingest_directory(request: IngestRequest):
 
     Processes CSV, Excel, PDF, and JSON files.
     Domain determines which collection to ingest into.
+    Incremental: unchanged files are skipped, changed files replace their
+    chunks and files deleted from the directory are purged.
     """
     try:
         pipeline = get_ingestion_pipeline(domain=request.domain)
@@ -634,6 +781,7 @@ async def ingest_directory(request: IngestRequest):
             directory=Path(request.directory),
             recursive=request.recursive,
             extensions=request.extensions,
+            force=request.force,
         )
         return IngestResponse(**result)
     except HTTPException:
@@ -650,7 +798,7 @@ async def ingest_file(request: IngestFileRequest):
     """Ingest a single file into a domain's collection."""
     try:
         pipeline = get_ingestion_pipeline(domain=request.domain)
-        result = pipeline.ingest_file(Path(request.file_path))
+        result = pipeline.ingest_file(Path(request.file_path), force=request.force)
         return result
     except HTTPException:
         raise
@@ -662,11 +810,13 @@ async def ingest_file(request: IngestFileRequest):
 
 
 @router.post("/ingest/legacy")
-async def ingest_legacy_data():
+async def ingest_legacy_data(
+    force: bool = Query(default=False, description="Re-ingest files even if unchanged"),
+):
     """
     Ingest data from the legacy alti-risk-portfolio-app.
 
-    Processes the /data directory from the Dash application.
+    Processes the /data directory from the Dash application (incrementally).
     """
     try:
         pipeline = get_ingestion_pipeline()
@@ -682,6 +832,7 @@ async def ingest_legacy_data():
             directory=legacy_path,
             recursive=True,
             extensions=[".csv", ".xlsx", ".xls", ".pdf"],
+            force=force,
         )
         return IngestResponse(**result)
     except HTTPException:
@@ -734,6 +885,17 @@ class PrismQueryRequest(BaseModel):
     # V1 context-aware features (for dashboard compatibility)
     prompt_name: Optional[str] = Field(default=None, description="Custom prompt template (e.g., monte_carlo_interpreter_cited)")
     app_context: Optional[dict] = Field(default=None, description="User's computed results for interpretation")
+    profile: Optional[Literal["fast", "balanced", "thorough"]] = Field(
+        default=None,
+        description="Latency profile: fast (local routing/grading, k=5), balanced, thorough (full CRAG). "
+                    "Defaults per domain (settings.domain_profiles)",
+    )
+    timeout_ms: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Latency budget in ms; optional stages are skipped to meet it. "
+                    "Overrides the X-Request-Timeout-Ms header (default: settings.v2_request_timeout_ms)",
+    )
 
 
 class PrismQueryResponse(BaseModel):
@@ -746,6 +908,15 @@ class PrismQueryResponse(BaseModel):
     turn_count: int
     thread_id: str
     query_id: str = Field(description="Unique ID for linking feedback to this query")
+    profile: Optional[str] = Field(default=None, description="Latency profile used")
+    degradations: List[str] = Field(
+        default_factory=list,
+        description="Stages skipped or shortened to meet the deadline (e.g. skip_rerank)",
+    )
+    cache_status: Optional[Literal["fresh", "stale", "computed"]] = Field(
+        default=None,
+        description="fresh/stale: served from cache (stale is being refreshed); computed: run for this request",
+    )
 
 
 class PrismStreamEvent(BaseModel):
@@ -756,6 +927,16 @@ class PrismStreamEvent(BaseModel):
     answer: Optional[str] = None
     sources: Optional[List[dict]] = None
     intent: Optional[str] = None
+    degradations: Optional[List[str]] = None
+
+
+def resolve_timeout_ms(request: PrismQueryRequest, header_timeout_ms: Optional[int]) -> Optional[int]:
+    """Request deadline: body field, then header, then the configured default."""
+    if request.timeout_ms is not None:
+        return request.timeout_ms
+    if header_timeout_ms is not None:
+        return header_timeout_ms
+    return settings.v2_request_timeout_ms or None
 
 
 # LangGraph app singleton
@@ -780,31 +961,182 @@ def get_prism_app():
 
 
 @router.post("/v2/query", response_model=PrismQueryResponse)
-async def prism_query(request: PrismQueryRequest):
+async def prism_query(
+    request: PrismQueryRequest,
+    x_request_timeout_ms: Optional[int] = Header(default=None, ge=0),
+):
     """
     Query using the new LangGraph agentic RAG workflow.
 
     Features:
-    - Response caching (skipped when app_context provided)
+    - Response caching (app_context keyed by a canonical fingerprint, shorter TTL)
+    - Stale-while-revalidate: expired answers are served (cache_status "stale")
+      while one background refresh recomputes them
+    - Single-flight coalescing of identical concurrent queries
     - Circuit breaker with V1 fallback
     - Intent routing (archetype, pipeline, clarity, general)
     - Hybrid retrieval (BM25 + semantic)
     - CRAG document grading
     - Self-RAG hallucination checking
     - Conversation memory (via thread_id)
+    - Deadline propagation (timeout_ms / X-Request-Timeout-Ms) with graceful degradation
     """
-    # Check cache first (skip if app_context is provided - dynamic results)
+    from graph.profiles import resolve_profile
+
+    profile = resolve_profile(request.profile, request.domain)
+    timeout_ms = resolve_timeout_ms(request, x_request_timeout_ms)
+
+    # Check cache first (contextual queries are keyed by an app_context fingerprint)
     cache = get_response_cache()
-    cached = cache.get(
+    cached = cache.lookup(
         query=request.query,
         domain=request.domain,
         prompt_name=request.prompt_name,
         app_context=request.app_context,
+        profile=profile,
     )
 
     if cached:
-        logger.info(f"Cache hit for query: {request.query[:50]}...")
-        return PrismQueryResponse(**cached)
+        response, freshness = cached
+        logger.info(f"Cache {freshness} hit for query: {request.query[:50]}...")
+        if freshness == "stale":
+            # Refresh without the deadline (degraded answers aren't cached) or the
+            # caller's thread, so the refresh doesn't add a turn to their conversation
+            refresh_request = request.model_copy(update={"thread_id": None})
+            cache.refresh(
+                query=request.query,
+                domain=request.domain,
+                compute=partial(_run_prism_query, refresh_request, profile, None, record=False),
+                prompt_name=request.prompt_name,
+                profile=profile,
+                app_context=request.app_context,
+            )
+        return PrismQueryResponse(**{**response, "cache_status": freshness})
+
+    # Conversation turns run on the caller's thread and are never shared
+    if request.thread_id:
+        return await _run_prism_query(request, profile, timeout_ms)
+
+    # Identical concurrent queries share one workflow run, which fills the cache.
+    # The thread_id is assigned up front so waiters can tell the shared response apart.
+    request = request.model_copy(update={"thread_id": str(uuid.uuid4())})
+    started = time.monotonic()
+    response = await cache.coalesce(
+        query=request.query,
+        domain=request.domain,
+        compute=partial(_run_prism_query, request, profile, timeout_ms),
+        prompt_name=request.prompt_name,
+        profile=profile,
+        app_context=request.app_context,
+    )
+    if response.thread_id == request.thread_id:
+        return response  # This request ran the workflow
+    return await _adopt_coalesced_response(request, profile, timeout_ms, response, started)
+
+
+async def _adopt_coalesced_response(
+    request: PrismQueryRequest,
+    profile: str,
+    timeout_ms: Optional[int],
+    shared: PrismQueryResponse,
+    started: float,
+) -> PrismQueryResponse:
+    """
+    A waiter's own response from the run it joined.
+
+    The answer is shared; thread_id and query_id are the waiter's. A degraded
+    or V1 fallback answer may reflect the leader's deadline, not the waiter's
+    (and degraded answers aren't cached for the same reason), so the waiter
+    reruns the query on whatever is left of its own budget. With none left it
+    keeps the shared answer and its degradations. An adopted answer is logged
+    under the waiter's query_id, flagged as coalesced.
+    """
+    if shared.degradations or shared.retrieval_quality == "fallback":
+        remaining_ms = None
+        if timeout_ms:
+            remaining_ms = int(timeout_ms - (time.monotonic() - started) * 1000)
+        if remaining_ms is None or remaining_ms > 0:
+            reason = shared.degradations or "v1 fallback"
+            logger.info(f"Coalesced answer was degraded ({reason}), rerunning for this request")
+            return await _run_prism_query(request, profile, remaining_ms)
+
+    response = shared.model_copy(update={
+        "thread_id": request.thread_id,
+        "query_id": request.thread_id[:8],
+    })
+    # Feedback on the waiter's query_id needs a record to link to
+    _record_v2_query(
+        request, response.model_dump(), response.query_id,
+        (time.monotonic() - started) * 1000, coalesced=True,
+    )
+    return response
+
+
+def _record_v2_query(
+    request: PrismQueryRequest,
+    result: dict,
+    query_id: str,
+    elapsed_ms: float,
+    coalesced: bool = False,
+) -> None:
+    """Record a v2 answer's latency, metrics.jsonl and queries_full.jsonl entries."""
+    query = request.query
+    if request.app_context:
+        query = build_contextual_query(request.query, request.app_context)
+
+    REQUEST_DURATION.observe(
+        elapsed_ms / 1000, endpoint="v2", domain=request.domain, intent=result.get("intent"),
+    )
+
+    # Log v2 query metrics for feedback loop
+    metrics = QueryMetrics(
+        query_id=query_id,
+        query_text=request.query[:200],
+        domain=request.domain,
+        endpoint="v2",
+        total_time_ms=elapsed_ms,
+        documents_retrieved=len(result.get("sources", [])),
+        intent=result.get("intent"),
+        retrieval_quality=result.get("retrieval_quality"),
+        answer_length=len(result.get("answer", "")),
+        top_sources=[
+            {"file": s.get("file_name", "unknown")}
+            for s in result.get("sources", [])[:3]
+        ],
+        coalesced=coalesced,
+    )
+    metrics.log()
+
+    # Log full query/response for detailed audit trail
+    log_full_query(
+        query_id=query_id,
+        query_text=query,  # Full enhanced query (includes context)
+        response_text=result.get("answer", ""),
+        app_context_page=request.app_context.get("page") if request.app_context else None,
+        prompt_name=request.prompt_name,
+        duration_ms=elapsed_ms,
+        coalesced=coalesced,
+    )
+
+
+# Time past the deadline a v2 run gets to return (its outbound calls are
+# already bounded by the deadline) before the request falls back to V1
+DEADLINE_GRACE_MS = 500
+
+
+async def _run_prism_query(
+    request: PrismQueryRequest, profile: str, timeout_ms: Optional[int], record: bool = True
+) -> PrismQueryResponse:
+    """
+    Run a v2 query through the workflow (V1 fallback) and cache the result.
+
+    With a timeout the workflow run is abandoned (and V1 answers) once the
+    deadline plus DEADLINE_GRACE_MS has passed.
+
+    record=False skips latency and query logging (cache warming), so warmed
+    queries don't feed back into the traffic the warmer counts.
+    """
+    cache = get_response_cache()
 
     # Check circuit breaker before attempting V2
     circuit = get_circuit_breaker("v2_langgraph", threshold=5, reset_timeout=60)
@@ -835,7 +1167,9 @@ async def prism_query(request: PrismQueryRequest):
             logger.info(f"[RAG DEBUG] Enhanced query preview (first 500 chars):\n{query[:500]}")
 
         start_time = time.time()
-        result = invoke_prism_sync(
+        # Run off the event loop so concurrent requests (and coalesced waiters) proceed
+        run = run_in_threadpool(
+            invoke_prism_sync,
             query=query,
             thread_id=thread_id,
             archetype=request.archetype,
@@ -843,42 +1177,28 @@ async def prism_query(request: PrismQueryRequest):
             domain=request.domain,
             prompt_name=request.prompt_name,
             app_context=request.app_context,
+            profile=profile,
+            timeout_ms=timeout_ms,
         )
+        if timeout_ms:
+            try:
+                result = await asyncio.wait_for(run, timeout=(timeout_ms + DEADLINE_GRACE_MS) / 1000)
+            except asyncio.TimeoutError:
+                # The worker thread finishes in the background; its result is dropped
+                logger.warning(f"V2 query exceeded its {timeout_ms}ms deadline, falling back to V1")
+                return await _fallback_to_v1(request)
+        else:
+            result = await run
         elapsed_ms = (time.time() - start_time) * 1000
 
         # Record success for circuit breaker
         circuit.record_success()
 
-        # Log v2 query metrics for feedback loop
-        metrics = QueryMetrics(
-            query_id=thread_id[:8],
-            query_text=request.query[:200],
-            domain=request.domain,
-            endpoint="v2",
-            total_time_ms=elapsed_ms,
-            documents_retrieved=len(result.get("sources", [])),
-            intent=result.get("intent"),
-            retrieval_quality=result.get("retrieval_quality"),
-            answer_length=len(result.get("answer", "")),
-            top_sources=[
-                {"file": s.get("file_name", "unknown")}
-                for s in result.get("sources", [])[:3]
-            ],
-        )
-        metrics.log()
-
         # Use thread_id prefix as query_id (matches metrics.jsonl for correlation)
         query_id = thread_id[:8]
 
-        # Log full query/response for detailed audit trail
-        log_full_query(
-            query_id=query_id,
-            query_text=query,  # Full enhanced query (includes context)
-            response_text=result.get("answer", ""),
-            app_context_page=request.app_context.get("page") if request.app_context else None,
-            prompt_name=request.prompt_name,
-            duration_ms=elapsed_ms,
-        )
+        if record:
+            _record_v2_query(request, result, query_id, elapsed_ms)
 
         response = PrismQueryResponse(
             answer=result["answer"],
@@ -888,16 +1208,21 @@ async def prism_query(request: PrismQueryRequest):
             turn_count=result["turn_count"],
             thread_id=thread_id,
             query_id=query_id,
+            profile=profile,
+            degradations=result.get("degradations", []),
+            cache_status="computed",
         )
 
-        # Cache the result (only if no app_context - static queries)
-        if not request.app_context:
+        # Cache the result unless degraded (contextual answers get the shorter context TTL)
+        if not response.degradations:
             cache.set(
                 query=request.query,
                 domain=request.domain,
                 response=response.model_dump(),
                 prompt_name=request.prompt_name,
                 ttl=3600,  # 1 hour for educational content
+                profile=profile,
+                app_context=request.app_context,
             )
 
         return response
@@ -919,22 +1244,94 @@ async def prism_query(request: PrismQueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def warm_prism_query(item: WarmQuery) -> bool:
+    """
+    Precompute a v2 answer into the response cache (CacheWarmer.warm_fn).
+
+    Uses the domain's default profile and no deadline, like an unprofiled
+    request without a timeout. Returns False if the answer was already cached.
+    """
+    from graph.profiles import resolve_profile
+
+    profile = resolve_profile(None, item.domain)
+    cache = get_response_cache()
+    if cache.contains(
+        query=item.query, domain=item.domain, prompt_name=item.prompt_name, profile=profile,
+    ):
+        return False
+
+    request = PrismQueryRequest(query=item.query, domain=item.domain, prompt_name=item.prompt_name)
+    await cache.coalesce(
+        query=request.query,
+        domain=request.domain,
+        compute=partial(_run_prism_query, request, profile, None, record=False),
+        prompt_name=request.prompt_name,
+        profile=profile,
+    )
+    return True
+
+
+_cache_warmer: Optional[CacheWarmer] = None
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get or create the response cache warmer singleton."""
+    global _cache_warmer
+    if _cache_warmer is None:
+        _cache_warmer = CacheWarmer(
+            warm_fn=warm_prism_query,
+            top_n=settings.cache_warm_top_n,
+            concurrency=settings.cache_warm_concurrency,
+            min_count=settings.cache_warm_min_count,
+            lookback_days=settings.cache_warm_lookback_days or None,
+        )
+    return _cache_warmer
+
+
 async def _fallback_to_v1(request: PrismQueryRequest) -> PrismQueryResponse:
-    """Fallback to V1 retrieval engine when V2 is unavailable."""
-    engine = get_retrieval_engine(domain=request.domain)
+    """
+    Fallback to V1 retrieval engine when V2 is unavailable.
 
-    query_text = request.query
-    if request.app_context:
-        query_text = build_contextual_query(request.query, request.app_context)
-
-    result = engine.query_with_prompt(
-        query_text=query_text,
-        prompt_name=request.prompt_name or "standard_qa",
-        mode=QueryMode.COMPACT,
-        top_k=5,
-        min_similarity=0.3,
+    Uses the same cache entries as /query/custom with the same settings, so
+    answers cached by V1 traffic serve the fallback (and vice versa).
+    """
+    prompt_name = request.prompt_name or "standard_qa"
+    cache = get_response_cache()
+    params = v1_cache_params("v1_prompt", QueryMode.COMPACT, 5, 0.3)
+    cached = cache.get(
+        query=request.query,
+        domain=request.domain,
+        prompt_name=prompt_name,
+        app_context=request.app_context,
+        params=params,
     )
 
+    cache_status = "fresh" if cached else "computed"
+    if cached:
+        result = QueryResult(**cached)
+    else:
+        engine = get_retrieval_engine(domain=request.domain)
+
+        query_text = request.query
+        if request.app_context:
+            query_text = build_contextual_query(request.query, request.app_context)
+
+        result = engine.query_with_prompt(
+            query_text=query_text,
+            prompt_name=prompt_name,
+            mode=QueryMode.COMPACT,
+            top_k=5,
+            min_similarity=0.3,
+        )
+        cache.set(
+            query=request.query,
+            domain=request.domain,
+            response=result.model_dump(),
+            prompt_name=prompt_name,
+            params=params,
+            app_context=request.app_context,
+        )
+
     fallback_thread_id = request.thread_id or str(uuid.uuid4())
 
     return PrismQueryResponse(
@@ -945,11 +1342,15 @@ async def _fallback_to_v1(request: PrismQueryRequest) -> PrismQueryResponse:
         turn_count=1,
         thread_id=fallback_thread_id,
         query_id=fallback_thread_id[:8],
+        cache_status=cache_status,
     )
 
 
 @router.post("/v2/query/stream")
-async def prism_query_stream(request: PrismQueryRequest):
+async def prism_query_stream(
+    request: PrismQueryRequest,
+    x_request_timeout_ms: Optional[int] = Header(default=None, ge=0),
+):
     """
     Stream responses from Prism RAG workflow.
 
@@ -989,6 +1390,9 @@ async def prism_query_stream(request: PrismQueryRequest):
                 thread_id=thread_id,
                 archetype=request.archetype,
                 region=request.region,
+                domain=request.domain,
+                profile=request.profile,
+                timeout_ms=resolve_timeout_ms(request, x_request_timeout_ms),
             ):
                 yield f"data: {json.dumps(event)}\n\n"
 
@@ -1024,7 +1428,7 @@ async def prism_health():
             },
         }
 
-    return {
+    response = {
         "status": "healthy",
         "message": "Prism LangGraph workflow active",
         "features": {
@@ -1035,23 +1439,47 @@ async def prism_health():
         },
     }
 
+    checkpointer = getattr(prism_app, "checkpointer", None)
+    if hasattr(checkpointer, "bounds_stats"):
+        response["checkpointer"] = checkpointer.bounds_stats()
+
+    return response
+
 
 # =============================================================================
 # Cache and Circuit Breaker Management Endpoints
 # =============================================================================
 
 
+@router.get("/metrics/latency")
+async def latency_metrics():
+    """Get p50/p95/p99 latency per stage and per request (by domain and intent)."""
+    return get_latency_summary()
+
+
 @router.get("/cache/stats")
 async def cache_stats():
     """Get cache statistics including hit rate."""
-    return get_cache_stats()
+    return {**get_cache_stats(), "warming": get_cache_warmer().stats()}
 
 
 @router.post("/cache/invalidate")
-async def cache_invalidate():
-    """Invalidate all cached responses."""
-    count = invalidate_cache()
-    return {"status": "ok", "entries_cleared": count}
+async def cache_invalidate(
+    domain: Optional[str] = Query(default=None, description="Only invalidate this domain"),
+):
+    """Invalidate cached responses (all, or one domain)."""
+    count = invalidate_cache(domain)
+    return {"status": "ok", "entries_cleared": count, "domain": domain}
+
+
+@router.get("/v2/router/stats")
+async def router_stats():
+    """Get local vs LLM intent routing rates and agreement on shadow traffic."""
+    try:
+        from graph.nodes.route import get_router_stats
+        return get_router_stats()
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"LangGraph not available: {e}")
 
 
 @router.get("/circuit-breaker/status")
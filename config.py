@@ -54,6 +54,18 @@ class Settings(BaseSettings):
     # Larger chunks preserve more context; higher overlap prevents mid-thought cuts
     chunk_size: int = 768  # Increased from 512 for educational content
     chunk_overlap: int = 200  # Increased from 128 for better context continuity
+    # Processes loading files during directory ingestion (1 = serial)
+    ingest_workers: int = 1
+    ingest_index_batch_size: int = 500  # Chunks embedded/upserted per batch
+    ingest_queue_size: int = 4  # Loaded files buffered ahead of indexing
+    # Parsed Excel sheets cached by workbook content hash (skips openpyxl on re-ingest)
+    workbook_cache_enabled: bool = True
+    workbook_cache_dir: str = "./workbook_cache"
+    # Chunk embeddings cached on disk by (model, text hash); misses are batched
+    embedding_cache_enabled: bool = True
+    embed_batch_size: int = 100  # Texts per embedding request
+    embed_concurrency: int = 4  # Embedding requests in flight
+    embed_max_retries: int = 5  # Attempts per request (exponential backoff)
 
     # Data Sources
     data_dir: str = "./data"
@@ -77,6 +89,66 @@ class Settings(BaseSettings):
     cache_enabled: bool = True
     cache_default_ttl: int = 3600  # 1 hour for educational content
     cache_max_size: int = 1000
+    # Memory budget for cached payloads (serialized bytes, 0 = entry count only);
+    # payloads of at least cache_compress_min_bytes are held zlib-compressed (0 = never)
+    cache_max_memory_mb: int = 128
+    cache_compress_min_bytes: int = 4096
+    # "memory": per-process only, "sqlite": in-memory L1 in front of a SQLite (WAL)
+    # L2 shared by all workers on the host
+    cache_backend: str = "memory"
+    cache_sqlite_path: str = "./response_cache.sqlite"
+    cache_shared_max_entries: int = 20000
+    # Cache contextual (app_context) answers under a canonical context fingerprint
+    cache_contextual: bool = True
+    cache_context_ttl: int = 900  # Shorter than cache_default_ttl
+    # Stale-while-revalidate: serve expired v2 answers for this long past the TTL
+    # while one background refresh recomputes them (0 disables)
+    cache_stale_ttl: int = 3600
+    cache_refresh_per_minute: int = 30
+    # Separate cache for V1 /search results (retrieval only, no synthesis)
+    cache_search_ttl: int = 900
+    cache_search_max_size: int = 2000
+    cache_search_max_memory_mb: int = 32
+    # Snapshot the in-memory caches every N seconds and on shutdown; reload on startup
+    cache_snapshot_enabled: bool = True
+    cache_snapshot_interval: int = 300
+    cache_snapshot_path: str = "./response_cache.snapshot"
+    # Precompute the most frequent logged v2 queries at startup and after ingestion
+    cache_warm_enabled: bool = True
+    cache_warm_top_n: int = 50
+    cache_warm_concurrency: int = 2
+    cache_warm_min_count: int = 2  # Only warm queries asked at least this often
+    cache_warm_lookback_days: int = 14
+
+    # Intent Routing
+    # "llm": always call gpt-4o-mini, "local": local classifier only,
+    # "hybrid": local classifier with LLM fallback below the threshold
+    intent_classifier: str = "hybrid"
+    intent_confidence_threshold: float = 0.85
+    intent_shadow_rate: float = 0.05  # Share of local decisions also sent to the LLM
+
+    # Latency profiles (fast, balanced, thorough) when a request doesn't set one.
+    # Per-domain overrides are set per deployment, e.g. {"app_education": "fast"}
+    default_profile: str = "thorough"
+    domain_profiles: dict[str, str] = {}
+
+    # Request deadline (ms) for v2 queries without timeout_ms / X-Request-Timeout-Ms;
+    # optional stages are skipped when the remaining budget gets short (0 = no deadline).
+    # Calls under a deadline aren't retried, so deadlines are opt-in.
+    v2_request_timeout_ms: int = 0
+
+    # Workflow topology: run hybrid retrieval in parallel with intent routing
+    parallel_workflow: bool = False
+
+    # Conversation Checkpointing
+    # "memory": in-process, "sqlite": local file that survives restarts
+    checkpoint_backend: str = "memory"
+    checkpoint_max_threads: int = 500  # LRU eviction past this many conversations
+    checkpoint_idle_ttl: int = 14400  # 4 hours idle before a conversation is evicted
+    checkpoint_max_thread_bytes: int = 2_000_000  # Older checkpoints pruned past this
+    checkpoint_sqlite_path: str = "./checkpoints.sqlite"
+    checkpoint_slim_documents: bool = True  # Store chunk IDs + scores, not document bodies
+    checkpoint_compress_threshold: int = 4096  # zlib-compress payloads above this (bytes)
 
     # Circuit Breaker
     circuit_breaker_threshold: int = 5  # Failures before opening
@@ -95,6 +167,10 @@ class Settings(BaseSettings):
     windows_chroma_dir: str = r"D:\App\rag-service\chroma_db"
     windows_log_dir: str = r"D:\App\rag-service\logs"
     windows_data_dir: str = r"D:\App\rag-service\data"
+    windows_checkpoint_path: str = r"D:\App\rag-service\checkpoints.sqlite"
+    windows_cache_path: str = r"D:\App\rag-service\response_cache.sqlite"
+    windows_cache_snapshot_path: str = r"D:\App\rag-service\response_cache.snapshot"
+    windows_workbook_cache_dir: str = r"D:\App\rag-service\workbook_cache"
 
     class Config:
         env_file = ".env"
@@ -133,6 +209,34 @@ def get_data_dir() -> Path:
     return get_base_dir() / settings.data_dir
 
 
+def get_checkpoint_path() -> Path:
+    """Get SQLite checkpoint database path based on environment."""
+    if settings.environment == "production":
+        return Path(settings.windows_checkpoint_path)
+    return get_base_dir() / settings.checkpoint_sqlite_path
+
+
+def get_cache_path() -> Path:
+    """Get shared response cache database path based on environment."""
+    if settings.environment == "production":
+        return Path(settings.windows_cache_path)
+    return get_base_dir() / settings.cache_sqlite_path
+
+
+def get_cache_snapshot_path() -> Path:
+    """Get response cache snapshot path based on environment."""
+    if settings.environment == "production":
+        return Path(settings.windows_cache_snapshot_path)
+    return get_base_dir() / settings.cache_snapshot_path
+
+
+def get_workbook_cache_dir() -> Path:
+    """Get parsed workbook cache directory based on environment."""
+    if settings.environment == "production":
+        return Path(settings.windows_workbook_cache_dir)
+    return get_base_dir() / settings.workbook_cache_dir
+
+
 def validate_environment() -> list[str]:
     """
     Validate required environment variables and configuration.
@@ -1,6 +1,6 @@
 """LangGraph-based RAG workflow for Prism AI assistant."""
 
 from .state import PrismState
-from .workflow import create_workflow, compile_app
+from .workflow import create_workflow, create_parallel_workflow, compile_app
 
-__all__ = ["PrismState", "create_workflow", "compile_app"]
+__all__ = ["PrismState", "create_workflow", "create_parallel_workflow", "compile_app"]
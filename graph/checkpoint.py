@@ -0,0 +1,671 @@
+"""Bounded conversation checkpointers for the Prism workflow.
+
+MemorySaver keeps every thread's full PrismState forever, including
+retrieved_docs/graded_docs and the growing messages list. These savers
+bound memory over a trading day:
+- max_threads: least-recently-used threads are evicted past this count
+- idle_ttl_seconds: threads idle longer than this are evicted
+- max_thread_bytes: a thread over this size has its older checkpoints
+  pruned (the latest checkpoint is always kept so the conversation continues)
+
+BoundedSqliteSaver stores conversations in a local SQLite file so they
+survive restarts without Postgres (requires langgraph-checkpoint-sqlite).
+
+SlimCheckpointSerializer keeps checkpoints small: retrieved Documents are
+stored as chunk references (Chroma ID, collection and any metadata that
+differs, e.g. rerank scores) and rehydrated from the ChunkStore on load.
+Payloads above a threshold are zlib-compressed. Write time and size are
+tracked per node in CheckpointWriteStats.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from langchain_core.documents import Document
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def _typed_size(value: Any) -> int:
+    """Approximate byte size of serialized checkpoint data."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_typed_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_typed_size(v) for v in value.values())
+    return 0
+
+
+# =============================================================================
+# Chunk references and compression
+# =============================================================================
+
+# Marker key for a Document stored by reference
+CHUNK_REF_KEY = "__chunk__"
+# Stands in for a referenced chunk that no longer exists while rehydrating
+_MISSING_CHUNK = object()
+
+# Appended to the serializer type tag of zlib-compressed payloads
+ZLIB_SUFFIX = "+zlib"
+
+
+class ChunkStore:
+    """
+    Process-wide chunk_id -> (Document, collection) map used to rehydrate
+    checkpointed chunk references.
+
+    Holds references to Documents already kept in memory by the BM25 index,
+    so registering a collection costs no extra copies. Chunks missing after
+    a restart are fetched from Chroma by ID.
+    """
+
+    def __init__(self, max_size: int = 50_000):
+        self.max_size = max_size
+        self._chunks: OrderedDict[str, tuple[Document, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, docs: Iterable[Document], collection_name: str) -> None:
+        """Register Documents that carry a stable (Chroma) ID."""
+        with self._lock:
+            for doc in docs:
+                if doc.id:
+                    self._chunks[doc.id] = (doc, collection_name)
+                    self._chunks.move_to_end(doc.id)
+            while len(self._chunks) > self.max_size:
+                self._chunks.popitem(last=False)
+
+    def unregister_collection(self, collection_name: str) -> int:
+        """Forget a collection's chunks (e.g. after re-ingestion). Returns chunks removed."""
+        with self._lock:
+            stale = [chunk_id for chunk_id, (_, name) in self._chunks.items() if name == collection_name]
+            for chunk_id in stale:
+                del self._chunks[chunk_id]
+        return len(stale)
+
+    def lookup(self, doc: Document) -> Optional[tuple[Document, str]]:
+        """Return the stored (Document, collection) if this exact chunk is registered."""
+        if not doc.id:
+            return None
+        with self._lock:
+            entry = self._chunks.get(doc.id)
+        if entry is None or entry[0].page_content != doc.page_content:
+            return None
+        return entry
+
+    def get_many(self, refs: list[dict]) -> dict[str, Document]:
+        """Resolve chunk references, fetching misses from Chroma."""
+        found = {}
+        missing: dict[str, list[str]] = {}
+        with self._lock:
+            for ref in refs:
+                entry = self._chunks.get(ref[CHUNK_REF_KEY])
+                if entry is not None:
+                    found[ref[CHUNK_REF_KEY]] = entry[0]
+                else:
+                    missing.setdefault(ref["collection"], []).append(ref[CHUNK_REF_KEY])
+
+        for collection_name, ids in missing.items():
+            try:
+                from .nodes.retrieve import get_chroma_retriever
+                vectorstore = get_chroma_retriever(collection_name=collection_name).vectorstore
+                docs = vectorstore.get_by_ids(ids)
+            except Exception as e:
+                logger.warning(f"Failed to rehydrate {len(ids)} chunks from {collection_name}: {e}")
+                continue
+            self.register(docs, collection_name)
+            found.update({doc.id: doc for doc in docs})
+
+        return found
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+
+_chunk_store = ChunkStore()
+
+
+def get_chunk_store() -> ChunkStore:
+    """Get the global chunk store."""
+    return _chunk_store
+
+
+class SlimCheckpointSerializer(SerializerProtocol):
+    """
+    Checkpoint serializer that stores Documents as chunk references and
+    compresses large payloads.
+
+    Documents are only replaced when they are registered in the ChunkStore
+    with identical content; anything else (web results, edited chunks) is
+    serialized inline as before. Set compress_threshold=0 to disable
+    compression, slim_documents=False to keep documents inline.
+    """
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        compress_threshold: int = 4096,
+        chunk_store: Optional[ChunkStore] = None,
+        slim_documents: bool = True,
+    ):
+        self.serde = serde or JsonPlusSerializer()
+        self.compress_threshold = compress_threshold
+        self.slim_documents = slim_documents
+        self.chunk_store = chunk_store or get_chunk_store()
+        self._local = threading.local()
+        self._counts: Counter = Counter()
+
+    def bytes_written(self) -> tuple[int, int]:
+        """Raw and stored bytes serialized so far on this thread."""
+        return getattr(self._local, "raw", 0), getattr(self._local, "stored", 0)
+
+    def stats(self) -> dict:
+        """Get reference and compression counts."""
+        return {
+            "chunks_registered": len(self.chunk_store),
+            "docs_referenced": self._counts["referenced"],
+            "docs_inline": self._counts["inline"],
+            "payloads_compressed": self._counts["compressed"],
+            "docs_missing": self._counts["missing"],
+        }
+
+    def _slim(self, obj: Any) -> Any:
+        if isinstance(obj, Document):
+            entry = self.chunk_store.lookup(obj)
+            if entry is None:
+                self._counts["inline"] += 1
+                return obj
+            self._counts["referenced"] += 1
+            stored, collection_name = entry
+            ref = {CHUNK_REF_KEY: obj.id, "collection": collection_name}
+            # Keep metadata added after retrieval (e.g. rerank relevance_score)
+            delta = {k: v for k, v in obj.metadata.items() if stored.metadata.get(k) != v}
+            if delta:
+                ref["metadata"] = delta
+            return ref
+        if isinstance(obj, list):
+            return [self._slim(v) for v in obj]
+        if isinstance(obj, tuple):
+            return tuple(self._slim(v) for v in obj)
+        if isinstance(obj, dict):
+            return {k: self._slim(v) for k, v in obj.items()}
+        return obj
+
+    def _collect_refs(self, obj: Any, refs: list[dict]) -> None:
+        if isinstance(obj, dict):
+            if CHUNK_REF_KEY in obj:
+                refs.append(obj)
+                return
+            for v in obj.values():
+                self._collect_refs(v, refs)
+        elif isinstance(obj, (list, tuple)):
+            for v in obj:
+                self._collect_refs(v, refs)
+
+    def _rehydrate(self, obj: Any, chunks: dict[str, Document]) -> Any:
+        """
+        Replace chunk references with their Documents.
+
+        A chunk deleted since the checkpoint was written (re-ingestion) can't
+        be restored; it is dropped from its list, or becomes None elsewhere,
+        rather than coming back as an empty document that looks like evidence.
+        """
+        if isinstance(obj, dict):
+            if CHUNK_REF_KEY in obj:
+                chunk_id = obj[CHUNK_REF_KEY]
+                stored = chunks.get(chunk_id)
+                if stored is None:
+                    logger.warning(f"Chunk {chunk_id} no longer in {obj['collection']}, dropped from checkpoint")
+                    self._counts["missing"] += 1
+                    return _MISSING_CHUNK
+                return Document(
+                    page_content=stored.page_content,
+                    metadata={**stored.metadata, **obj.get("metadata", {})},
+                    id=chunk_id,
+                )
+            return {k: self._rehydrate_value(v, chunks) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [doc for doc in (self._rehydrate(v, chunks) for v in obj) if doc is not _MISSING_CHUNK]
+        if isinstance(obj, tuple):
+            return tuple(doc for doc in (self._rehydrate(v, chunks) for v in obj) if doc is not _MISSING_CHUNK)
+        return obj
+
+    def _rehydrate_value(self, obj: Any, chunks: dict[str, Document]) -> Any:
+        value = self._rehydrate(obj, chunks)
+        return None if value is _MISSING_CHUNK else value
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(self._slim(obj) if self.slim_documents else obj)
+        self._local.raw = getattr(self._local, "raw", 0) + len(data)
+
+        if self.compress_threshold and len(data) >= self.compress_threshold:
+            compressed = zlib.compress(data, 1)
+            if len(compressed) < len(data):
+                type_, data = type_ + ZLIB_SUFFIX, compressed
+                self._counts["compressed"] += 1
+
+        self._local.stored = getattr(self._local, "stored", 0) + len(data)
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(ZLIB_SUFFIX):
+            type_, payload = type_[: -len(ZLIB_SUFFIX)], zlib.decompress(payload)
+
+        obj = self.serde.loads_typed((type_, payload))
+        refs: list[dict] = []
+        self._collect_refs(obj, refs)
+        if not refs:
+            return obj
+        return self._rehydrate_value(obj, self.chunk_store.get_many(refs))
+
+
+# Stats key for full-state checkpoints (node outputs are recorded under the node name)
+CHECKPOINT_WRITE_NODE = "__checkpoint__"
+
+
+class CheckpointWriteStats:
+    """Per-node checkpoint write time and size (raw vs stored bytes)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes: dict[str, Counter] = {}
+
+    def record(self, node: str, elapsed_ms: float, raw_bytes: int, stored_bytes: int) -> None:
+        with self._lock:
+            counts = self._nodes.setdefault(node, Counter())
+            counts["writes"] += 1
+            counts["total_ms"] += elapsed_ms
+            counts["max_ms"] = max(counts["max_ms"], elapsed_ms)
+            counts["raw_bytes"] += raw_bytes
+            counts["stored_bytes"] += stored_bytes
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                node: {
+                    "writes": c["writes"],
+                    "avg_ms": round(c["total_ms"] / c["writes"], 3),
+                    "max_ms": round(c["max_ms"], 3),
+                    "avg_bytes": int(c["stored_bytes"] / c["writes"]),
+                    "raw_bytes": c["raw_bytes"],
+                    "stored_bytes": c["stored_bytes"],
+                }
+                for node, c in sorted(self._nodes.items())
+            }
+
+
+class BoundedThreadsMixin:
+    """
+    LRU + idle-TTL bookkeeping shared by the bounded savers.
+
+    Threads are kept in an OrderedDict by last access, so both TTL and LRU
+    eviction pop from the front in O(1) per evicted thread.
+
+    Subclasses implement _thread_bytes() and _prune_thread(), and must
+    provide delete_thread().
+    """
+
+    def _init_bounds(
+        self,
+        max_threads: int,
+        idle_ttl_seconds: int,
+        max_thread_bytes: int,
+    ) -> None:
+        self.max_threads = max_threads
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_thread_bytes = max_thread_bytes
+        self._bounds_lock = threading.RLock()
+        self._last_access: OrderedDict[str, float] = OrderedDict()
+        self._eviction_counts: Counter = Counter()
+        self.write_stats = CheckpointWriteStats()
+
+    def _timed_write(self, node: str, write, *args):
+        """Run a checkpoint write and record its time and size under node."""
+        bytes_written = getattr(self.serde, "bytes_written", None)
+        raw_before, stored_before = bytes_written() if bytes_written else (0, 0)
+        start_time = time.perf_counter()
+
+        result = write(*args)
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        raw_after, stored_after = bytes_written() if bytes_written else (0, 0)
+        self.write_stats.record(node, elapsed_ms, raw_after - raw_before, stored_after - stored_before)
+        return result
+
+    @staticmethod
+    def _writes_node(task_path: str) -> str:
+        """Node name for a put_writes call (task_path is "~__pregel_pull, <node>")."""
+        return task_path.rsplit(", ", 1)[-1] if task_path else "unknown"
+
+    def _touch(self, thread_id: str, at: Optional[float] = None) -> None:
+        """Mark a thread as most recently used."""
+        self._last_access[thread_id] = at if at is not None else time.time()
+        self._last_access.move_to_end(thread_id)
+
+    def _enforce_bounds(self, thread_id: str) -> None:
+        """Apply the per-thread size cap, then TTL and LRU eviction."""
+        if self.max_thread_bytes and self._thread_bytes(thread_id) > self.max_thread_bytes:
+            self._prune_thread(thread_id)
+            self._eviction_counts["pruned"] += 1
+            size = self._thread_bytes(thread_id)
+            if size > self.max_thread_bytes:
+                logger.warning(
+                    f"Thread {thread_id[:8]} latest checkpoint is {size} bytes "
+                    f"(cap {self.max_thread_bytes})"
+                )
+
+        now = time.time()
+        while self._last_access:
+            oldest_id, last_access = next(iter(self._last_access.items()))
+            if oldest_id == thread_id:
+                break
+            if self.idle_ttl_seconds and now - last_access > self.idle_ttl_seconds:
+                reason = "ttl"
+            elif self.max_threads and len(self._last_access) > self.max_threads:
+                reason = "lru"
+            else:
+                break
+            self._last_access.popitem(last=False)
+            self.delete_thread(oldest_id)
+            self._eviction_counts[reason] += 1
+            logger.debug(f"Evicted conversation thread {oldest_id[:8]} ({reason})")
+
+    def _thread_bytes(self, thread_id: str) -> int:
+        raise NotImplementedError
+
+    def _prune_thread(self, thread_id: str) -> None:
+        raise NotImplementedError
+
+    def bounds_stats(self) -> dict:
+        """Get thread counts and eviction statistics."""
+        with self._bounds_lock:
+            return {
+                "backend": type(self).__name__,
+                "threads": len(self._last_access),
+                "max_threads": self.max_threads,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "max_thread_bytes": self.max_thread_bytes,
+                "evicted_ttl": self._eviction_counts["ttl"],
+                "evicted_lru": self._eviction_counts["lru"],
+                "threads_pruned": self._eviction_counts["pruned"],
+                "serializer": self.serde.stats() if hasattr(self.serde, "stats") else None,
+                "writes_by_node": self.write_stats.summary(),
+            }
+
+
+class BoundedMemorySaver(BoundedThreadsMixin, MemorySaver):
+    """In-memory checkpointer with LRU/TTL thread eviction and a per-thread size cap."""
+
+    def __init__(
+        self,
+        max_threads: int = 500,
+        idle_ttl_seconds: int = 4 * 3600,
+        max_thread_bytes: int = 2_000_000,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._init_bounds(max_threads, idle_ttl_seconds, max_thread_bytes)
+        self._sizes: dict[str, int] = {}
+
+    def get_tuple(self, config):
+        with self._bounds_lock:
+            result = super().get_tuple(config)
+            thread_id = config["configurable"]["thread_id"]
+            if result is not None and thread_id in self._last_access:
+                self._touch(thread_id)
+            return result
+
+    def list(self, config, **kwargs):
+        with self._bounds_lock:
+            items = list(super().list(config, **kwargs))
+        yield from items
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._bounds_lock:
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            saved = self._timed_write(
+                CHECKPOINT_WRITE_NODE, super().put, config, checkpoint, metadata, new_versions,
+            )
+
+            added = _typed_size(self.storage[thread_id][checkpoint_ns].get(checkpoint["id"]))
+            blobs = getattr(self, "blobs", {})
+            for channel, version in new_versions.items():
+                added += _typed_size(blobs.get((thread_id, checkpoint_ns, channel, version)))
+            self._sizes[thread_id] = self._sizes.get(thread_id, 0) + added
+
+            self._touch(thread_id)
+            self._enforce_bounds(thread_id)
+            return saved
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        with self._bounds_lock:
+            thread_id = config["configurable"]["thread_id"]
+            self._timed_write(
+                self._writes_node(task_path), super().put_writes, config, writes, task_id, task_path,
+            )
+            outer_key = (
+                thread_id,
+                config["configurable"].get("checkpoint_ns", ""),
+                config["configurable"]["checkpoint_id"],
+            )
+            # Approximate: counts rewritten entries again until the next prune
+            self._sizes[thread_id] = self._sizes.get(thread_id, 0) + _typed_size(
+                self.writes.get(outer_key, {}).get((task_id, 0))
+            )
+            self._touch(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._bounds_lock:
+            super().delete_thread(thread_id)
+            self._sizes.pop(thread_id, None)
+            self._last_access.pop(thread_id, None)
+
+    def _thread_bytes(self, thread_id: str) -> int:
+        return self._sizes.get(thread_id, 0)
+
+    def _measure_thread(self, thread_id: str) -> int:
+        """Exact serialized size of a thread (scans writes and blobs)."""
+        size = _typed_size(self.storage.get(thread_id, {}))
+        size += sum(_typed_size(v) for k, v in self.writes.items() if k[0] == thread_id)
+        size += sum(_typed_size(v) for k, v in getattr(self, "blobs", {}).items() if k[0] == thread_id)
+        return size
+
+    def _prune_thread(self, thread_id: str) -> None:
+        """Drop all but the latest checkpoint per namespace, with their writes and blobs."""
+        blobs = getattr(self, "blobs", None)
+
+        for checkpoint_ns, checkpoints in self.storage.get(thread_id, {}).items():
+            if len(checkpoints) <= 1:
+                continue
+
+            # Checkpoint IDs are time-ordered (uuid6)
+            latest_id = max(checkpoints)
+            for checkpoint_id in [c for c in checkpoints if c != latest_id]:
+                del checkpoints[checkpoint_id]
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+            if blobs is None:
+                continue
+            try:
+                latest = self.serde.loads_typed(checkpoints[latest_id][0])
+                keep = set(latest.get("channel_versions", {}).items())
+            except Exception as e:
+                logger.debug(f"Could not read channel versions, keeping blobs: {e}")
+                continue
+            for key in [
+                k for k in blobs
+                if k[0] == thread_id and k[1] == checkpoint_ns and (k[2], k[3]) not in keep
+            ]:
+                del blobs[key]
+
+        self._sizes[thread_id] = self._measure_thread(thread_id)
+
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    SQLITE_SAVER_AVAILABLE = True
+except ImportError:
+    SqliteSaver = object  # type: ignore[assignment,misc]
+    SQLITE_SAVER_AVAILABLE = False
+
+
+class BoundedSqliteSaver(BoundedThreadsMixin, SqliteSaver):
+    """
+    SQLite-backed checkpointer with the same thread bounds as BoundedMemorySaver.
+
+    Last-access times are stored in a thread_activity side table so TTL/LRU
+    eviction keeps working across restarts. Async methods run the sync
+    implementation in a worker thread, so streaming works too.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        max_threads: int = 500,
+        idle_ttl_seconds: int = 4 * 3600,
+        max_thread_bytes: int = 2_000_000,
+        **kwargs,
+    ):
+        if not SQLITE_SAVER_AVAILABLE:
+            raise ImportError(
+                "langgraph-checkpoint-sqlite required: pip install langgraph-checkpoint-sqlite"
+            )
+        super().__init__(conn, **kwargs)
+        self._init_bounds(max_threads, idle_ttl_seconds, max_thread_bytes)
+
+        with self.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS thread_activity ("
+                "thread_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+            )
+            cur.execute("SELECT thread_id, last_access FROM thread_activity ORDER BY last_access")
+            for thread_id, last_access in cur.fetchall():
+                self._touch(thread_id, at=last_access)
+
+    @classmethod
+    def from_path(cls, path: Path, **kwargs) -> "BoundedSqliteSaver":
+        """Open (or create) a checkpoint database at path."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        return cls(conn, **kwargs)
+
+    def get_tuple(self, config):
+        result = super().get_tuple(config)
+        thread_id = config["configurable"]["thread_id"]
+        if result is not None:
+            with self._bounds_lock:
+                if thread_id in self._last_access:
+                    self._touch(thread_id)
+        return result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        saved = self._timed_write(
+            CHECKPOINT_WRITE_NODE, super().put, config, checkpoint, metadata, new_versions,
+        )
+
+        with self._bounds_lock:
+            self._touch(thread_id)
+            with self.cursor() as cur:
+                cur.execute(
+                    "INSERT OR REPLACE INTO thread_activity (thread_id, last_access) VALUES (?, ?)",
+                    (thread_id, self._last_access[thread_id]),
+                )
+            self._enforce_bounds(thread_id)
+        return saved
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        self._timed_write(
+            self._writes_node(task_path), super().put_writes, config, writes, task_id, task_path,
+        )
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+        with self._bounds_lock:
+            self._last_access.pop(str(thread_id), None)
+
+    def _thread_bytes(self, thread_id: str) -> int:
+        with self.cursor(transaction=False) as cur:
+            cur.execute(
+                "SELECT "
+                "(SELECT COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints WHERE thread_id = ?) + "
+                "(SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?)",
+                (thread_id, thread_id),
+            )
+            return cur.fetchone()[0]
+
+    def _prune_thread(self, thread_id: str) -> None:
+        """Drop all but the latest checkpoint per namespace, with their writes."""
+        latest = (
+            "SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? GROUP BY checkpoint_ns"
+        )
+        with self.cursor() as cur:
+            cur.execute(
+                f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN ({latest})",
+                (thread_id, thread_id),
+            )
+            cur.execute(
+                f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN ({latest})",
+                (thread_id, thread_id),
+            )
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, **kwargs):
+        items = await asyncio.to_thread(lambda: list(self.list(config, **kwargs)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def create_checkpointer():
+    """
+    Create the conversation checkpointer configured in settings.
+
+    checkpoint_backend "sqlite" falls back to memory if
+    langgraph-checkpoint-sqlite isn't installed.
+    """
+    from config import settings, get_checkpoint_path
+
+    bounds = {
+        "max_threads": settings.checkpoint_max_threads,
+        "idle_ttl_seconds": settings.checkpoint_idle_ttl,
+        "max_thread_bytes": settings.checkpoint_max_thread_bytes,
+    }
+    # Also used with slimming off, so writes_by_node still reports sizes
+    bounds["serde"] = SlimCheckpointSerializer(
+        compress_threshold=settings.checkpoint_compress_threshold,
+        slim_documents=settings.checkpoint_slim_documents,
+    )
+
+    if settings.checkpoint_backend == "sqlite":
+        if SQLITE_SAVER_AVAILABLE:
+            path = get_checkpoint_path()
+            logger.info(f"Using SQLite checkpointer at {path}")
+            return BoundedSqliteSaver.from_path(path, **bounds)
+        logger.warning("langgraph-checkpoint-sqlite not installed, using in-memory checkpointer")
+
+    return BoundedMemorySaver(**bounds)
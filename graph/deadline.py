@@ -0,0 +1,147 @@
+"""Request deadlines and graceful degradation for the Prism workflow.
+
+A v2 request carries an absolute deadline (epoch seconds) in PrismState.
+Before each optional LLM stage, nodes check whether the remaining budget
+covers the stage plus a reserve for generation; if not they take the
+cheaper path and record a degradation:
+
+- local_routing: local intent classifier instead of the LLM router
+- skip_expansion: raw query used for retrieval
+- local_grading: term-coverage grading instead of LLM grading
+- skip_rerank: sort by grade score instead of Cohere
+- short_context: fewer, shorter documents in the generation prompt
+
+Outbound LLM, embedding and rerank calls get per-call timeouts from the
+remaining budget and are not retried, so no call outlives the deadline.
+Calls made below a node without access to state (query embeddings inside
+the vector store) read the deadline from deadline_scope().
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Typical gpt-4o-mini / Cohere latencies (ms) used to decide whether a stage fits
+STAGE_COST_MS = {
+    "routing": 1500,
+    "expansion": 1200,
+    "grading": 2500,
+    "rerank": 800,
+}
+
+# Budget kept back for generation when deciding on optional stages
+GENERATION_RESERVE_MS = 4000
+
+# Below this much remaining budget generation uses the short context
+SHORT_CONTEXT_MS = 6000
+
+# Per-call timeout bounds (seconds). Calls get at least the minimum when that
+# much budget is left (eating into the reserve), never more than remains.
+MIN_CALL_TIMEOUT = 2.0
+MAX_CALL_TIMEOUT = 30.0
+
+# Timeout once the deadline has passed, so late calls fail fast
+EXPIRED_CALL_TIMEOUT = 0.1
+
+# Deadline of the request being served by the current thread / task
+_scoped_deadline: ContextVar[Optional[float]] = ContextVar("scoped_deadline", default=None)
+
+
+def make_deadline(timeout_ms: Optional[int]) -> Optional[float]:
+    """Absolute deadline (epoch seconds) for a budget in milliseconds."""
+    if not timeout_ms or timeout_ms <= 0:
+        return None
+    return time.time() + timeout_ms / 1000
+
+
+def remaining_ms(state) -> Optional[float]:
+    """Milliseconds left before the request deadline, or None without one."""
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+    return (deadline - time.time()) * 1000
+
+
+def has_budget(state, stage: str) -> bool:
+    """Check whether an optional stage fits in the remaining budget."""
+    remaining = remaining_ms(state)
+    if remaining is None:
+        return True
+    return remaining >= STAGE_COST_MS[stage] + GENERATION_RESERVE_MS
+
+
+def call_timeout(state, reserve_ms: float = 0) -> Optional[float]:
+    """
+    Timeout (seconds) for an outbound call from the remaining budget.
+
+    reserve_ms is held back for later stages (e.g. generation) unless that
+    leaves less than MIN_CALL_TIMEOUT. The timeout never exceeds the time
+    left before the deadline.
+    Returns None when the request has no deadline.
+    """
+    remaining = remaining_ms(state)
+    if remaining is None:
+        return None
+    seconds = (remaining - reserve_ms) / 1000
+    if seconds < MIN_CALL_TIMEOUT:
+        seconds = min(MIN_CALL_TIMEOUT, remaining / 1000)
+    return max(EXPIRED_CALL_TIMEOUT, min(MAX_CALL_TIMEOUT, seconds))
+
+
+def call_options(state, reserve_ms: float = 0) -> dict:
+    """
+    Client options bounding an outbound call by the request deadline.
+
+    With a deadline: {"timeout": call_timeout(...), "max_retries": 0}, since
+    a retried call could take several times its timeout. Without one: {}
+    (client defaults).
+    """
+    timeout = call_timeout(state, reserve_ms)
+    if timeout is None:
+        return {}
+    return {"timeout": timeout, "max_retries": 0}
+
+
+@contextmanager
+def deadline_scope(state):
+    """Make the request deadline visible to scoped_call_options() in this context."""
+    token = _scoped_deadline.set(state.get("deadline"))
+    try:
+        yield
+    finally:
+        _scoped_deadline.reset(token)
+
+
+def scoped_call_options() -> dict:
+    """call_options() for the request of the enclosing deadline_scope()."""
+    return call_options({"deadline": _scoped_deadline.get()})
+
+
+def merge_degradations(left: Optional[list[str]], right: Optional[list[str]]) -> list[str]:
+    """
+    PrismState reducer for degradations.
+
+    None resets the list (each turn's input starts with None); otherwise
+    entries are unioned in order, so nodes that return the full state and
+    parallel branches that each add an entry both merge cleanly.
+    """
+    if right is None:
+        return []
+    merged = list(left or [])
+    merged.extend(d for d in right if d not in merged)
+    return merged
+
+
+def degrade(state, degradation: str) -> None:
+    """Record a degradation in state."""
+    current = state.get("degradations") or []
+    if degradation not in current:
+        state["degradations"] = current + [degradation]
+        logger.info(
+            f"Degraded: {degradation} "
+            f"({remaining_ms(state) or 0:.0f}ms left)"
+        )
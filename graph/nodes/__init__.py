@@ -1,7 +1,12 @@
 """LangGraph nodes for Prism RAG workflow."""
 
-from .route import route_intent, should_retrieve, get_retrieval_strategy
-from .retrieve import retrieve_documents, get_hybrid_retriever
+from .route import route_intent, should_retrieve, get_retrieval_strategy, get_router_stats
+from .retrieve import (
+    retrieve_documents,
+    retrieve_candidates,
+    apply_intent_filter,
+    get_hybrid_retriever,
+)
 from .grade import (
     grade_documents,
     grade_documents_async,
@@ -10,12 +15,16 @@ from .grade import (
     get_relevant_docs,
 )
 from .generate import generate_response, check_hallucination, respond_directly
+from .verify import verify_grounding
 
 __all__ = [
     "route_intent",
     "should_retrieve",
     "get_retrieval_strategy",
+    "get_router_stats",
     "retrieve_documents",
+    "retrieve_candidates",
+    "apply_intent_filter",
     "get_hybrid_retriever",
     "grade_documents",
     "grade_documents_async",
@@ -25,4 +34,5 @@ __all__ = [
     "generate_response",
     "check_hallucination",
     "respond_directly",
+    "verify_grounding",
 ]
@@ -0,0 +1,335 @@
+"""Local intent classifier for Prism RAG routing.
+
+Replaces the per-query gpt-4o-mini router call for confident cases:
+- A compiled keyword/alias matcher detects archetype, region and strong
+  intent keywords (e.g. "pipeline", "carbon intensity")
+- A multinomial Naive Bayes model over word unigrams/bigrams scores intents
+
+Naive Bayes is overconfident on short queries (a CMA question with no model
+keywords can score 0.9+ for "archetype"), so a prediction is only trusted
+when the keywords agree with it: the intent with the most keyword hits, or
+"general" when no keyword fires. Otherwise confidence is capped below any
+sensible routing threshold and the LLM decides.
+
+Training data comes from built-in seed examples, labeled eval queries
+(eval/queries.yaml) and LLM-labeled traffic logged to logs/intent_routing.jsonl.
+Classification is pure Python and runs in microseconds.
+"""
+
+import json
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Literal, Optional
+
+from ..state import ARCHETYPE_ALIASES, normalize_archetype
+
+logger = logging.getLogger(__name__)
+
+Intent = Literal["archetype", "pipeline", "clarity", "general"]
+INTENTS: tuple[str, ...] = ("archetype", "pipeline", "clarity", "general")
+
+# Log-odds added to an intent's score per keyword hit
+KEYWORD_BOOST = 2.5
+
+# Confidence cap for predictions the keywords don't corroborate
+UNCORROBORATED_MAX_CONFIDENCE = 0.5
+
+# Seed examples (mirrors the intent descriptions in ROUTE_PROMPT)
+SEED_EXAMPLES: list[tuple[str, str]] = [
+    ("What's in IBI?", "archetype"),
+    ("Show me Climate funds", "archetype"),
+    ("What are the fund allocations in Impact 100%?", "archetype"),
+    ("Which funds are in the Inclusive Innovation model?", "archetype"),
+    ("How much is allocated to private equity in Integrated Best Ideas at growth risk?", "archetype"),
+    ("Fund performance for the Climate Sustainability model", "archetype"),
+    ("What are the holdings of the balanced model portfolio?", "archetype"),
+    ("Compare the international and US versions of the IBI model", "archetype"),
+    ("What's in the pipeline?", "pipeline"),
+    ("New opportunities coming up this year", "pipeline"),
+    ("What are the 2025 strategies?", "pipeline"),
+    ("What is the minimum contribution for the new fund?", "pipeline"),
+    ("When is the target close for upcoming investments?", "pipeline"),
+    ("Are there any new fund launches?", "pipeline"),
+    ("Which pipeline investments are closing soon?", "pipeline"),
+    ("What is carbon intensity?", "clarity"),
+    ("How is ESG scored?", "clarity"),
+    ("How are financed emissions calculated?", "clarity"),
+    ("What does Clarity AI measure?", "clarity"),
+    ("Explain the SFDR principal adverse impact indicators", "clarity"),
+    ("What is the difference between scope 1 and scope 2 emissions?", "clarity"),
+    ("How does Clarity AI calculate the board gender diversity metric?", "clarity"),
+    ("Hello", "general"),
+    ("Thanks for the help", "general"),
+    ("What can you do?", "general"),
+    ("What does the 5th percentile mean in my Monte Carlo simulation?", "general"),
+    ("What is tracking error and why does it matter?", "general"),
+    ("How do I read the efficient frontier chart?", "general"),
+    ("Explain my results", "general"),
+]
+
+# Strong lexical signals per intent (matched case-insensitively on word boundaries)
+INTENT_KEYWORDS: dict[str, list[str]] = {
+    "archetype": [
+        "archetype", "model portfolio", "allocation", "allocations", "holdings",
+        "integrated best ideas", "ibi", "impact 100", "climate sustainability",
+        "inclusive innovation",
+    ],
+    "pipeline": [
+        "pipeline", "upcoming", "new opportunity", "new opportunities", "target close",
+        "first close", "minimum contribution", "fund launch", "new strategies",
+    ],
+    "clarity": [
+        "clarity ai", "clarity", "esg", "carbon intensity", "financed emissions",
+        "scope 1", "scope 2", "scope 3", "sfdr", "sdg",
+    ],
+    "general": [],
+}
+
+# Eval tags that imply an intent when a query has no explicit "intent" field
+EVAL_TAG_INTENTS = {
+    "archetype": "archetype",
+    "pipeline": "pipeline",
+    "clarity_ai": "clarity",
+    "general": "general",
+    "monte_carlo": "general",
+    "risk_analytics": "general",
+    "portfolio_eval": "general",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9%]+")
+
+
+def _compile_terms(terms: Iterable[str]) -> Optional[re.Pattern]:
+    """Compile terms into one alternation, longest first so phrases win."""
+    terms = sorted({t.lower() for t in terms}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")(?!\w)", re.IGNORECASE)
+
+
+_KEYWORD_PATTERNS = {intent: _compile_terms(words) for intent, words in INTENT_KEYWORDS.items()}
+
+_ARCHETYPE_PATTERN = _compile_terms(
+    list(ARCHETYPE_ALIASES.keys()) + list(set(ARCHETYPE_ALIASES.values()))
+)
+
+_REGION_INT_PATTERN = re.compile(
+    r"\b(international|intl|int'l|non-us|ex-us)\b", re.IGNORECASE
+)
+# "US" is matched case-sensitively so "tell us" doesn't count
+_REGION_US_PATTERN = re.compile(r"\b(?:US|USA|U\.S\.)(?!\w)|(?i:\b(?:united states|domestic)\b)")
+
+
+def _features(text: str) -> list[str]:
+    """Unigram + bigram bag-of-words features."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+
+@dataclass
+class LocalIntent:
+    """Result of local intent classification."""
+
+    intent: str
+    confidence: float
+    detected_archetype: Optional[str] = None
+    detected_region: Optional[Literal["US", "INT"]] = None
+    keyword_hits: int = 0
+
+
+def match_archetype(query: str) -> Optional[str]:
+    """Detect an archetype alias in the query and normalize it."""
+    match = _ARCHETYPE_PATTERN.search(query) if _ARCHETYPE_PATTERN else None
+    if not match:
+        return None
+    return normalize_archetype(match.group(1))
+
+
+def match_keywords(query: str) -> dict[str, int]:
+    """Count INTENT_KEYWORDS hits per intent."""
+    hits = {}
+    for intent in INTENTS:
+        pattern = _KEYWORD_PATTERNS.get(intent)
+        hits[intent] = len(pattern.findall(query)) if pattern else 0
+    return hits
+
+
+def keyword_intent(keyword_hits: dict[str, int]) -> Optional[str]:
+    """
+    The intent the keywords point to.
+
+    The intent with the most hits, "general" when none fire, or None when
+    intents tie for the most hits.
+    """
+    most = max(keyword_hits.values(), default=0)
+    if most == 0:
+        return "general"
+    leaders = [intent for intent, hits in keyword_hits.items() if hits == most]
+    return leaders[0] if len(leaders) == 1 else None
+
+
+def match_region(query: str) -> Optional[Literal["US", "INT"]]:
+    """Detect an explicit region mention in the query."""
+    if _REGION_INT_PATTERN.search(query):
+        return "INT"
+    if _REGION_US_PATTERN.search(query):
+        return "US"
+    return None
+
+
+class IntentClassifier:
+    """
+    Multinomial Naive Bayes intent classifier with keyword boosting.
+
+    Usage:
+        classifier = IntentClassifier().fit(load_training_examples())
+        result = classifier.classify("What's in IBI?")
+    """
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self._log_prior: dict[str, float] = {}
+        self._log_likelihood: dict[str, dict[str, float]] = {}
+        self._log_unseen: dict[str, float] = {}
+        self.num_examples = 0
+
+    def fit(self, examples: Iterable[tuple[str, str]]) -> "IntentClassifier":
+        """Train from (query, intent) pairs."""
+        class_counts: Counter = Counter()
+        feature_counts: dict[str, Counter] = {intent: Counter() for intent in INTENTS}
+
+        for query, intent in examples:
+            if intent not in feature_counts:
+                continue
+            class_counts[intent] += 1
+            feature_counts[intent].update(_features(query))
+
+        self.num_examples = sum(class_counts.values())
+        vocabulary = set()
+        for counts in feature_counts.values():
+            vocabulary.update(counts)
+        vocab_size = max(len(vocabulary), 1)
+
+        for intent in INTENTS:
+            # Laplace smoothing on priors too, so unseen intents stay possible
+            self._log_prior[intent] = math.log(
+                (class_counts[intent] + 1) / (self.num_examples + len(INTENTS))
+            )
+            total = sum(feature_counts[intent].values())
+            denominator = total + self.alpha * vocab_size
+            self._log_likelihood[intent] = {
+                feature: math.log((count + self.alpha) / denominator)
+                for feature, count in feature_counts[intent].items()
+            }
+            self._log_unseen[intent] = math.log(self.alpha / denominator)
+
+        return self
+
+    def predict_proba(self, query: str) -> tuple[dict[str, float], dict[str, int]]:
+        """Return intent probabilities and the keyword hits per intent."""
+        features = _features(query)
+        scores = {}
+        keyword_hits = match_keywords(query)
+
+        for intent in INTENTS:
+            likelihood = self._log_likelihood.get(intent, {})
+            unseen = self._log_unseen.get(intent, 0.0)
+            score = self._log_prior.get(intent, 0.0)
+            score += sum(likelihood.get(f, unseen) for f in features)
+            score += KEYWORD_BOOST * keyword_hits[intent]
+            scores[intent] = score
+
+        # Softmax over log scores
+        max_score = max(scores.values())
+        exp_scores = {i: math.exp(s - max_score) for i, s in scores.items()}
+        total = sum(exp_scores.values())
+        return {i: v / total for i, v in exp_scores.items()}, keyword_hits
+
+    def classify(self, query: str) -> LocalIntent:
+        """Classify intent and detect archetype/region."""
+        probabilities, keyword_hits = self.predict_proba(query)
+        intent = max(probabilities, key=probabilities.get)
+
+        confidence = probabilities[intent]
+        if intent != keyword_intent(keyword_hits):
+            confidence = min(confidence, UNCORROBORATED_MAX_CONFIDENCE)
+
+        return LocalIntent(
+            intent=intent,
+            confidence=confidence,
+            detected_archetype=match_archetype(query),
+            detected_region=match_region(query),
+            keyword_hits=sum(keyword_hits.values()),
+        )
+
+
+def load_training_examples(
+    eval_queries_path: Optional[Path] = None,
+    routing_log_path: Optional[Path] = None,
+) -> list[tuple[str, str]]:
+    """
+    Collect (query, intent) training pairs.
+
+    Sources:
+    - SEED_EXAMPLES
+    - eval/queries.yaml: explicit "intent" field, else EVAL_TAG_INTENTS
+    - logs/intent_routing.jsonl: LLM-labeled traffic (fallback and shadow calls)
+    """
+    examples = list(SEED_EXAMPLES)
+
+    if eval_queries_path is None:
+        eval_queries_path = Path(__file__).parent.parent.parent / "eval" / "queries.yaml"
+    if routing_log_path is None:
+        from config import get_log_dir
+        routing_log_path = get_log_dir() / "intent_routing.jsonl"
+
+    if eval_queries_path.exists():
+        try:
+            import yaml
+            with open(eval_queries_path) as f:
+                data = yaml.safe_load(f) or {}
+            for item in data.get("queries", []):
+                intent = item.get("intent") or next(
+                    (EVAL_TAG_INTENTS[t] for t in item.get("tags", []) if t in EVAL_TAG_INTENTS),
+                    None,
+                )
+                if intent:
+                    examples.append((item["query"], intent))
+        except Exception as e:
+            logger.warning(f"Failed to load eval queries for intent training: {e}")
+
+    if routing_log_path.exists():
+        with open(routing_log_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("llm_intent") in INTENTS and record.get("query"):
+                    examples.append((record["query"], record["llm_intent"]))
+
+    return examples
+
+
+# Singleton classifier, trained lazily on first use
+_classifier: Optional[IntentClassifier] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Get or train the global intent classifier."""
+    global _classifier
+    if _classifier is None:
+        examples = load_training_examples()
+        _classifier = IntentClassifier().fit(examples)
+        logger.info(f"Trained local intent classifier on {len(examples)} examples")
+    return _classifier
+
+
+def reset_intent_classifier() -> None:
+    """Drop the trained classifier so the next call retrains from logs."""
+    global _classifier
+    _classifier = None
@@ -10,8 +10,13 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from utils.metrics import get_llm_callbacks
+
+from ..deadline import SHORT_CONTEXT_MS, call_options, degrade, remaining_ms
+from ..profiles import get_profile
 from ..state import PrismState
 from .grade import get_relevant_docs
+from .verify import collect_entity_names, verify_grounding
 
 logger = logging.getLogger(__name__)
 
@@ -166,7 +171,12 @@ def get_prompt_for_intent(intent: str) -> ChatPromptTemplate:
     return prompts.get(intent, GENERAL_PROMPT)
 
 
-def format_context(docs: list) -> str:
+# Characters of each document in the generation prompt (normal / short context)
+CONTEXT_MAX_CHARS = 1500
+SHORT_CONTEXT_MAX_CHARS = 800
+
+
+def format_context(docs: list, max_chars: int = CONTEXT_MAX_CHARS) -> str:
     """Format retrieved documents as context string."""
     if not docs:
         return "No relevant documents found."
@@ -175,7 +185,7 @@ def format_context(docs: list) -> str:
     for i, doc in enumerate(docs, 1):
         source = doc.metadata.get("file_name", "Unknown")
         doc_type = doc.metadata.get("document_type", "document")
-        content = doc.page_content[:1500]  # Truncate long docs
+        content = doc.page_content[:max_chars]  # Truncate long docs
 
         context_parts.append(f"[Source {i}: {source} ({doc_type})]\n{content}")
 
@@ -199,9 +209,18 @@ def generate_response(state: PrismState) -> PrismState:
     if not relevant_docs:
         # Fall back to all retrieved docs if grading filtered everything
         relevant_docs = state.get("retrieved_docs", [])
-
-    # Format context
-    context = format_context(relevant_docs)
+    relevant_docs = relevant_docs[:get_profile(state).context_docs]
+
+    # Format context (fewer, shorter docs when the deadline is close)
+    max_chars = CONTEXT_MAX_CHARS
+    remaining = remaining_ms(state)
+    if remaining is not None and remaining < SHORT_CONTEXT_MS:
+        relevant_docs = relevant_docs[:3]
+        max_chars = SHORT_CONTEXT_MAX_CHARS
+        degrade(state, "short_context")
+    context = format_context(relevant_docs, max_chars=max_chars)
+    state["context_docs"] = relevant_docs
+    state["context_max_chars"] = max_chars
 
     # Get appropriate prompt - prefer custom prompt_name if provided
     prompt = None
@@ -217,7 +236,9 @@ def generate_response(state: PrismState) -> PrismState:
         logger.info(f"Using intent-based prompt for: {intent}")
 
     # Generate response
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+    llm = ChatOpenAI(
+        model="gpt-4o-mini", temperature=0.1, callbacks=get_llm_callbacks(), **call_options(state),
+    )
     chain = prompt | llm
 
     try:
@@ -297,15 +318,35 @@ Is this response grounded in the context?""")
 
 def check_hallucination(state: PrismState) -> PrismState:
     """
-    Self-RAG: Check if response is grounded in retrieved context.
+    Self-RAG: Check if response is grounded in the context it was generated from.
 
     This is a Self-RAG reflection step to detect hallucinations.
+    Numeric claims and fund names are verified locally first; the LLM
+    fact-check only runs when the local verifier can't decide.
     """
     generation = state.get("generation", "")
-    relevant_docs = get_relevant_docs(state)
-    context = format_context(relevant_docs)
+    # Exactly what generation saw: dropped or truncated docs aren't evidence
+    context_docs = state.get("context_docs", [])
+    context = format_context(context_docs, max_chars=state.get("context_max_chars") or CONTEXT_MAX_CHARS)
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    # Only the retrieved context counts: numbers echoed from the query aren't evidence
+    local = verify_grounding(
+        generation, context, known_names=collect_entity_names(context_docs),
+    )
+    if local.verdict is not None:
+        logger.info(
+            f"Local grounding check: {local.verdict} "
+            f"({len(local.matched)}/{local.claim_count} claims matched in {local.elapsed_ms:.1f}ms)"
+        )
+        state["hallucination_check"] = local.verdict
+        if local.verdict == "not_grounded":
+            logger.warning(f"Hallucination detected (local): {local.unmatched}")
+            state["generation"] += "\n\n*Note: Some information in this response may need verification.*"
+        return state
+
+    llm = ChatOpenAI(
+        model="gpt-4o-mini", temperature=0, callbacks=get_llm_callbacks(), **call_options(state),
+    )
     structured_llm = llm.with_structured_output(HallucinationCheck)
     chain = HALLUCINATION_PROMPT | structured_llm
 
@@ -337,7 +378,9 @@ def respond_directly(state: PrismState) -> PrismState:
     """
     query = state.get("query", "")
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+    llm = ChatOpenAI(
+        model="gpt-4o-mini", temperature=0.3, callbacks=get_llm_callbacks(), **call_options(state),
+    )
 
     response = llm.invoke(
         f"""You are Prism, AlTi's Impact investment research assistant.
@@ -2,7 +2,9 @@
 
 import asyncio
 import logging
+import re
 import time
+from copy import deepcopy
 from typing import Literal, Optional, Tuple
 
 from langchain_core.documents import Document
@@ -10,6 +12,11 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from utils.cache import get_single_flight, make_call_key
+from utils.metrics import get_llm_callbacks
+
+from ..deadline import GENERATION_RESERVE_MS, call_options, degrade, has_budget
+from ..profiles import get_profile
 from ..state import PrismState, GradedDocument
 
 logger = logging.getLogger(__name__)
@@ -62,6 +69,42 @@ Is this document relevant to the query?""")
 ])
 
 
+# Coalesces identical concurrent LLM grading calls across requests
+_grading_flight = get_single_flight("grading")
+
+# Share of query terms a document must contain to be graded relevant locally
+LOCAL_RELEVANCE_THRESHOLD = 0.3
+
+_TERM_PATTERN = re.compile(r"[a-z0-9%]+")
+
+_STOPWORDS = {
+    "the", "and", "for", "are", "what", "which", "how", "does", "with", "this",
+    "that", "from", "about", "into", "our", "my", "your", "is", "in", "of", "to",
+    "a", "an", "on", "me", "show", "tell", "explain", "can", "you", "do",
+}
+
+
+def grade_document_locally(doc: Document, query_terms: set[str]) -> GradedDocument:
+    """
+    Grade a document by query-term coverage, without an LLM call.
+
+    Used by the fast profile and for docs beyond a profile's LLM grade depth.
+    The score is the share of query terms found in the document.
+    """
+    if not query_terms:
+        return GradedDocument(document=doc, relevance="relevant", score=0.5)
+
+    doc_terms = set(_TERM_PATTERN.findall(doc.page_content.lower()))
+    score = len(query_terms & doc_terms) / len(query_terms)
+    relevance = "relevant" if score >= LOCAL_RELEVANCE_THRESHOLD else "not_relevant"
+    return GradedDocument(document=doc, relevance=relevance, score=round(score, 3))
+
+
+def query_terms_for_grading(query: str) -> set[str]:
+    """Content terms of a query for local grading."""
+    return {t for t in _TERM_PATTERN.findall(query.lower()) if t not in _STOPWORDS and len(t) > 1}
+
+
 async def _grade_single_document(
     chain,
     doc: Document,
@@ -73,18 +116,24 @@ async def _grade_single_document(
     """
     Grade a single document asynchronously.
 
+    Identical gradings already in flight (same query, document and context,
+    e.g. from concurrent duplicate requests) are awaited instead of re-run.
+
     Returns tuple of (original_doc, graded_result) for ordering preservation.
     """
+    inputs = {
+        "query": query,
+        "document": doc.page_content[:2000],
+        "doc_type": doc.metadata.get("document_type", "unknown"),
+        "source": doc.metadata.get("file_name", "unknown"),
+        "archetype": archetype or "Not specified",
+        "region": region,
+        "intent": intent,
+    }
     try:
-        result: DocumentGrade = await chain.ainvoke({
-            "query": query,
-            "document": doc.page_content[:2000],
-            "doc_type": doc.metadata.get("document_type", "unknown"),
-            "source": doc.metadata.get("file_name", "unknown"),
-            "archetype": archetype or "Not specified",
-            "region": region,
-            "intent": intent,
-        })
+        result: DocumentGrade = await _grading_flight.do_async(
+            make_call_key(inputs), chain.ainvoke, inputs,
+        )
 
         graded = GradedDocument(
             document=doc,
@@ -128,32 +177,46 @@ async def grade_documents_async(state: PrismState) -> PrismState:
 
     start_time = time.perf_counter()
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    structured_llm = llm.with_structured_output(DocumentGrade)
-    chain = GRADE_PROMPT | structured_llm
+    # The profile decides how many of the top docs the LLM grades
+    profile = get_profile(state)
+    grade_depth = profile.grade_depth if profile.grading == "llm" else 0
+    if grade_depth and not has_budget(state, "grading"):
+        grade_depth = 0
+        degrade(state, "local_grading")
+    llm_docs, local_docs = docs[:grade_depth], docs[grade_depth:]
+
+    results = []
+    if llm_docs:
+        llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            callbacks=get_llm_callbacks(),
+            **call_options(state, reserve_ms=GENERATION_RESERVE_MS),
+        )
+        structured_llm = llm.with_structured_output(DocumentGrade)
+        chain = GRADE_PROMPT | structured_llm
 
-    # Extract context once for all documents
-    archetype = state.get("archetype")
-    region = state.get("region", "US")
-    intent = state.get("intent", "general")
+        # Extract context once for all documents
+        archetype = state.get("archetype")
+        region = state.get("region", "US")
+        intent = state.get("intent", "general")
 
-    # Create all grading tasks
-    tasks = [
-        _grade_single_document(chain, doc, query, archetype, region, intent)
-        for doc in docs
-    ]
+        # Create all grading tasks
+        tasks = [
+            _grade_single_document(chain, doc, query, archetype, region, intent)
+            for doc in llm_docs
+        ]
 
-    # Run all grading calls in parallel
-    results = await asyncio.gather(*tasks)
+        # Run all grading calls in parallel
+        results = await asyncio.gather(*tasks)
 
     # Process results (order preserved by gather)
-    graded_docs: list[GradedDocument] = []
-    relevant_count = 0
+    graded_docs: list[GradedDocument] = [graded for _, graded in results]
+    if local_docs:
+        query_terms = query_terms_for_grading(query)
+        graded_docs.extend(grade_document_locally(doc, query_terms) for doc in local_docs)
 
-    for _, graded in results:
-        graded_docs.append(graded)
-        if graded["relevance"] == "relevant":
-            relevant_count += 1
+    relevant_count = sum(1 for graded in graded_docs if graded["relevance"] == "relevant")
 
     state["graded_docs"] = graded_docs
 
@@ -170,7 +233,8 @@ async def grade_documents_async(state: PrismState) -> PrismState:
 
     elapsed_ms = (time.perf_counter() - start_time) * 1000
     logger.info(
-        f"Graded {len(docs)} docs in {elapsed_ms:.0f}ms (parallel): "
+        f"Graded {len(docs)} docs in {elapsed_ms:.0f}ms "
+        f"({len(llm_docs)} LLM, {len(local_docs)} local): "
         f"{relevant_count} relevant, quality={state['retrieval_quality']}"
     )
 
@@ -195,8 +259,11 @@ def grade_documents(state: PrismState) -> PrismState:
         # We're in an async context - this shouldn't happen in LangGraph
         # but handle it gracefully
         import concurrent.futures
+        import contextvars
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(asyncio.run, grade_documents_async(state))
+            # Copy context so metric span labels carry into the worker thread
+            context = contextvars.copy_context()
+            future = executor.submit(context.run, asyncio.run, grade_documents_async(state))
             return future.result()
     except RuntimeError:
         # No running loop - we can use asyncio.run()
@@ -226,6 +293,48 @@ def should_web_search(state: PrismState) -> Literal["web_search", "generate"]:
     return "generate"
 
 
+def cohere_rerank(
+    docs: list[Document],
+    query: str,
+    top_n: int,
+    api_key: str,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> list[Document]:
+    """
+    Rerank documents with Cohere, most relevant first.
+
+    Same output as langchain_cohere's CohereRerank.compress_documents (copies
+    with a relevance_score in metadata), except that chunk ids are kept so the
+    checkpoint serializer can store reranked docs by reference. Calls the
+    Cohere client directly so the request timeout and retries can be bounded
+    (see call_options).
+    """
+    import cohere
+
+    request_options = {}
+    if timeout is not None:
+        request_options["timeout_in_seconds"] = timeout
+    if max_retries is not None:
+        request_options["max_retries"] = max_retries
+
+    client = cohere.ClientV2(api_key)
+    response = client.rerank(
+        model="rerank-english-v3.0",
+        query=query,
+        documents=[doc.page_content for doc in docs],
+        top_n=top_n,
+        request_options=request_options or None,
+    )
+    reranked = []
+    for result in response.results:
+        doc = docs[result.index]
+        metadata = deepcopy(doc.metadata)
+        metadata["relevance_score"] = result.relevance_score
+        reranked.append(Document(page_content=doc.page_content, metadata=metadata, id=doc.id))
+    return reranked
+
+
 def rerank_documents(state: PrismState) -> PrismState:
     """
     Rerank documents using Cohere cross-encoder for improved precision.
@@ -243,24 +352,27 @@ def rerank_documents(state: PrismState) -> PrismState:
         return state
 
     query = state.get("query", "")
+    profile = get_profile(state)
 
     # Try Cohere reranking
     cohere_key = os.getenv("COHERE_API_KEY")
-    if cohere_key and len(relevant_docs) > 1:
+    use_cohere = cohere_key and profile.rerank and len(relevant_docs) > 1
+    if use_cohere and not has_budget(state, "rerank"):
+        use_cohere = False
+        degrade(state, "skip_rerank")
+    if use_cohere:
         try:
-            from langchain_cohere import CohereRerank
-
-            reranker = CohereRerank(
-                model="rerank-english-v3.0",
-                top_n=min(5, len(relevant_docs)),
-                cohere_api_key=cohere_key,
-            )
-
             # Extract documents for reranking
             docs_to_rerank = [gd["document"] for gd in relevant_docs]
 
             # Rerank
-            reranked = reranker.compress_documents(docs_to_rerank, query)
+            reranked = cohere_rerank(
+                docs_to_rerank,
+                query,
+                top_n=min(5, len(relevant_docs)),
+                api_key=cohere_key,
+                **call_options(state, reserve_ms=GENERATION_RESERVE_MS),
+            )
 
             state["retrieved_docs"] = list(reranked)[:5]
             elapsed_ms = (time.perf_counter() - start_time) * 1000
@@ -268,7 +380,7 @@ def rerank_documents(state: PrismState) -> PrismState:
             return state
 
         except ImportError:
-            logger.warning("langchain-cohere not installed, using fallback reranking")
+            logger.warning("cohere not installed, using fallback reranking")
         except Exception as e:
             logger.warning(f"Cohere reranking failed: {e}, using fallback")
 
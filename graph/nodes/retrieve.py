@@ -4,17 +4,27 @@ Implements BM25 + semantic hybrid retrieval for improved accuracy
 on exact terms (fund names, tickers) while maintaining semantic understanding.
 """
 
+import heapq
 import logging
+import threading
 from typing import Optional, Any, List
 
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.retrievers import BaseRetriever
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from rank_bm25 import BM25Okapi
 
 from config import settings
 
+from utils.cache import CoalescedEmbeddings
+from utils.metrics import TimedEmbeddings, get_llm_callbacks, span
+
+from ..checkpoint import get_chunk_store
+from ..deadline import call_options, deadline_scope, degrade, has_budget, scoped_call_options
+from ..profiles import get_profile
+
 # =============================================================================
 # Query Expansion (LLM-based)
 # =============================================================================
@@ -23,24 +33,39 @@ from config import settings
 _expander_llm = None
 
 
-def get_expander_llm() -> ChatOpenAI:
-    """Get or create the query expansion LLM."""
+def get_expander_llm(options: Optional[dict] = None) -> ChatOpenAI:
+    """
+    Get or create the query expansion LLM.
+
+    options (timeout, max_retries from call_options) give a per-call LLM
+    bounded by the request deadline instead of the shared one.
+    """
     global _expander_llm
+    if options:
+        return ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            max_tokens=100,
+            callbacks=get_llm_callbacks(),
+            **options,
+        )
     if _expander_llm is None:
         _expander_llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=100,
+            callbacks=get_llm_callbacks(),
         )
     return _expander_llm
 
 
-def expand_query_with_llm(query: str, intent: str) -> str:
+def expand_query_with_llm(query: str, intent: str, options: Optional[dict] = None) -> str:
     """
     Use LLM to expand query with domain-specific terms for better recall.
 
     This is backend-agnostic - works with ChromaDB or Snowflake.
     Adds synonyms, related terms, and domain vocabulary.
+    options are passed to get_expander_llm().
     """
     # Intent-specific domain hints
     intent_hints = {
@@ -61,23 +86,63 @@ Original query: {query}
 Expanded query:"""
 
     try:
-        llm = get_expander_llm()
+        llm = get_expander_llm(options)
         response = llm.invoke(prompt)
-        expanded = response.content.strip()
-
-        # Sanity check - if expansion is too different, fall back to original
-        if len(expanded) > 200 or query.lower() not in expanded.lower():
-            return query
-
-        return expanded
+        return validate_expansion(query, response.content)
     except Exception as e:
         logging.getLogger(__name__).warning(f"Query expansion failed: {e}, using original")
         return query
 
 
+def validate_expansion(query: str, expanded: Optional[str]) -> str:
+    """Return the expanded query, or the original if the expansion drifted."""
+    expanded = (expanded or "").strip()
+
+    # Sanity check - if expansion is too different, fall back to original
+    if not expanded or len(expanded) > 200 or query.lower() not in expanded.lower():
+        return query
+
+    return expanded
+
+
 from ..state import PrismState, ARCHETYPE_ALIASES
 
 
+class DeadlineEmbeddings(Embeddings):
+    """
+    OpenAIEmbeddings wrapper bounding each call by the request deadline.
+
+    Query embeddings happen inside the vector store, so the deadline comes
+    from the enclosing deadline_scope(); outside one the wrapped embeddings
+    are used as configured.
+    """
+
+    def __init__(self, embeddings: OpenAIEmbeddings):
+        self.embeddings = embeddings
+
+    def _bounded(self) -> OpenAIEmbeddings:
+        options = scoped_call_options()
+        if not options:
+            return self.embeddings
+        # Per-call clients sharing the connection pool of the configured ones
+        return self.embeddings.model_copy(update={
+            "client": self.embeddings.client._client.with_options(**options).embeddings,
+            "async_client": self.embeddings.async_client._client.with_options(**options).embeddings,
+        })
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._bounded().embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._bounded().embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self._bounded().aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self._bounded().aembed_query(text)
+
+
 # =============================================================================
 # Custom BM25 Retriever (replaces langchain_community.retrievers.BM25Retriever)
 # =============================================================================
@@ -96,6 +161,10 @@ class SimpleBM25Retriever(BaseRetriever):
     class Config:
         arbitrary_types_allowed = True
 
+    def with_k(self, k: int) -> "SimpleBM25Retriever":
+        """View of this index returning the top k (shares documents and scores)."""
+        return self if k == self.k else self.model_copy(update={"k": k})
+
     @classmethod
     def from_documents(cls, documents: List[Document], k: int = 10) -> "SimpleBM25Retriever":
         """Build BM25 index from documents."""
@@ -108,11 +177,12 @@ class SimpleBM25Retriever(BaseRetriever):
 
     def _get_relevant_documents(self, query: str, **kwargs) -> List[Document]:
         """Retrieve documents using BM25 scoring."""
-        tokenized_query = query.lower().split()
-        scores = self.bm25.get_scores(tokenized_query)
+        with span("bm25"):
+            tokenized_query = query.lower().split()
+            scores = self.bm25.get_scores(tokenized_query)
 
-        # Get top-k indices
-        top_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:self.k]
+            # Get top-k indices
+            top_indices = heapq.nlargest(self.k, range(len(scores)), key=lambda i: scores[i])
 
         return [self.documents[i] for i in top_indices if scores[i] > 0]
 
@@ -143,7 +213,11 @@ class SimpleEnsembleRetriever(BaseRetriever):
         all_results = []
         for retriever in self.retrievers:
             try:
-                docs = retriever.invoke(query)
+                if isinstance(retriever, SimpleBM25Retriever):
+                    docs = retriever.invoke(query)  # Timed inside as "bm25"
+                else:
+                    with span("chroma"):
+                        docs = retriever.invoke(query)
                 all_results.append(docs)
             except Exception as e:
                 logging.getLogger(__name__).warning(f"Retriever failed: {e}")
@@ -176,10 +250,17 @@ class SimpleEnsembleRetriever(BaseRetriever):
 
 logger = logging.getLogger(__name__)
 
-# Global retriever instances keyed by collection name
-_retrievers: dict[str, BaseRetriever] = {}
-_bm25_retrievers: dict[str, SimpleBM25Retriever] = {}
-_hybrid_retrievers: dict[str, SimpleEnsembleRetriever] = {}
+# Global retriever instances. Indexes are built once per collection; the
+# retrievers on top of them are keyed by (collection, k), since latency
+# profiles retrieve different numbers of documents.
+_vectorstores: dict[str, Chroma] = {}
+_retrievers: dict[tuple[str, int], BaseRetriever] = {}
+_bm25_indexes: dict[str, SimpleBM25Retriever] = {}
+_hybrid_retrievers: dict[tuple[str, int, float, float], SimpleEnsembleRetriever] = {}
+# Requests build retrievers from worker threads while ingestion invalidates
+# them; every read and write of the caches above holds this lock. Reentrant,
+# since the hybrid retriever builds its semantic and BM25 parts under it.
+_retrievers_lock = threading.RLock()
 
 
 def get_collection_name(domain: str) -> str:
@@ -187,28 +268,53 @@ def get_collection_name(domain: str) -> str:
     return settings.domain_collections.get(domain, settings.collection_name)
 
 
+def invalidate_retrievers(collection_name: str) -> None:
+    """
+    Drop the cached indexes and retrievers of a collection.
+
+    Called after the collection is re-ingested or cleared, so the next query
+    rebuilds the BM25 index from the current chunks (instead of returning
+    deleted ones) and reopens the Chroma collection.
+    """
+    with _retrievers_lock:
+        _vectorstores.pop(collection_name, None)
+        _bm25_indexes.pop(collection_name, None)
+        for cache in (_retrievers, _hybrid_retrievers):
+            for key in [key for key in cache if key[0] == collection_name]:
+                cache.pop(key, None)
+        removed = get_chunk_store().unregister_collection(collection_name)
+    logger.info(f"Invalidated retrievers for {collection_name} ({removed} registered chunks dropped)")
+
+
 def get_chroma_retriever(
     persist_directory: str = "./chroma_db",
     collection_name: str = "alti_investments",
     k: int = 10,
 ) -> BaseRetriever:
-    """Get or create Chroma vector store retriever for a collection."""
+    """Get or create Chroma vector store retriever returning k documents from a collection."""
     global _retrievers
 
-    if collection_name not in _retrievers:
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            persist_directory=persist_directory,
-        )
-        _retrievers[collection_name] = vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": k}
-        )
-        logger.info(f"Created retriever for collection: {collection_name}")
-
-    return _retrievers[collection_name]
+    with _retrievers_lock:
+        if collection_name not in _vectorstores:
+            # Identical concurrent query embeddings (e.g. duplicate requests) share one call
+            embeddings = CoalescedEmbeddings(
+                TimedEmbeddings(DeadlineEmbeddings(OpenAIEmbeddings(model="text-embedding-3-small"))),
+                namespace="text-embedding-3-small",
+            )
+            _vectorstores[collection_name] = Chroma(
+                collection_name=collection_name,
+                embedding_function=embeddings,
+                persist_directory=persist_directory,
+            )
+            logger.info(f"Created vector store for collection: {collection_name}")
+
+        if (collection_name, k) not in _retrievers:
+            _retrievers[(collection_name, k)] = _vectorstores[collection_name].as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": k}
+            )
+
+        return _retrievers[(collection_name, k)]
 
 
 def get_bm25_retriever(
@@ -220,49 +326,54 @@ def get_bm25_retriever(
     Get or build BM25 retriever from ChromaDB documents.
 
     Loads all documents from the collection and builds a BM25 index
-    for lexical matching. Results are cached globally.
+    for lexical matching. The index is built once per collection and
+    cached globally; k only limits the results returned.
     """
-    global _bm25_retrievers
-
-    cache_key = f"{collection_name}_{k}"
-    if cache_key in _bm25_retrievers:
-        return _bm25_retrievers[cache_key]
-
-    try:
-        # Load documents from ChromaDB for BM25 indexing
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            persist_directory=persist_directory,
-        )
-
-        # Get all documents for BM25 index
-        all_data = vectorstore.get()
-        documents_list = all_data.get("documents", [])
-        metadatas_list = all_data.get("metadatas", [])
-
-        if not documents_list:
-            logger.warning(f"No documents found for BM25 index in {collection_name}")
+    global _bm25_indexes
+
+    with _retrievers_lock:
+        if collection_name in _bm25_indexes:
+            return _bm25_indexes[collection_name].with_k(k)
+
+        try:
+            # Load documents from ChromaDB for BM25 indexing
+            embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+            vectorstore = Chroma(
+                collection_name=collection_name,
+                embedding_function=embeddings,
+                persist_directory=persist_directory,
+            )
+
+            # Get all documents for BM25 index
+            all_data = vectorstore.get()
+            ids_list = all_data.get("ids", [])
+            documents_list = all_data.get("documents", [])
+            metadatas_list = all_data.get("metadatas", [])
+
+            if not documents_list:
+                logger.warning(f"No documents found for BM25 index in {collection_name}")
+                return None
+
+            # Convert to LangChain Documents (keeping Chroma IDs as stable chunk IDs)
+            documents = [
+                Document(page_content=text, metadata=meta or {}, id=doc_id)
+                for doc_id, text, meta in zip(ids_list, documents_list, metadatas_list)
+            ]
+
+            # Checkpoints store these chunks by reference
+            get_chunk_store().register(documents, collection_name)
+
+            # Build BM25 retriever
+            bm25_retriever = SimpleBM25Retriever.from_documents(documents, k=k)
+            _bm25_indexes[collection_name] = bm25_retriever
+
+            logger.info(f"Built BM25 index for {collection_name} with {len(documents)} docs")
+            return bm25_retriever
+
+        except Exception as e:
+            logger.error(f"Failed to build BM25 index: {e}")
             return None
 
-        # Convert to LangChain Documents
-        documents = [
-            Document(page_content=text, metadata=meta or {})
-            for text, meta in zip(documents_list, metadatas_list)
-        ]
-
-        # Build BM25 retriever
-        bm25_retriever = SimpleBM25Retriever.from_documents(documents, k=k)
-        _bm25_retrievers[cache_key] = bm25_retriever
-
-        logger.info(f"Built BM25 index for {collection_name} with {len(documents)} docs")
-        return bm25_retriever
-
-    except Exception as e:
-        logger.error(f"Failed to build BM25 index: {e}")
-        return None
-
 
 def get_hybrid_retriever(
     persist_directory: str = "./chroma_db",
@@ -290,30 +401,31 @@ def get_hybrid_retriever(
     """
     global _hybrid_retrievers
 
-    cache_key = f"{collection_name}_{k}_{bm25_weight}_{semantic_weight}"
-    if cache_key in _hybrid_retrievers:
-        return _hybrid_retrievers[cache_key]
+    cache_key = (collection_name, k, bm25_weight, semantic_weight)
+    with _retrievers_lock:
+        if cache_key in _hybrid_retrievers:
+            return _hybrid_retrievers[cache_key]
 
-    # Get semantic retriever
-    semantic_retriever = get_chroma_retriever(persist_directory, collection_name, k)
+        # Get semantic retriever
+        semantic_retriever = get_chroma_retriever(persist_directory, collection_name, k)
 
-    # Get BM25 retriever
-    bm25_retriever = get_bm25_retriever(persist_directory, collection_name, k)
+        # Get BM25 retriever
+        bm25_retriever = get_bm25_retriever(persist_directory, collection_name, k)
 
-    if bm25_retriever is None:
-        logger.warning("BM25 index unavailable, using semantic-only retrieval")
-        return semantic_retriever
+        if bm25_retriever is None:
+            logger.warning("BM25 index unavailable, using semantic-only retrieval")
+            return semantic_retriever
 
-    # Combine with SimpleEnsembleRetriever using reciprocal rank fusion
-    hybrid = SimpleEnsembleRetriever(
-        retrievers=[semantic_retriever, bm25_retriever],
-        weights=[semantic_weight, bm25_weight],
-    )
+        # Combine with SimpleEnsembleRetriever using reciprocal rank fusion
+        hybrid = SimpleEnsembleRetriever(
+            retrievers=[semantic_retriever, bm25_retriever],
+            weights=[semantic_weight, bm25_weight],
+        )
 
-    _hybrid_retrievers[cache_key] = hybrid
-    logger.info(f"Created hybrid retriever: semantic={semantic_weight}, bm25={bm25_weight}")
+        _hybrid_retrievers[cache_key] = hybrid
+        logger.info(f"Created hybrid retriever: semantic={semantic_weight}, bm25={bm25_weight}")
 
-    return hybrid
+        return hybrid
 
 
 def retrieve_documents(state: PrismState) -> PrismState:
@@ -336,21 +448,24 @@ def retrieve_documents(state: PrismState) -> PrismState:
         return state
 
     # Get collection name for domain and create retriever
+    profile = get_profile(state)
     collection_name = get_collection_name(domain)
-    retriever = get_hybrid_retriever(collection_name=collection_name)
-    logger.info(f"Retrieving from domain '{domain}' → collection '{collection_name}'")
+    retriever = get_hybrid_retriever(collection_name=collection_name, k=profile.k)
+    logger.info(f"Retrieving from domain '{domain}' → collection '{collection_name}' (profile={profile.name})")
 
     # Enhance query based on intent and context
     enhanced_query = enhance_query(query, state)
 
     try:
         # Retrieve documents
-        docs = retriever.invoke(enhanced_query)
+        with deadline_scope(state):
+            docs = retriever.invoke(enhanced_query)
+        get_chunk_store().register(docs, collection_name)
 
         # Filter and reorder based on intent
         filtered_docs = filter_by_intent(docs, intent, state)
 
-        state["retrieved_docs"] = filtered_docs[:10]  # Top 10 after filtering
+        state["retrieved_docs"] = filtered_docs[:profile.k]  # Top k after filtering
         logger.info(f"Retrieved {len(state['retrieved_docs'])} documents for intent: {intent}")
 
     except Exception as e:
@@ -360,6 +475,63 @@ def retrieve_documents(state: PrismState) -> PrismState:
     return state
 
 
+def retrieve_candidates(state: PrismState) -> dict:
+    """
+    Hybrid search on the raw query, run in parallel with route_intent.
+
+    Used by the parallel workflow. Intent isn't known yet, so there is no
+    LLM expansion; only pre-selected archetype/region are added to the query.
+    Intent filtering happens afterwards in apply_intent_filter.
+
+    Returns a partial update (retrieved_docs only) so it can merge with the
+    routing branch in the same step.
+    """
+    from .route import get_latest_query
+
+    query = get_latest_query(state)
+    domain = state.get("domain", "investments")
+
+    if not query:
+        logger.warning("Empty query, skipping retrieval")
+        return {"retrieved_docs": []}
+
+    profile = get_profile(state)
+    collection_name = get_collection_name(domain)
+    retriever = get_hybrid_retriever(collection_name=collection_name, k=profile.k)
+    logger.info(f"Retrieving (parallel) from domain '{domain}' → collection '{collection_name}'")
+
+    enhanced_parts = [query]
+    if state.get("archetype"):
+        enhanced_parts.append(state["archetype"])
+    if state.get("region", "US") == "INT":
+        enhanced_parts.append("International")
+
+    try:
+        with deadline_scope(state):
+            docs = retriever.invoke(" ".join(enhanced_parts))
+        get_chunk_store().register(docs, collection_name)
+    except Exception as e:
+        logger.error(f"Retrieval failed: {e}")
+        docs = []
+
+    return {"retrieved_docs": docs}
+
+
+def apply_intent_filter(state: PrismState) -> dict:
+    """
+    Join node for the parallel workflow.
+
+    Runs after both route_intent and retrieve_candidates finish, applying
+    intent priority and archetype/region boosts to the raw candidates.
+    """
+    intent = state.get("intent", "general")
+    filtered_docs = filter_by_intent(state.get("retrieved_docs", []), intent, state)
+
+    retrieved = filtered_docs[:get_profile(state).k]  # Top k after filtering
+    logger.info(f"Retrieved {len(retrieved)} documents for intent: {intent}")
+    return {"retrieved_docs": retrieved}
+
+
 def enhance_query(query: str, state: PrismState) -> str:
     """
     Enhance query with context and LLM-based expansion for better retrieval.
@@ -371,8 +543,18 @@ def enhance_query(query: str, state: PrismState) -> str:
     intent = state.get("intent", "general")
 
     # Step 1: LLM-based expansion (adds domain-specific terms)
-    expanded_query = expand_query_with_llm(query, intent)
-    logger.info(f"Query expansion: '{query}' → '{expanded_query}'")
+    # Reuse the expansion from the fused routing call when route_intent made one
+    expanded_query = state.get("expanded_query")
+    if not get_profile(state).expand_query:
+        expanded_query = query
+    elif expanded_query:
+        logger.info(f"Query expansion (from routing): '{query}' → '{expanded_query}'")
+    elif not has_budget(state, "expansion"):
+        expanded_query = query
+        degrade(state, "skip_expansion")
+    else:
+        expanded_query = expand_query_with_llm(query, intent, call_options(state))
+        logger.info(f"Query expansion: '{query}' → '{expanded_query}'")
 
     enhanced_parts = [expanded_query]
 
@@ -449,7 +631,7 @@ def retrieve_with_metadata_filter(
 
     Used for precise queries like "funds in IBI model for US".
     """
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    embeddings = DeadlineEmbeddings(OpenAIEmbeddings(model="text-embedding-3-small"))
     vectorstore = Chroma(
         collection_name="alti_investments",
         embedding_function=embeddings,
@@ -459,10 +641,11 @@ def retrieve_with_metadata_filter(
     query = state.get("query", "")
 
     # Chroma supports where clauses for metadata filtering
-    docs = vectorstore.similarity_search(
-        query,
-        k=k,
-        filter=metadata_filter
-    )
+    with deadline_scope(state):
+        docs = vectorstore.similarity_search(
+            query,
+            k=k,
+            filter=metadata_filter
+        )
 
     return docs
@@ -1,14 +1,25 @@
 """Intent routing node for Prism RAG workflow."""
 
 import logging
-from typing import Literal
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal, Optional
 
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from config import settings
+from utils.logging import log_intent_routing
+from utils.metrics import get_llm_callbacks
+
+from ..deadline import GENERATION_RESERVE_MS, call_options, degrade, has_budget
+from ..profiles import get_profile
 from ..state import PrismState, normalize_archetype
+from .classify import LocalIntent, get_intent_classifier
+from .retrieve import validate_expansion
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +43,16 @@ class IntentClassification(BaseModel):
     )
 
 
-ROUTE_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are an intent classifier for AlTi's Impact investment assistant.
+class IntentClassificationWithExpansion(IntentClassification):
+    """Structured output for the fused intent classification + query expansion call."""
+
+    expanded_query: str | None = Field(
+        default=None,
+        description="The original query plus 3-5 relevant search terms, under 40 words"
+    )
+
+
+_ROUTE_SYSTEM = """You are an intent classifier for AlTi's Impact investment assistant.
 
 Classify the user query into one of these intents:
 
@@ -60,66 +79,292 @@ Classify the user query into one of these intents:
 Also detect:
 - Specific archetype mentioned (normalize to canonical name)
 - Region mentioned (US or International/INT)
-
+"""
+
+_EXPANSION_INSTRUCTIONS = """
+Also expand the query for search:
+- expanded_query = the original query verbatim, followed by 3-5 relevant search terms
+- Keep under 40 words total
+- Domain vocabulary by intent:
+  - archetype: investment model portfolios, fund allocations, IBI, Impact 100%, Enhanced Balance
+  - clarity: ESG metrics, Clarity AI, sustainability scores, carbon intensity, SFDR
+  - pipeline: fund pipeline, 2025 2026 strategy, new investments
+  - general: investments, portfolios, risk, returns
+"""
+
+_USER_CONTEXT = """
 Current user context:
 - Pre-selected archetype: {archetype}
 - Pre-selected region: {region}
-"""),
+"""
+
+# Fused routing + expansion (sequential workflow, where retrieval runs after routing)
+ROUTE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _ROUTE_SYSTEM + _EXPANSION_INSTRUCTIONS + _USER_CONTEXT),
+    ("human", "{query}")
+])
+
+# Routing only (parallel workflow, where retrieval already ran on the raw query)
+ROUTE_ONLY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _ROUTE_SYSTEM + _USER_CONTEXT),
     ("human", "{query}")
 ])
 
 
-def route_intent(state: PrismState) -> PrismState:
+class RouterStats:
+    """
+    Agreement between the local classifier and the LLM router.
+
+    Comparisons come from LLM fallbacks (low local confidence) and shadow
+    calls (a sample of confident local decisions). Agreement is bucketed by
+    local confidence so intent_confidence_threshold can be tuned.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_decisions = 0
+        self.llm_decisions = 0
+        self.llm_failures = 0
+        self.shadow_checks = 0
+        self.compared = 0
+        self.agreed = 0
+        self.buckets: dict[str, dict[str, int]] = {}
+
+    def record_decision(self, source: str) -> None:
+        """Count a decision by "local", "llm" or "llm_failed" (local guess after an LLM error)."""
+        with self._lock:
+            if source == "llm":
+                self.llm_decisions += 1
+            else:
+                self.local_decisions += 1
+                if source == "llm_failed":
+                    self.llm_failures += 1
+
+    def record_comparison(self, local: LocalIntent, llm_intent: str, source: str) -> None:
+        bucket = f"{min(int(local.confidence * 10), 9) / 10:.1f}"
+        agreed = local.intent == llm_intent
+        with self._lock:
+            self.compared += 1
+            self.agreed += int(agreed)
+            if source == "shadow":
+                self.shadow_checks += 1
+            counts = self.buckets.setdefault(bucket, {"compared": 0, "agreed": 0})
+            counts["compared"] += 1
+            counts["agreed"] += int(agreed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.local_decisions + self.llm_decisions
+            return {
+                "mode": settings.intent_classifier,
+                "confidence_threshold": settings.intent_confidence_threshold,
+                "shadow_rate": settings.intent_shadow_rate,
+                "local_decisions": self.local_decisions,
+                "llm_decisions": self.llm_decisions,
+                "local_rate": round(self.local_decisions / total, 3) if total else 0,
+                "llm_failures": self.llm_failures,
+                "shadow_checks": self.shadow_checks,
+                "compared": self.compared,
+                "agreement_rate": round(self.agreed / self.compared, 3) if self.compared else None,
+                "agreement_by_confidence": {
+                    bucket: {
+                        **counts,
+                        "agreement_rate": round(counts["agreed"] / counts["compared"], 3),
+                    }
+                    for bucket, counts in sorted(self.buckets.items())
+                },
+            }
+
+
+_router_stats = RouterStats()
+
+# Shadow LLM calls run off the request path
+_shadow_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="intent-shadow")
+
+
+def get_router_stats() -> dict:
+    """Get local/LLM routing and agreement statistics."""
+    return _router_stats.stats()
+
+
+def _classify_with_llm(
+    query: str,
+    archetype: Optional[str],
+    region: str,
+    options: Optional[dict] = None,
+    expand: bool = True,
+) -> Optional[IntentClassification]:
+    """
+    Classify intent (and expand the query) in one gpt-4o-mini structured call.
+
+    options are client options bounding the call (see call_options).
+    expand=False leaves the expansion out of the prompt and the output.
+    Returns None on failure (including timeout).
+    """
+    llm = ChatOpenAI(
+        model="gpt-4o-mini", temperature=0, callbacks=get_llm_callbacks(), **(options or {}),
+    )
+    if expand:
+        chain = ROUTE_PROMPT | llm.with_structured_output(IntentClassificationWithExpansion)
+    else:
+        chain = ROUTE_ONLY_PROMPT | llm.with_structured_output(IntentClassification)
+
+    try:
+        return chain.invoke({
+            "query": query,
+            "archetype": archetype or "Not specified",
+            "region": region,
+        })
+    except Exception as e:
+        logger.error(f"Intent classification failed: {e}")
+        return None
+
+
+def _apply_classification(
+    state: PrismState,
+    intent: str,
+    detected_archetype: Optional[str],
+    detected_region: Optional[str],
+) -> None:
+    """Write intent, archetype and region into state."""
+    state["intent"] = intent
+
+    # Update archetype if detected (and not already set)
+    if detected_archetype:
+        normalized = normalize_archetype(detected_archetype)
+        if normalized:
+            state["archetype"] = normalized
+
+    # Update region if detected
+    if detected_region:
+        state["region"] = detected_region
+
+
+def _compare_with_llm(
+    query: str,
+    archetype: Optional[str],
+    region: str,
+    local: LocalIntent,
+    llm_intent: Optional[str] = None,
+    source: str = "shadow",
+) -> None:
+    """Record local-vs-LLM agreement, calling the LLM if no result is given."""
+    if llm_intent is None:
+        result = _classify_with_llm(query, archetype, region, expand=False)
+        if result is None:
+            return
+        llm_intent = result.intent
+
+    _router_stats.record_comparison(local, llm_intent, source)
+    log_intent_routing(
+        query=query,
+        llm_intent=llm_intent,
+        local_intent=local.intent,
+        local_confidence=local.confidence,
+        source=source,
+    )
+
+
+def get_latest_query(state: PrismState) -> str:
+    """Extract the query text from the latest message."""
+    latest_message = state["messages"][-1] if state.get("messages") else None
+    if not latest_message:
+        return ""
+    return latest_message.content if isinstance(latest_message, HumanMessage) else str(latest_message)
+
+
+def route_intent(state: PrismState, expand: bool = True) -> PrismState:
     """
     Classify user intent and route to appropriate retrieval strategy.
 
+    In "hybrid" mode the local classifier decides when its confidence is at
+    or above settings.intent_confidence_threshold; otherwise gpt-4o-mini
+    decides. A sample of local decisions is shadow-checked against the LLM.
+
+    The LLM call also returns the expanded search query, so retrieval skips
+    its own expansion round-trip. expand=False (parallel workflow, where
+    retrieval doesn't wait for routing) leaves the expansion out.
+
     Updates state with:
     - intent: classified intent
     - archetype: detected or pre-selected archetype
     - region: detected or pre-selected region
     - query: extracted query text
+    - expanded_query: query with search terms (LLM path only)
     """
     # Extract query from latest message
-    latest_message = state["messages"][-1] if state["messages"] else None
-    if not latest_message:
+    if not state["messages"]:
         logger.warning("No messages in state")
         state["intent"] = "general"
         state["query"] = ""
         return state
 
-    query = latest_message.content if isinstance(latest_message, HumanMessage) else str(latest_message)
+    query = get_latest_query(state)
     state["query"] = query
 
-    # Use LLM to classify intent
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    structured_llm = llm.with_structured_output(IntentClassification)
+    archetype = state.get("archetype")
+    region = state.get("region", "US")
+    profile = get_profile(state)
+    mode = settings.intent_classifier if profile.llm_routing else "local"
+
+    # The LLM router only runs if the request deadline leaves room for it
+    llm_allowed = mode != "local" and has_budget(state, "routing")
+
+    local: Optional[LocalIntent] = None
+    if mode in ("local", "hybrid") or not llm_allowed:
+        local = get_intent_classifier().classify(query)
+        confident = mode == "local" or (
+            mode == "hybrid" and local.confidence >= settings.intent_confidence_threshold
+        )
+
+        if confident or not llm_allowed:
+            if not confident:
+                degrade(state, "local_routing")
+            _apply_classification(state, local.intent, local.detected_archetype, local.detected_region)
+            _router_stats.record_decision("local")
+            logger.info(f"Routed query to intent: {local.intent} (local, confidence={local.confidence:.2f})")
+
+            # Shadow calls are LLM calls too; profiles without LLM routing never make them
+            if (
+                profile.llm_routing
+                and settings.intent_shadow_rate > 0
+                and random.random() < settings.intent_shadow_rate
+            ):
+                _shadow_executor.submit(_compare_with_llm, query, archetype, region, local)
+            return state
 
-    chain = ROUTE_PROMPT | structured_llm
-
-    try:
-        result: IntentClassification = chain.invoke({
-            "query": query,
-            "archetype": state.get("archetype") or "Not specified",
-            "region": state.get("region", "US"),
-        })
-
-        state["intent"] = result.intent
+    # Use LLM to classify intent
+    result = _classify_with_llm(
+        query,
+        archetype,
+        region,
+        options=call_options(state, reserve_ms=GENERATION_RESERVE_MS),
+        expand=expand and profile.expand_query,
+    )
 
-        # Update archetype if detected (and not already set)
-        if result.detected_archetype:
-            normalized = normalize_archetype(result.detected_archetype)
-            if normalized:
-                state["archetype"] = normalized
+    if result is None:
+        # Fall back to the low-confidence local guess rather than "general"
+        if local is not None:
+            _apply_classification(state, local.intent, local.detected_archetype, local.detected_region)
+        else:
+            state["intent"] = "general"
+        _router_stats.record_decision("llm_failed")
+        logger.info(f"Routed query to intent: {state['intent']} (LLM router failed)")
+        return state
 
-        # Update region if detected
-        if result.detected_region:
-            state["region"] = result.detected_region
+    _apply_classification(state, result.intent, result.detected_archetype, result.detected_region)
+    _router_stats.record_decision("llm")
 
-        logger.info(f"Routed query to intent: {result.intent} (reasoning: {result.reasoning})")
+    # Fused call: retrieve_documents uses this instead of a second expansion round-trip
+    expanded_query = getattr(result, "expanded_query", None)
+    if expanded_query:
+        state["expanded_query"] = validate_expansion(query, expanded_query)
+    logger.info(f"Routed query to intent: {result.intent} (reasoning: {result.reasoning})")
 
-    except Exception as e:
-        logger.error(f"Intent classification failed: {e}")
-        state["intent"] = "general"
+    if local is not None:
+        _compare_with_llm(query, archetype, region, local, llm_intent=result.intent, source="fallback")
+    else:
+        log_intent_routing(query=query, llm_intent=result.intent, source="llm")
 
     return state
 
@@ -0,0 +1,254 @@
+"""Deterministic grounding verifier for Prism RAG responses.
+
+Most answers are numbers (allocations, returns, volatilities, minimums), so
+a second gpt-4o-mini call is an expensive way to fact-check them. This module
+pulls percentages, currency amounts, ratios and fund names out of a generation
+and matches them against the packed context in a few milliseconds.
+
+Numbers are normalized before matching so formatting differences don't count
+as hallucinations:
+- 0.0523 in context matches 5.23% (fraction vs percent; only when the claim
+  or the context number is written as a percentage)
+- $7,500,000 matches $7.5M / 7.5 million (scale suffixes)
+- 7.64% matches "7.6%" (decimal claims are allowed the rounding their
+  precision implies; whole numbers must match exactly, so 7.6% is not "8%")
+"""
+
+import logging
+import re
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Iterable, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimum share of unmatched claims before we call an answer not_grounded.
+# Below this the answer may just contain derived numbers (differences, sums),
+# which the LLM checker is better at judging.
+NOT_GROUNDED_RATIO = 0.5
+NOT_GROUNDED_MIN_CLAIMS = 2
+
+# Matched claims needed to call an answer grounded without the LLM check.
+# At least one must be numeric: an answer with only fund names is mostly
+# prose the verifier hasn't assessed, so it goes to the LLM check.
+GROUNDED_MIN_CLAIMS = 2
+
+# Float noise allowed on exact (whole number) matches
+_EPSILON = 1e-9
+
+_SCALES = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+    "t": 1e12, "tn": 1e12, "trillion": 1e12,
+}
+
+_NUMBER_PATTERN = re.compile(
+    r"(?P<currency>[$£€])?\s?"
+    r"(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)"
+    r"(?:"
+    r"\s?(?P<pct>%|percent\b|per cent\b)"
+    r"|\s?(?P<bps>bps\b|basis points?\b)"
+    r"|(?P<mult>x\b)"
+    r"|\s?(?P<scale_word>thousand|million|billion|trillion)\b"
+    r"|(?P<scale>k|mm|mn|m|bn|b|tn|t)\b"
+    r")?",
+    re.IGNORECASE,
+)
+
+_FUND_SUFFIXES = (
+    r"Fund|Funds|Partners|Capital|Trust|LP|L\.P\.|Strategies|Strategy|"
+    r"Opportunities|Index|ETF"
+)
+
+_FUND_NAME_PATTERN = re.compile(
+    rf"\b((?:[A-Z0-9][\w&'.-]*\s+){{1,5}}(?:{_FUND_SUFFIXES}))(?![\w])"
+)
+
+# Leading words captured by the Title-case pattern at sentence starts
+_LEADING_STOPWORDS = {"the", "a", "an", "in", "our", "its", "this", "that", "and", "with"}
+
+
+@dataclass
+class NumericClaim:
+    """A number extracted from text, normalized to a comparable value."""
+
+    text: str
+    value: float
+    tolerance: float
+    is_claim: bool  # False for bare integers (counts, years, citations)
+    is_percent: bool = False  # Written as a percentage (%, percent, bps)
+
+
+@dataclass
+class GroundingResult:
+    """Outcome of the local grounding check."""
+
+    # None means the verifier could not decide and the LLM check should run
+    verdict: Optional[Literal["grounded", "not_grounded"]]
+    matched: list[str] = field(default_factory=list)
+    unmatched: list[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def claim_count(self) -> int:
+        return len(self.matched) + len(self.unmatched)
+
+
+def _parse_numbers(text: str) -> list[NumericClaim]:
+    """Extract all numbers from text with unit normalization."""
+    numbers = []
+
+    for match in _NUMBER_PATTERN.finditer(text):
+        raw = match.group("number")
+        value = float(raw.replace(",", ""))
+        decimals = len(raw.split(".")[1]) if "." in raw else 0
+        # Half a unit in the last written decimal; whole numbers are exact
+        tolerance = 0.5 * 10 ** -decimals if decimals else 0.0
+
+        scale_key = (match.group("scale_word") or match.group("scale") or "").lower()
+        scale = _SCALES.get(scale_key, 1.0)
+
+        if match.group("bps"):
+            value, tolerance = value / 100, tolerance / 100
+
+        value *= scale
+        tolerance *= scale
+
+        is_claim = bool(
+            match.group("currency")
+            or match.group("pct")
+            or match.group("bps")
+            or match.group("mult")
+            or scale_key
+            or "." in raw
+            or "," in raw
+        )
+
+        numbers.append(NumericClaim(
+            text=match.group(0).strip(),
+            value=value,
+            tolerance=tolerance + _EPSILON * max(1.0, abs(value)),
+            is_claim=is_claim,
+            is_percent=bool(match.group("pct") or match.group("bps")),
+        ))
+
+    return numbers
+
+
+def _context_candidates(context: str) -> tuple[list[float], list[float]]:
+    """
+    Build the sorted values a claim may match in the context.
+
+    Returns (all context values, values written as percentages). A claim is
+    compared with its fraction/percent equivalents (x100, /100) only against
+    percentages, unless the claim itself is one.
+    """
+    values, percents = set(), set()
+    for number in _parse_numbers(context):
+        value = abs(number.value)
+        values.add(value)
+        if number.is_percent:
+            percents.add(value)
+    return sorted(values), sorted(percents)
+
+
+def _in_range(value: float, tolerance: float, candidates: list[float]) -> bool:
+    """Check whether any candidate lies within tolerance of value."""
+    i = bisect_left(candidates, value - tolerance)
+    return i < len(candidates) and candidates[i] <= value + tolerance
+
+
+def _matches(claim: NumericClaim, candidates: tuple[list[float], list[float]]) -> bool:
+    """Check a claim against the context, allowing fraction/percent forms."""
+    values, percents = candidates
+    value, tolerance = abs(claim.value), claim.tolerance
+    if _in_range(value, tolerance, values):
+        return True
+    scaled = values if claim.is_percent else percents
+    return any(
+        _in_range(value * factor, tolerance * factor, scaled) for factor in (100, 0.01)
+    )
+
+
+def extract_fund_names(text: str) -> list[str]:
+    """Extract fund-like proper names (e.g. "Example Growth Fund II LP")."""
+    names = []
+    for match in _FUND_NAME_PATTERN.finditer(text):
+        words = match.group(1).split()
+        while words and words[0].lower() in _LEADING_STOPWORDS:
+            words = words[1:]
+        # A bare suffix ("Fund") is not a name
+        if len(words) >= 2:
+            names.append(" ".join(words))
+    return names
+
+
+def collect_entity_names(docs: Iterable) -> set[str]:
+    """Collect fund, model and portfolio names from document metadata."""
+    names = set()
+    for doc in docs:
+        metadata = getattr(doc, "metadata", None) or {}
+        for key in ("fund_name", "model_name", "portfolio_name"):
+            name = metadata.get(key)
+            if isinstance(name, str) and name.strip():
+                names.add(name.strip())
+    return names
+
+
+def verify_grounding(
+    generation: str,
+    context: str,
+    known_names: Iterable[str] = (),
+) -> GroundingResult:
+    """
+    Verify numeric claims and fund names in a generation against its context.
+
+    Args:
+        generation: The generated answer
+        context: The packed context the answer was generated from
+        known_names: Entity names from document metadata (also count as context)
+
+    Returns:
+        GroundingResult with verdict "grounded", "not_grounded", or None
+        when the answer has too few checkable claims or only a few misses.
+    """
+    start_time = time.perf_counter()
+    result = GroundingResult(verdict=None)
+
+    if not generation:
+        return result
+
+    candidates = _context_candidates(context)
+    numeric_claims = 0
+    for number in _parse_numbers(generation):
+        if not number.is_claim:
+            continue
+        numeric_claims += 1
+        if _matches(number, candidates):
+            result.matched.append(number.text)
+        else:
+            result.unmatched.append(number.text)
+
+    haystack = context.lower() + "\n" + "\n".join(known_names).lower()
+    for name in extract_fund_names(generation):
+        if name.lower() in haystack:
+            result.matched.append(name)
+        else:
+            result.unmatched.append(name)
+
+    total = result.claim_count
+    if total > 0:
+        if not result.unmatched:
+            # A single matched number is too little evidence to skip the LLM check
+            if len(result.matched) >= GROUNDED_MIN_CLAIMS and numeric_claims > 0:
+                result.verdict = "grounded"
+        elif (
+            len(result.unmatched) >= NOT_GROUNDED_MIN_CLAIMS
+            and len(result.unmatched) / total >= NOT_GROUNDED_RATIO
+        ):
+            result.verdict = "not_grounded"
+
+    result.elapsed_ms = (time.perf_counter() - start_time) * 1000
+    return result
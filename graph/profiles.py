@@ -0,0 +1,65 @@
+"""Request-level latency profiles for the Prism workflow.
+
+A profile turns pipeline stages on or off and sets retrieval and grading
+depth, so simple lookups (dashboard tooltips, app_education FAQs) can skip
+LLM routing, expansion and grading while research queries keep the full
+CRAG pipeline.
+
+- fast: local routing, no expansion, local grading, k=5
+- balanced: hybrid routing with fused expansion, LLM grades the top 5 of k=8
+- thorough: full pipeline (LLM grading of all 10 docs, Cohere rerank)
+
+Per-domain defaults live in settings.domain_profiles.
+"""
+
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from config import settings
+
+ProfileName = Literal["fast", "balanced", "thorough"]
+
+
+@dataclass(frozen=True)
+class PipelineProfile:
+    """Stage switches and depths for one latency profile."""
+
+    name: str
+    llm_routing: bool  # Allow the LLM router (False = local classifier only)
+    expand_query: bool  # LLM query expansion before retrieval
+    grading: Literal["llm", "local"]
+    k: int  # Docs per retriever, and docs kept after intent filtering
+    grade_depth: int  # Top docs graded by the LLM; the rest are graded locally
+    rerank: bool  # Cohere rerank (False = sort by grade score)
+    context_docs: int  # Max relevant docs passed to generation
+
+
+PROFILES: dict[str, PipelineProfile] = {
+    "fast": PipelineProfile(
+        name="fast", llm_routing=False, expand_query=False, grading="local",
+        k=5, grade_depth=0, rerank=False, context_docs=3,
+    ),
+    "balanced": PipelineProfile(
+        name="balanced", llm_routing=True, expand_query=True, grading="llm",
+        k=8, grade_depth=5, rerank=False, context_docs=5,
+    ),
+    "thorough": PipelineProfile(
+        name="thorough", llm_routing=True, expand_query=True, grading="llm",
+        k=10, grade_depth=10, rerank=True, context_docs=10,
+    ),
+}
+
+DEFAULT_PROFILE = "thorough"
+
+
+def resolve_profile(name: Optional[str], domain: str) -> str:
+    """Pick the requested profile, else the domain default from settings."""
+    if name in PROFILES:
+        return name
+    default = settings.domain_profiles.get(domain, settings.default_profile)
+    return default if default in PROFILES else DEFAULT_PROFILE
+
+
+def get_profile(state) -> PipelineProfile:
+    """Get the profile for a workflow state."""
+    return PROFILES.get(state.get("profile") or DEFAULT_PROFILE, PROFILES[DEFAULT_PROFILE])
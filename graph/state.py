@@ -5,6 +5,8 @@ from langchain_core.messages import BaseMessage
 from langchain_core.documents import Document
 from langgraph.graph.message import add_messages
 
+from .deadline import merge_degradations
+
 
 class GradedDocument(TypedDict):
     """Document with relevance grade."""
@@ -33,12 +35,22 @@ class PrismState(TypedDict):
     prompt_name: Optional[str]  # Custom prompt template from prompts.py
     app_context: Optional[dict]  # User's computed results for interpretation
 
+    # Latency profile: fast, balanced, thorough (see graph/profiles.py)
+    profile: str
+
+    # Request deadline (epoch seconds) and degradations applied to meet it
+    deadline: Optional[float]
+    degradations: Annotated[list[str], merge_degradations]
+
     # Intent classification for routing
     intent: Literal["archetype", "pipeline", "clarity", "general"]
 
     # Current query (extracted from latest message)
     query: str
 
+    # Query with expanded search terms (set by the fused route+expand LLM call)
+    expanded_query: Optional[str]
+
     # Retrieval results
     retrieved_docs: list[Document]
     graded_docs: list[GradedDocument]
@@ -55,6 +67,11 @@ class PrismState(TypedDict):
     generation: str
     sources: list[dict]
 
+    # Documents and per-document character limit the generation prompt was
+    # packed from, so the hallucination check verifies against the same context
+    context_docs: list[Document]
+    context_max_chars: int
+
     # Session tracking
     thread_id: str
     turn_count: int
@@ -68,6 +85,8 @@ def get_initial_state(
     domain: str = "investments",
     prompt_name: Optional[str] = None,
     app_context: Optional[dict] = None,
+    profile: str = "thorough",
+    deadline: Optional[float] = None,
 ) -> PrismState:
     """Create initial state for a new conversation."""
     return PrismState(
@@ -77,8 +96,12 @@ def get_initial_state(
         domain=domain,
         prompt_name=prompt_name,
         app_context=app_context,
+        profile=profile,
+        deadline=deadline,
+        degradations=None,  # Resets the previous turn's list (see merge_degradations)
         intent="general",
         query="",
+        expanded_query=None,
         retrieved_docs=[],
         graded_docs=[],
         needs_web_search=False,
@@ -87,6 +110,8 @@ def get_initial_state(
         answer_useful=None,
         generation="",
         sources=[],
+        context_docs=[],  # Set by generate_response
+        context_max_chars=0,
         thread_id=thread_id,
         turn_count=0,
     )
@@ -4,13 +4,18 @@ import logging
 import os
 from typing import Literal, Optional
 
-from langgraph.graph import END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
 # For production: from langgraph.checkpoint.postgres import PostgresSaver
 
+from config import settings
+from utils.metrics import instrument_node
+
+from .checkpoint import create_checkpointer
+from .deadline import make_deadline
+from .profiles import resolve_profile
 from .state import PrismState, get_initial_state
 from .nodes.route import route_intent, should_retrieve
-from .nodes.retrieve import retrieve_documents
+from .nodes.retrieve import retrieve_documents, retrieve_candidates, apply_intent_filter
 from .nodes.grade import grade_documents, should_web_search, rerank_documents
 from .nodes.generate import generate_response, check_hallucination, respond_directly
 
@@ -61,13 +66,13 @@ def create_workflow() -> StateGraph:
     workflow = StateGraph(PrismState)
 
     # Add nodes
-    workflow.add_node("route_intent", route_intent)
-    workflow.add_node("retrieve", retrieve_documents)
-    workflow.add_node("grade", grade_documents)  # Parallel grading via sync wrapper
-    workflow.add_node("rerank", rerank_documents)
-    workflow.add_node("generate", generate_response)
-    workflow.add_node("respond_directly", respond_directly)
-    workflow.add_node("check_hallucination", check_hallucination)
+    workflow.add_node("route_intent", instrument_node("route_intent", route_intent))
+    workflow.add_node("retrieve", instrument_node("retrieve", retrieve_documents))
+    workflow.add_node("grade", instrument_node("grade", grade_documents))  # Parallel grading via sync wrapper
+    workflow.add_node("rerank", instrument_node("rerank", rerank_documents))
+    workflow.add_node("generate", instrument_node("generate", generate_response))
+    workflow.add_node("respond_directly", instrument_node("respond_directly", respond_directly))
+    workflow.add_node("check_hallucination", instrument_node("check_hallucination", check_hallucination))
 
     # Set entry point
     workflow.set_entry_point("route_intent")
@@ -105,6 +110,81 @@ def create_workflow() -> StateGraph:
     return workflow
 
 
+# Keys written by route_intent; the parallel branch only returns these so it
+# doesn't collide with retrieve_candidates writing retrieved_docs
+ROUTE_OUTPUT_KEYS = ("query", "intent", "archetype", "region", "degradations")
+
+
+def _route_branch(state: PrismState) -> dict:
+    """Run route_intent without query expansion and return only the keys it owns."""
+    # Retrieval already ran on the raw query, so an expansion would go unused
+    routed = route_intent(dict(state), expand=False)
+    return {key: routed[key] for key in ROUTE_OUTPUT_KEYS if key in routed}
+
+
+def create_parallel_workflow() -> StateGraph:
+    r"""
+    Create the Prism RAG workflow with routing and retrieval in parallel.
+
+    Retrieval doesn't need the intent to embed and score the raw query, so
+    hybrid search (embedding call + BM25) runs alongside intent classification.
+    The join node applies filter_by_intent and archetype/region boosts once
+    both finish, so this stage takes ~max(route, retrieve) instead of the sum.
+
+    Trade-off: no LLM query expansion on this path (routing doesn't ask for
+    one), and greetings still pay for a retrieval that respond_directly discards.
+
+    ```
+          START
+         /     \
+        v       v
+    route_intent  retrieve_candidates
+        \       /
+         v     v
+    apply_intent_filter
+          |
+          v
+    [should_retrieve?]
+      |         \
+      v          v
+    grade      respond_directly --> END
+      |
+      v
+    rerank --> generate --> END
+    ```
+    """
+    workflow = StateGraph(PrismState)
+
+    workflow.add_node("route_intent", instrument_node("route_intent", _route_branch))
+    workflow.add_node("retrieve_candidates", instrument_node("retrieve_candidates", retrieve_candidates))
+    workflow.add_node("apply_intent_filter", instrument_node("apply_intent_filter", apply_intent_filter))
+    workflow.add_node("grade", instrument_node("grade", grade_documents))
+    workflow.add_node("rerank", instrument_node("rerank", rerank_documents))
+    workflow.add_node("generate", instrument_node("generate", generate_response))
+    workflow.add_node("respond_directly", instrument_node("respond_directly", respond_directly))
+
+    # Fan out from START, join when both branches complete
+    workflow.add_edge(START, "route_intent")
+    workflow.add_edge(START, "retrieve_candidates")
+    workflow.add_edge(["route_intent", "retrieve_candidates"], "apply_intent_filter")
+
+    workflow.add_conditional_edges(
+        "apply_intent_filter",
+        should_retrieve,
+        {
+            "retrieve": "grade",
+            "respond_directly": "respond_directly",
+        }
+    )
+
+    workflow.add_edge("grade", "rerank")
+    workflow.add_edge("rerank", "generate")
+    workflow.add_edge("generate", END)
+    workflow.add_edge("respond_directly", END)
+
+    return workflow
+
+
 def create_workflow_with_reflection() -> StateGraph:
     """
     Create workflow with Self-RAG reflection enabled.
@@ -133,24 +213,30 @@ def create_workflow_with_reflection() -> StateGraph:
 def compile_app(
     checkpointer: Optional[object] = None,
     enable_memory: bool = True,
+    parallel: Optional[bool] = None,
 ) -> object:
     """
     Compile the workflow into a runnable app.
 
     Args:
         checkpointer: Optional checkpointer for persistence (PostgresSaver for production)
-        enable_memory: Whether to enable in-memory checkpointing
+        enable_memory: Whether to enable the bounded conversation checkpointer
+                       (memory or SQLite, per settings.checkpoint_backend)
+        parallel: Use the parallel route/retrieve topology
+                  (defaults to settings.parallel_workflow)
 
     Returns:
         Compiled LangGraph app
     """
-    workflow = create_workflow()
+    if parallel is None:
+        parallel = settings.parallel_workflow
+    workflow = create_parallel_workflow() if parallel else create_workflow()
 
     if checkpointer:
         return workflow.compile(checkpointer=checkpointer)
     elif enable_memory:
-        # Use in-memory checkpointer for development
-        memory = MemorySaver()
+        # Bounded in-memory (or local SQLite) checkpointer
+        memory = create_checkpointer()
         return workflow.compile(checkpointer=memory)
     else:
         return workflow.compile()
@@ -199,6 +285,8 @@ async def invoke_prism(
     domain: str = "investments",
     prompt_name: Optional[str] = None,
     app_context: Optional[dict] = None,
+    profile: Optional[str] = None,
+    timeout_ms: Optional[int] = None,
 ) -> dict:
     """
     Invoke the Prism RAG workflow.
@@ -211,6 +299,8 @@ async def invoke_prism(
         domain: Collection domain (investments, app_education, etc.)
         prompt_name: Custom prompt template for generation
         app_context: User's computed results for interpretation
+        profile: Latency profile (fast, balanced, thorough); defaults per domain
+        timeout_ms: Overall time budget; nodes degrade to stay within it
 
     Returns:
         dict with answer, sources, and metadata
@@ -227,6 +317,8 @@ async def invoke_prism(
         domain=domain,
         prompt_name=prompt_name,
         app_context=app_context,
+        profile=resolve_profile(profile, domain),
+        deadline=make_deadline(timeout_ms),
     )
 
     # Add query as message
@@ -242,6 +334,8 @@ async def invoke_prism(
         "intent": result.get("intent", "general"),
         "retrieval_quality": result.get("retrieval_quality", "unknown"),
         "turn_count": result.get("turn_count", 1),
+        "profile": result.get("profile"),
+        "degradations": result.get("degradations") or [],
     }
 
 
@@ -253,6 +347,8 @@ def invoke_prism_sync(
     domain: str = "investments",
     prompt_name: Optional[str] = None,
     app_context: Optional[dict] = None,
+    profile: Optional[str] = None,
+    timeout_ms: Optional[int] = None,
 ) -> dict:
     """Synchronous version of invoke_prism."""
     from langchain_core.messages import HumanMessage
@@ -266,6 +362,8 @@ def invoke_prism_sync(
         domain=domain,
         prompt_name=prompt_name,
         app_context=app_context,
+        profile=resolve_profile(profile, domain),
+        deadline=make_deadline(timeout_ms),
     )
     initial_state["messages"] = [HumanMessage(content=query)]
 
@@ -278,6 +376,8 @@ def invoke_prism_sync(
         "intent": result.get("intent", "general"),
         "retrieval_quality": result.get("retrieval_quality", "unknown"),
         "turn_count": result.get("turn_count", 1),
+        "profile": result.get("profile"),
+        "degradations": result.get("degradations") or [],
     }
 
 
@@ -286,6 +386,9 @@ async def stream_prism(
     thread_id: str,
     archetype: Optional[str] = None,
     region: str = "US",
+    domain: str = "investments",
+    profile: Optional[str] = None,
+    timeout_ms: Optional[int] = None,
 ):
     """
     Stream Prism RAG workflow events.
@@ -300,6 +403,9 @@ async def stream_prism(
         thread_id=thread_id,
         archetype=archetype,
         region=region,
+        domain=domain,
+        profile=resolve_profile(profile, domain),
+        deadline=make_deadline(timeout_ms),
     )
     initial_state["messages"] = [HumanMessage(content=query)]
 
@@ -326,4 +432,5 @@ async def stream_prism(
                     "answer": output.get("generation", ""),
                     "sources": output.get("sources", []),
                     "intent": output.get("intent", "general"),
+                    "degradations": output.get("degradations") or [],
                 }
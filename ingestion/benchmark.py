@@ -0,0 +1,279 @@
+"""Loader microbenchmark.
+
+Times the tabular loaders on every CSV in a directory (data/holdings by
+default) against the per-row iterrows() renderers they replaced, which are
+kept here as a baseline. The CSV parse time is reported separately, so the
+text rendering cost of each loader is the difference between the two.
+
+Usage:
+    python -m ingestion.benchmark
+    python -m ingestion.benchmark --data-dir data/holdings --repeat 20
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pandas as pd
+from llama_index.core import Document
+
+from .loaders import load_fund_holdings_csv, load_portfolio_csv
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    """Parse a CSV the way the loaders do."""
+    try:
+        return pd.read_csv(path, encoding="utf-8")
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding="latin-1")
+
+
+# Baseline: the loaders as they were before column-wise rendering (one Series
+# per row from df.iterrows()). Their documents must match the current loaders.
+
+def iterrows_fund_holdings_csv(file_path: Path) -> List[Document]:
+    """load_fund_holdings_csv with per-row rendering (baseline)."""
+    df = _read_csv(file_path)
+    fund_type = file_path.stem.split("_")[0].upper()
+
+    summary = f"""Fund Holdings: {fund_type}
+Total Positions: {len(df)}
+File: {file_path.name}
+"""
+    if "Weight" in df.columns:
+        total_weight = df["Weight"].sum()
+        summary += f"Total Weight: {total_weight:.2%}\n"
+
+    documents = [Document(
+        text=summary,
+        metadata={
+            "source": str(file_path),
+            "file_name": file_path.name,
+            "document_type": "fund_holdings_summary",
+            "fund_type": fund_type,
+            "num_positions": len(df),
+        }
+    )]
+
+    chunk_size = 50
+    for i in range(0, len(df), chunk_size):
+        chunk = df.iloc[i:i + chunk_size]
+
+        holdings_text = []
+        for _, row in chunk.iterrows():
+            name = row.get("Name", row.get("Security", row.iloc[0]))
+            weight = row.get("Weight", "N/A")
+            if isinstance(weight, float):
+                weight = f"{weight:.4%}"
+            holdings_text.append(f"- {name}: {weight}")
+
+        documents.append(Document(
+            text=f"{fund_type} Holdings (Positions {i + 1}-{i + len(chunk)}):\n" + "\n".join(holdings_text),
+            metadata={
+                "source": str(file_path),
+                "file_name": file_path.name,
+                "document_type": "fund_holdings_detail",
+                "fund_type": fund_type,
+                "chunk_index": i // chunk_size,
+            }
+        ))
+
+    return documents
+
+
+def iterrows_portfolio_csv(file_path: Path, portfolio_name: Optional[str] = None) -> List[Document]:
+    """load_portfolio_csv with per-row rendering (baseline)."""
+    documents = []
+    df = _read_csv(file_path)
+
+    name_col = None
+    for col in ["Portfolio Name", "Benchmark Name", "Model Name", "Model"]:
+        if col in df.columns:
+            name_col = col
+            break
+
+    if name_col and "Weight" in df.columns:
+        for model_name, group in df.groupby(name_col):
+            group_sorted = group.sort_values("Weight", ascending=False)
+
+            holdings_lines = []
+            total_weight = 0.0
+            for _, row in group_sorted.iterrows():
+                fund = row.get("Tier4", row.get("Name", "Unknown"))
+                weight = row.get("Weight", 0)
+                total_weight += weight
+                holdings_lines.append(f"- {fund}: {weight:.2%}")
+
+            holdings_text = "\n".join(holdings_lines)
+
+            doc_text = f"""Portfolio Model: {model_name}
+
+COMPLETE ALLOCATION BREAKDOWN:
+Total Holdings: {len(group)}
+Total Weight: {total_weight:.2%}
+
+All Holdings (sorted by weight):
+{holdings_text}
+
+This is the complete allocation for the {model_name} portfolio model.
+"""
+            documents.append(Document(
+                text=doc_text,
+                metadata={
+                    "source": str(file_path),
+                    "file_name": file_path.name,
+                    "document_type": "portfolio_model_complete",
+                    "portfolio_name": model_name,
+                    "model_name": model_name,
+                    "num_holdings": len(group),
+                    "total_weight": total_weight,
+                }
+            ))
+
+            top_5 = group_sorted.head(5)
+            top_5_text = "\n".join([
+                f"- {row.get('Tier4', 'Unknown')}: {row['Weight']:.2%}"
+                for _, row in top_5.iterrows()
+            ])
+
+            summary_text = f"""Portfolio: {model_name}
+Top 5 Holdings:
+{top_5_text}
+
+Total holdings in {model_name}: {len(group)}
+"""
+            documents.append(Document(
+                text=summary_text,
+                metadata={
+                    "source": str(file_path),
+                    "file_name": file_path.name,
+                    "document_type": "portfolio_summary",
+                    "portfolio_name": model_name,
+                    "model_name": model_name,
+                    "num_holdings": len(group),
+                }
+            ))
+
+        return documents
+
+    if portfolio_name is None:
+        portfolio_name = file_path.stem.replace("_", " ").title()
+
+    if "Weight" in df.columns:
+        top_holdings = df.nlargest(10, "Weight") if len(df) > 10 else df
+        holdings_text = "\n".join([
+            f"- {row.get('Tier4', row.get('Name', 'Unknown'))}: {row['Weight']:.2%}"
+            for _, row in top_holdings.iterrows()
+        ])
+
+        summary = f"""Portfolio: {portfolio_name}
+Total Holdings: {len(df)}
+Top Holdings:
+{holdings_text}
+"""
+        documents.append(Document(
+            text=summary,
+            metadata={
+                "source": str(file_path),
+                "file_name": file_path.name,
+                "document_type": "portfolio_summary",
+                "portfolio_name": portfolio_name,
+                "num_holdings": len(df),
+            }
+        ))
+
+    chunk_size = 20
+    for i in range(0, len(df), chunk_size):
+        chunk = df.iloc[i:i + chunk_size]
+        holdings_text = "\n".join([
+            f"{row.get('Tier4', row.get('Name', 'Unknown'))}: "
+            f"{row.get('Weight', 0):.2%} allocation"
+            for _, row in chunk.iterrows()
+        ])
+
+        documents.append(Document(
+            text=f"Portfolio: {portfolio_name}\nHoldings (Part {i // chunk_size + 1}):\n{holdings_text}",
+            metadata={
+                "source": str(file_path),
+                "file_name": file_path.name,
+                "document_type": "portfolio_holdings",
+                "portfolio_name": portfolio_name,
+                "chunk_index": i // chunk_size,
+            }
+        ))
+
+    return documents
+
+
+# name: (current loader, iterrows baseline)
+LOADERS: dict[str, tuple[Callable, Callable]] = {
+    "fund_holdings": (load_fund_holdings_csv, iterrows_fund_holdings_csv),
+    "portfolio": (load_portfolio_csv, iterrows_portfolio_csv),
+}
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(data_dir: Path, repeat: int) -> list[dict]:
+    """Benchmark each loader and its baseline on each CSV in data_dir. Returns one row per (file, loader)."""
+    results = []
+    for path in sorted(Path(data_dir).glob("*.csv")):
+        rows = len(_read_csv(path))
+        parse_ms = _median_ms(lambda: _read_csv(path), repeat)
+        for name, (loader, baseline) in LOADERS.items():
+            documents = loader(path)
+            results.append({
+                "file": path.name,
+                "loader": name,
+                "rows": rows,
+                "documents": len(documents),
+                "parse_ms": parse_ms,
+                "baseline_ms": _median_ms(lambda: baseline(path), repeat),
+                "load_ms": _median_ms(lambda: loader(path), repeat),
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the tabular document loaders")
+    parser.add_argument("--data-dir", type=Path, default=Path("data/holdings"))
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    results = run(args.data_dir, args.repeat)
+    if not results:
+        print(f"No CSV files in {args.data_dir}")
+        return
+
+    print(
+        f"{'file':<34} {'loader':<14} {'rows':>6} {'docs':>5} {'parse ms':>9} "
+        f"{'iterrows ms':>12} {'load ms':>9} {'speedup':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['file']:<34} {r['loader']:<14} {r['rows']:>6} {r['documents']:>5} {r['parse_ms']:>9.2f} "
+            f"{r['baseline_ms']:>12.2f} {r['load_ms']:>9.2f} {r['baseline_ms'] / r['load_ms']:>7.1f}x"
+        )
+    for name in LOADERS:
+        loader_rows = [r for r in results if r["loader"] == name]
+        baseline = sum(r["baseline_ms"] for r in loader_rows)
+        total = sum(r["load_ms"] for r in loader_rows)
+        baseline_rendering = sum(r["baseline_ms"] - r["parse_ms"] for r in loader_rows)
+        rendering = sum(r["load_ms"] - r["parse_ms"] for r in loader_rows)
+        print(
+            f"{name}: {baseline:.1f} -> {total:.1f} ms total "
+            f"(rendering {baseline_rendering:.1f} -> {rendering:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Chunk embedding cache and batched, concurrent embedder for ingestion.
+
+Re-ingestion re-embeds a lot of identical text (repeated FAQ sections, fund
+descriptions, unchanged holdings rows). Embeddings are cached on disk in
+SQLite keyed by (model, SHA-256 of the embedded text), so a chunk is only
+sent to the embedding API once per model.
+
+Cache misses are embedded in batches of batch_size with up to concurrency
+requests in flight; failed batches are retried with exponential backoff.
+Nodes get their embedding set before they are upserted into the vector
+store.
+
+Usage:
+    embedder = CachedEmbedder(Settings.embed_model, EmbeddingCache(path), model_key="openai:text-embedding-3-small")
+    embedder.embed_nodes(nodes)
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from utils.resilience import with_retry
+
+logger = logging.getLogger(__name__)
+
+_EMBEDDING_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+"""
+
+# SQLite host parameter limit is 999 on older builds
+LOOKUP_BATCH_SIZE = 500
+
+
+def text_hash(text: str) -> str:
+    """Cache key for an embedded text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk (SQLite, WAL) cache of text embeddings.
+
+    Vectors are stored as float32 blobs (half the size of float64 JSON and
+    well within the precision the vector store keeps).
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: SQLite database path (created if missing)
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(
+            str(path), timeout=5.0, isolation_level=None, check_same_thread=False,
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_EMBEDDING_CACHE_SCHEMA)
+
+    def get_many(self, model: str, hashes: List[str]) -> dict[str, List[float]]:
+        """Cached embeddings for the given text hashes (missing ones are left out)."""
+        found: dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), LOOKUP_BATCH_SIZE):
+                chunk = unique[start:start + LOOKUP_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    (model, *chunk),
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: dict[str, List[float]]) -> None:
+        """Store embeddings by text hash."""
+        now = time.time()
+        rows = [
+            (model, key, len(vector), array("f", vector).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, dimensions, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)
+            ).fetchone()[0]
+
+
+class CachedEmbedder:
+    """
+    Embeds nodes through an EmbeddingCache, batching and parallelizing misses.
+
+    Identical texts within one call are embedded once.
+    """
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        cache: Optional[EmbeddingCache] = None,
+        model_key: Optional[str] = None,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_retries: int = 5,
+    ):
+        """
+        Args:
+            embed_model: LlamaIndex embedding model used for cache misses
+            cache: Embedding cache (None = no caching, batching only)
+            model_key: Cache namespace; must change whenever the vectors would
+                       (defaults to the model's class and model_name)
+            batch_size: Texts per embedding request
+            concurrency: Embedding requests in flight
+            max_retries: Attempts per batch before the ingestion fails
+        """
+        self.embed_model = embed_model
+        self.cache = cache
+        self.model_key = model_key or f"{type(embed_model).__name__}:{embed_model.model_name}"
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self._embed_batch = with_retry(max_attempts=max(1, max_retries), min_wait=1.0, max_wait=30.0)(
+            self.embed_model.get_text_embedding_batch
+        )
+
+        # Stats
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.requests = 0
+        self.seconds = 0.0
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, using cached vectors where available."""
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model_key, hashes) if self.cache is not None else {}
+
+        missing = {key: text for key, text in zip(hashes, texts) if key not in vectors}
+        self.cache_hits += sum(1 for key in hashes if key in vectors)
+        self.cache_misses += len(missing)
+
+        if missing:
+            start = time.time()
+            keys = list(missing)
+            batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+                results = executor.map(
+                    lambda batch: self._embed_batch([missing[key] for key in batch]), batches
+                )
+                for batch, embeddings in zip(batches, results):
+                    computed = dict(zip(batch, embeddings))
+                    # Stored per batch so a failure later on keeps the finished work
+                    if self.cache is not None:
+                        self.cache.put_many(self.model_key, computed)
+                    vectors.update(computed)
+            self.requests += len(batches)
+            self.seconds += time.time() - start
+            logger.info(
+                f"Embedded {len(missing)} chunks in {len(batches)} requests "
+                f"({len(texts) - len(missing)} from cache) in {time.time() - start:.1f}s"
+            )
+
+        return [vectors[key] for key in hashes]
+
+    def embed_nodes(self, nodes: List[BaseNode]) -> None:
+        """Set the embedding of each node that has none."""
+        pending = [node for node in nodes if node.embedding is None]
+        if not pending:
+            return
+        # Same text the index would embed (content plus embed-visible metadata)
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in pending]
+        for node, embedding in zip(pending, self.embed_texts(texts)):
+            node.embedding = embedding
+
+    def stats(self) -> dict:
+        total = self.cache_hits + self.cache_misses
+        return {
+            "model": self.model_key,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "hit_rate": round(self.cache_hits / total, 3) if total else 0.0,
+            "requests": self.requests,
+            "embed_seconds": round(self.seconds, 2),
+            "cached_embeddings": self.cache.count(self.model_key) if self.cache is not None else 0,
+        }
@@ -9,6 +9,33 @@ import pandas as pd
 from llama_index.core import Document
 from llama_index.readers.file import PyMuPDFReader
 
+from .workbook import is_blank, read_workbook, sheet_frame
+
+# Bump when loader output changes, so incremental ingestion replaces existing chunks
+LOADER_VERSION = "1"
+
+
+# Tabular loaders render document text column-wise (one pass over each column)
+# instead of building a Series per row with df.iterrows()
+
+def _text_column(df: pd.DataFrame, columns: List[str], default: str) -> pd.Series:
+    """First of columns present in df as strings, else a constant column."""
+    for col in columns:
+        if col in df.columns:
+            return df[col].astype(str)
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _format_percent(values: pd.Series, decimals: int = 2) -> pd.Series:
+    """Format a numeric column as percentages (0.1234 -> '12.34%')."""
+    return values.map(f"{{:.{decimals}%}}".format)
+
+
+def _join_chunks(lines: pd.Series, size: int) -> List[str]:
+    """Join consecutive runs of size lines."""
+    lines = lines.tolist()
+    return ["\n".join(lines[i:i + size]) for i in range(0, len(lines), size)]
+
 
 def preprocess_pdf_text(text: str) -> str:
     """
@@ -138,7 +165,7 @@ def load_model_archetypes(file_path: Path) -> List[Document]:
     Creates rich, searchable documents for each fund and model.
     """
     documents = []
-    xl = pd.ExcelFile(file_path, engine='openpyxl')
+    sheets = read_workbook(file_path, sheet_names=["LIST", "ALL MODELS", "ALL MODELS (INT)"])
 
     # Priority metadata for all documents from this file
     base_metadata = {
@@ -150,11 +177,11 @@ def load_model_archetypes(file_path: Path) -> List[Document]:
     }
 
     # 1. Process LIST sheet - Master fund database
-    if "LIST" in xl.sheet_names:
-        df = pd.read_excel(xl, sheet_name="LIST")
+    if "LIST" in sheets:
+        df = sheet_frame(sheets["LIST"], header=0)
 
         # Create individual fund documents for better retrieval
-        for _, row in df.iterrows():
+        for row in df.to_dict("records"):
             if pd.isna(row.get("NAME")):
                 continue
 
@@ -191,10 +218,13 @@ Description:
             ))
 
         # Also create a summary document listing all funds
-        fund_summary = "Model Archetypes - Complete Fund Universe:\n\n"
-        for _, row in df.iterrows():
-            if pd.notna(row.get("NAME")):
-                fund_summary += f"• {row['NAME']} ({row.get('ASSET CLASS', 'N/A')}) - {row.get('IMPACT THEME', 'N/A')}\n"
+        named = df[df["NAME"].notna()] if "NAME" in df.columns else df.iloc[:0]
+        fund_lines = (
+            "• " + named["NAME"].astype(str)
+            + " (" + _text_column(named, ["ASSET CLASS"], "N/A")
+            + ") - " + _text_column(named, ["IMPACT THEME"], "N/A") + "\n"
+        ) if len(named) else []
+        fund_summary = "Model Archetypes - Complete Fund Universe:\n\n" + "".join(fund_lines)
 
         documents.append(Document(
             text=fund_summary,
@@ -230,10 +260,10 @@ Description:
     ]
 
     for sheet_name, region in [("ALL MODELS", "US"), ("ALL MODELS (INT)", "International")]:
-        if sheet_name not in xl.sheet_names:
+        if sheet_name not in sheets:
             continue
 
-        df = pd.read_excel(xl, sheet_name=sheet_name, header=None)
+        df = sheet_frame(sheets[sheet_name])
 
         # Parse each model using explicit positions
         for model_name, model_alias, label_col, fund_col, alloc_cols in MODEL_POSITIONS:
@@ -392,26 +422,29 @@ def load_portfolio_csv(file_path: Path, portfolio_name: Optional[str] = None) ->
 
     if name_col and "Weight" in df.columns:
         # GROUP BY PORTFOLIO/MODEL - create one document per model with complete holdings
-        for model_name, group in df.groupby(name_col):
-            # Sort by weight descending
-            group_sorted = group.sort_values("Weight", ascending=False)
-
-            # Build complete holdings list
-            holdings_lines = []
-            total_weight = 0.0
-            for _, row in group_sorted.iterrows():
-                fund = row.get("Tier4", row.get("Name", "Unknown"))
-                weight = row.get("Weight", 0)
-                total_weight += weight
-                holdings_lines.append(f"- {fund}: {weight:.2%}")
-
-            holdings_text = "\n".join(holdings_lines)
+        weights = _format_percent(df["Weight"])
+        df = df.assign(
+            _line="- " + _text_column(df, ["Tier4", "Name"], "Unknown") + ": " + weights,
+            _top_line="- " + _text_column(df, ["Tier4"], "Unknown") + ": " + weights,
+        ).sort_values([name_col, "Weight"], ascending=[True, False])
+
+        # Holdings lists (sorted by weight descending) joined per model
+        grouped = df.groupby(name_col)
+        models = pd.DataFrame({
+            "holdings_text": grouped["_line"].agg("\n".join),
+            "top_5_text": grouped["_top_line"].agg(lambda lines: "\n".join(lines.iloc[:5])),
+            "num_holdings": grouped.size(),
+            "total_weight": grouped["Weight"].sum(),
+        })
+
+        for model_name, holdings_text, top_5_text, num_holdings, total_weight in models.itertuples(name=None):
+            num_holdings, total_weight = int(num_holdings), float(total_weight)
 
             # Create comprehensive document for this model
             doc_text = f"""Portfolio Model: {model_name}
 
 COMPLETE ALLOCATION BREAKDOWN:
-Total Holdings: {len(group)}
+Total Holdings: {num_holdings}
 Total Weight: {total_weight:.2%}
 
 All Holdings (sorted by weight):
@@ -427,23 +460,17 @@ This is the complete allocation for the {model_name} portfolio model.
                     "document_type": "portfolio_model_complete",
                     "portfolio_name": model_name,
                     "model_name": model_name,
-                    "num_holdings": len(group),
+                    "num_holdings": num_holdings,
                     "total_weight": total_weight,
                 }
             ))
 
             # Also create a summary for quick retrieval
-            top_5 = group_sorted.head(5)
-            top_5_text = "\n".join([
-                f"- {row.get('Tier4', 'Unknown')}: {row['Weight']:.2%}"
-                for _, row in top_5.iterrows()
-            ])
-
             summary_text = f"""Portfolio: {model_name}
 Top 5 Holdings:
 {top_5_text}
 
-Total holdings in {model_name}: {len(group)}
+Total holdings in {model_name}: {num_holdings}
 """
             documents.append(Document(
                 text=summary_text,
@@ -453,7 +480,7 @@ Total holdings in {model_name}: {len(group)}
                     "document_type": "portfolio_summary",
                     "portfolio_name": model_name,
                     "model_name": model_name,
-                    "num_holdings": len(group),
+                    "num_holdings": num_holdings,
                 }
             ))
 
@@ -463,13 +490,14 @@ Total holdings in {model_name}: {len(group)}
     if portfolio_name is None:
         portfolio_name = file_path.stem.replace("_", " ").title()
 
+    funds = _text_column(df, ["Tier4", "Name"], "Unknown")
+
     # Create a summary document for the entire portfolio
     if "Weight" in df.columns:
         top_holdings = df.nlargest(10, "Weight") if len(df) > 10 else df
-        holdings_text = "\n".join([
-            f"- {row.get('Tier4', row.get('Name', 'Unknown'))}: {row['Weight']:.2%}"
-            for _, row in top_holdings.iterrows()
-        ])
+        holdings_text = "\n".join(
+            "- " + funds.loc[top_holdings.index] + ": " + _format_percent(top_holdings["Weight"])
+        )
 
         summary = f"""Portfolio: {portfolio_name}
 Total Holdings: {len(df)}
@@ -489,22 +517,17 @@ Top Holdings:
 
     # Create documents for each holding (chunked by groups of 20)
     chunk_size = 20
-    for i in range(0, len(df), chunk_size):
-        chunk = df.iloc[i:i + chunk_size]
-        holdings_text = "\n".join([
-            f"{row.get('Tier4', row.get('Name', 'Unknown'))}: "
-            f"{row.get('Weight', 0):.2%} allocation"
-            for _, row in chunk.iterrows()
-        ])
-
+    weights = _format_percent(df["Weight"]) if "Weight" in df.columns else f"{0:.2%}"
+    lines = funds + ": " + weights + " allocation"
+    for chunk_index, holdings_text in enumerate(_join_chunks(lines, chunk_size)):
         documents.append(Document(
-            text=f"Portfolio: {portfolio_name}\nHoldings (Part {i // chunk_size + 1}):\n{holdings_text}",
+            text=f"Portfolio: {portfolio_name}\nHoldings (Part {chunk_index + 1}):\n{holdings_text}",
             metadata={
                 "source": str(file_path),
                 "file_name": file_path.name,
                 "document_type": "portfolio_holdings",
                 "portfolio_name": portfolio_name,
-                "chunk_index": i // chunk_size,
+                "chunk_index": chunk_index,
             }
         ))
 
@@ -563,22 +586,22 @@ def _process_returns_risk_sheet(
         df = df.iloc[header_row + 1:].reset_index(drop=True)
 
     # Create a document for each asset class row
-    for _, row in df.iterrows():
-        asset_class = row.iloc[0]
+    columns = list(df.columns)
+    labels = [str(col) for col in columns]
+    present = df.notna().to_numpy()
+    for values, row_present in zip(df.to_numpy(dtype=object), present):
+        asset_class = values[0] if len(values) else None
         if pd.isna(asset_class) or not str(asset_class).strip():
             continue
 
         asset_class = str(asset_class).strip()
 
-        # Build metrics list
-        metrics = []
-        for col, val in row.items():
-            if pd.notna(val) and str(col) != asset_class:
-                # Format percentages nicely
-                if isinstance(val, float) and abs(val) < 1:
-                    metrics.append(f"{col}: {val:.2%}")
-                else:
-                    metrics.append(f"{col}: {val}")
+        # Build metrics list (percentages formatted nicely)
+        metrics = [
+            f"{col}: {val:.2%}" if isinstance(val, float) and abs(val) < 1 else f"{col}: {val}"
+            for col, label, val, is_present in zip(columns, labels, values, row_present)
+            if is_present and label != asset_class
+        ]
 
         text = f"""Capital Market Assumption: {asset_class}
 Source: {file_path.name} / {sheet_name}
@@ -738,22 +761,20 @@ def load_cma_excel(file_path: Path, priority: str = "normal") -> List[Document]:
     }
 
     try:
-        xl = pd.ExcelFile(file_path, engine='openpyxl')
+        # Every sheet parsed once (or loaded from the workbook cache)
+        sheets = read_workbook(file_path)
     except Exception as e:
         print(f"Warning: Failed to open Excel file {file_path}: {e}")
         return documents
 
-    for sheet_name in xl.sheet_names:
+    for sheet_name, raw in sheets.items():
         try:
-            # Read with header=None to preserve structure
-            df = pd.read_excel(xl, sheet_name=sheet_name, header=None)
-
             # Skip empty sheets
-            if df.empty or df.isna().all().all():
+            if is_blank(raw):
                 continue
 
-            # Also read with default header for some processing
-            df_with_header = pd.read_excel(xl, sheet_name=sheet_name)
+            # Header row detection and typing run on the already-parsed cells
+            df_with_header = sheet_frame(raw, header=0)
 
             # Detect sheet type
             sheet_type = _detect_cma_sheet_type(sheet_name, df_with_header)
@@ -1090,25 +1111,25 @@ File: {file_path.name}
 
     # Chunk holdings for searchability
     chunk_size = 50
-    for i in range(0, len(df), chunk_size):
-        chunk = df.iloc[i:i + chunk_size]
-
-        holdings_text = []
-        for _, row in chunk.iterrows():
-            name = row.get("Name", row.get("Security", row.iloc[0]))
-            weight = row.get("Weight", "N/A")
-            if isinstance(weight, float):
-                weight = f"{weight:.4%}"
-            holdings_text.append(f"- {name}: {weight}")
+    names = _text_column(df, ["Name", "Security", df.columns[0]], "")
+    if "Weight" not in df.columns:
+        weights = "N/A"
+    elif pd.api.types.is_float_dtype(df["Weight"]):
+        weights = _format_percent(df["Weight"], decimals=4)
+    else:
+        weights = df["Weight"].map(lambda w: f"{w:.4%}" if isinstance(w, float) else str(w))
+    lines = "- " + names + ": " + weights
 
+    for chunk_index, holdings_text in enumerate(_join_chunks(lines, chunk_size)):
+        i = chunk_index * chunk_size
         documents.append(Document(
-            text=f"{fund_type} Holdings (Positions {i + 1}-{i + len(chunk)}):\n" + "\n".join(holdings_text),
+            text=f"{fund_type} Holdings (Positions {i + 1}-{min(i + chunk_size, len(df))}):\n" + holdings_text,
             metadata={
                 "source": str(file_path),
                 "file_name": file_path.name,
                 "document_type": "fund_holdings_detail",
                 "fund_type": fund_type,
-                "chunk_index": i // chunk_size,
+                "chunk_index": chunk_index,
             }
         ))
 
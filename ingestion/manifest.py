@@ -0,0 +1,170 @@
+"""Per-collection ingestion manifest for incremental re-ingestion.
+
+Records, for every ingested file, its content hash, the loader/chunking
+fingerprint it was ingested with and the Chroma IDs of its chunks. On
+re-ingestion:
+
+- unchanged files (same size and mtime, or same content hash) are skipped
+- changed files have their old chunks deleted before new ones are added
+- files removed from disk have their chunks purged
+
+The manifest is a JSON file next to the Chroma data, rewritten atomically
+(temp file + os.replace) after each indexing batch.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Read size for hashing files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_key(path: Path) -> str:
+    """Manifest key for a file (resolved absolute path)."""
+    return str(Path(path).resolve())
+
+
+def chunk_id_prefix(key: str, sha256: str) -> str:
+    """Deterministic chunk ID prefix for one version of one file."""
+    return hashlib.sha256(f"{key}|{sha256}".encode()).hexdigest()[:16]
+
+
+class IngestionManifest:
+    """
+    Ingested files of one collection.
+
+    Usage:
+        manifest = IngestionManifest.for_collection(chroma_dir, "alti_investments")
+        if manifest.is_current(path, fingerprint):
+            ...  # skip
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: dict[str, dict] = {}
+        self.dirty = False  # Changed since the last save
+        self._load()
+
+    @classmethod
+    def for_collection(cls, chroma_persist_dir: Path, collection_name: str) -> "IngestionManifest":
+        return cls(Path(chroma_persist_dir) / f"{collection_name}.manifest.json")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.files = data.get("files", {})
+        except (OSError, ValueError) as e:
+            # Unreadable manifest: everything is re-ingested (chunk IDs are deterministic)
+            logger.warning(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self.files}, f, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def get(self, path: Path) -> Optional[dict]:
+        return self.files.get(file_key(path))
+
+    def is_current(self, path: Path, fingerprint: str) -> tuple[bool, Optional[str]]:
+        """
+        Check whether a file is ingested as-is.
+
+        Size and mtime are compared first; the file is only hashed when they
+        differ (a touched but unchanged file still counts as current).
+
+        Returns:
+            (current, sha256 if the file was hashed)
+        """
+        entry = self.get(path)
+        stat = path.stat()
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return False, None
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True, entry["sha256"]
+
+        sha256 = file_sha256(path)
+        if sha256 != entry.get("sha256"):
+            return False, sha256
+        entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+        self.dirty = True
+        return True, sha256
+
+    def record(self, path: Path, sha256: str, fingerprint: str, chunk_ids: list[str], documents: int) -> None:
+        stat = path.stat()
+        self.files[file_key(path)] = {
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": fingerprint,
+            "documents": documents,
+            "chunk_ids": chunk_ids,
+            "ingested_at": time.time(),
+        }
+        self.dirty = True
+
+    def content_fingerprint(self) -> str:
+        """
+        Hash of every ingested file's content hash and ingestion fingerprint.
+
+        Changes whenever any file is re-ingested, added or purged, even when
+        the collection keeps the same number of chunks.
+        """
+        digest = hashlib.sha256()
+        for key in sorted(self.files):
+            entry = self.files[key]
+            digest.update(f"{key}|{entry.get('sha256')}|{entry.get('fingerprint')}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def remove(self, key: str) -> Optional[dict]:
+        entry = self.files.pop(key, None)
+        self.dirty = self.dirty or entry is not None
+        return entry
+
+    def missing_files(self, directory: Path, recursive: bool, extensions: list[str]) -> list[str]:
+        """Keys of manifest files under directory (matching the scan) that no longer exist."""
+        root = Path(directory).resolve()
+        suffixes = {ext.lower() for ext in extensions}
+        missing = []
+        for key in self.files:
+            path = Path(key)
+            if path.suffix.lower() not in suffixes or path.exists():
+                continue
+            if path.parent == root or (recursive and root in path.parents):
+                missing.append(key)
+        return missing
+
+    def clear(self) -> None:
+        self.files = {}
+        self.save()
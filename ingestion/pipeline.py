@@ -1,15 +1,46 @@
-"""Document ingestion pipeline for AlTi RAG Service."""
+"""Document ingestion pipeline for AlTi RAG Service.
+
+Ingestion streams files through load -> split -> embed -> upsert:
+
+- Loaders (pandas Excel/CSV parsing, PyMuPDF, python-pptx) are CPU-bound and
+  independent per file, so they can run in a process pool (workers > 1) with
+  at most 2 x workers files in flight
+- Loading and splitting run in a background thread that feeds the indexing
+  stage through a queue of at most queue_size files
+- Chunks are embedded and upserted in batches of index_batch_size, then the
+  replaced chunks that are no longer produced are deleted and the manifest
+  is saved, so a file's old chunks stay searchable until its new ones are in
+
+Memory is bounded by the in-flight files and one indexing batch rather than
+the corpus size, and a failed run keeps every batch committed before it
+(and still emits the collection change event for them).
+
+Ingestion is incremental: a per-collection manifest (see manifest.py)
+records each file's content hash and chunk IDs, so unchanged files are
+skipped, changed files replace their chunks and deleted files are purged.
+
+Chunks are embedded through an on-disk embedding cache (see embeddings.py)
+before indexing, so identical text is only sent to the embedding API once.
+"""
 
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
 import chromadb
-from llama_index.core import Document, Settings, StorageContext, VectorStoreIndex
+from llama_index.core import Document, Settings
 from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
 from .loaders import (
+    LOADER_VERSION,
     load_cma_excel,
     load_fund_holdings_csv,
     load_markdown_documents,
@@ -21,8 +52,22 @@ from .loaders import (
     load_returns_csv,
 )
 
+from .embeddings import CachedEmbedder, EmbeddingCache
+from .manifest import IngestionManifest, chunk_id_prefix, file_key, file_sha256
+
 logger = logging.getLogger(__name__)
 
+# Chunk IDs per Chroma delete call
+DELETE_BATCH_SIZE = 5000
+
+# Files loading in the process pool per worker
+PENDING_FILES_PER_WORKER = 2
+
+
+def _chunk_id(i: int, doc: Document) -> str:
+    """Deterministic chunk ID: the document's ID plus the chunk index."""
+    return f"{doc.doc_id}-{i}"
+
 
 def get_embed_model(provider: str, **kwargs):
     """Get embedding model based on provider."""
@@ -31,10 +76,142 @@ def get_embed_model(provider: str, **kwargs):
         return OllamaEmbedding(
             model_name=kwargs.get("model", "nomic-embed-text"),
             base_url=kwargs.get("base_url", "http://localhost:11434"),
+            embed_batch_size=kwargs.get("embed_batch_size", 10),
         )
     else:  # openai
         from llama_index.embeddings.openai import OpenAIEmbedding
-        return OpenAIEmbedding(model=kwargs.get("model", "text-embedding-3-small"))
+        return OpenAIEmbedding(
+            model=kwargs.get("model", "text-embedding-3-small"),
+            embed_batch_size=kwargs.get("embed_batch_size", 100),
+        )
+
+
+def load_documents(path: Path, priority: str = "normal") -> List[Document]:
+    """
+    Load documents from a file with the loader for its type.
+
+    Args:
+        path: Path to the document file
+        priority: Document priority level (critical, high, normal, low)
+
+    Raises:
+        Loader errors (callers decide whether to log or report them)
+    """
+    suffix = path.suffix.lower()
+    name_lower = path.stem.lower()
+
+    if suffix == ".csv":
+        # Determine CSV type based on filename
+        if "return" in name_lower:
+            return load_returns_csv(path)
+        elif any(x in name_lower for x in ["sma", "intl", "lp", "holdings"]):
+            return load_fund_holdings_csv(path)
+        elif "portfolio" in name_lower or "universe" in name_lower:
+            return load_portfolio_csv(path)
+        else:
+            return load_portfolio_csv(path)  # Default to portfolio
+
+    elif suffix in [".xlsx", ".xls", ".xlsm"]:
+        # Special handling for Model Archetypes
+        if "model" in name_lower and "archetype" in name_lower:
+            documents = load_model_archetypes(path)
+            logger.info(f"Loaded PRIORITY document: Model Archetypes")
+            return documents
+        return load_cma_excel(path)
+
+    elif suffix == ".pptx":
+        # PowerPoint files (investment profiles)
+        return load_powerpoint(path, priority=priority)
+
+    elif suffix == ".pdf":
+        return load_pdf_documents(path)
+
+    elif suffix == ".json":
+        return load_qualtrics_json(path)
+
+    elif suffix == ".md":
+        return load_markdown_documents(path)
+
+    logger.warning(f"Unsupported file type: {suffix} for {path}")
+    return []
+
+
+def load_file_timed(path: str, priority: str = "normal") -> dict:
+    """
+    Load one file and report its documents, load time and error.
+
+    Module-level (picklable) so it can run in a ProcessPoolExecutor.
+    """
+    start_time = time.perf_counter()
+    try:
+        documents, error = load_documents(Path(path), priority), None
+    except Exception as e:
+        documents, error = [], str(e)
+    return {
+        "file": path,
+        "documents": documents,
+        "seconds": round(time.perf_counter() - start_time, 3),
+        "error": error,
+    }
+
+
+def iter_in_background(items: Iterator, maxsize: int) -> Iterator:
+    """
+    Run an iterator in a background thread, buffering at most maxsize items.
+
+    The producer blocks while the buffer is full; its exceptions are raised in
+    the consumer. Closing the returned generator (or an exception in the
+    consumer) stops the producer and closes items, so a generator source runs
+    its cleanup (e.g. shutting down a process pool) instead of blocking.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close_items() -> None:
+        close = getattr(items, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except ValueError:
+            pass  # Running in the producer, which closes it once it sees stop
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((done, e))
+            return
+        finally:
+            close_items()
+        put((done, None))
+
+    thread = threading.Thread(target=produce, name="ingest-loader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        close_items()
+        thread.join()
 
 
 class IngestionPipeline:
@@ -49,25 +226,67 @@ class IngestionPipeline:
         base_url: str = "http://localhost:11434",
         chunk_size: int = 512,
         chunk_overlap: int = 128,
+        on_change: Optional[Callable[[str, str], None]] = None,
+        workers: int = 1,
+        index_batch_size: int = 500,
+        queue_size: int = 4,
+        embed_batch_size: int = 100,
+        embed_concurrency: int = 4,
+        embed_max_retries: int = 5,
+        embedding_cache: bool = True,
     ):
+        """
+        Args:
+            on_change: Called with (collection_name, reason) after documents are
+                       indexed or the collection is cleared (e.g. cache invalidation)
+            workers: Processes for loading files during ingestion (1 = serial)
+            index_batch_size: Chunks embedded and upserted per indexing batch
+            queue_size: Loaded files buffered ahead of the indexing stage
+            embed_batch_size: Texts per embedding request
+            embed_concurrency: Embedding requests in flight
+            embed_max_retries: Attempts per embedding request (exponential backoff)
+            embedding_cache: Cache chunk embeddings on disk next to the Chroma data
+        """
         self.chroma_persist_dir = Path(chroma_persist_dir)
         self.collection_name = collection_name
+        self.on_change = on_change
+        self.workers = max(1, workers)
+        self.index_batch_size = max(1, index_batch_size)
+        self.queue_size = max(1, queue_size)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # Indexing batches and purges committed to Chroma (see _notify_on_commit)
+        self._commits = 0
 
         # Initialize embedding model based on provider
         Settings.embed_model = get_embed_model(
-            provider, model=embedding_model, base_url=base_url
+            provider, model=embedding_model, base_url=base_url, embed_batch_size=embed_batch_size
+        )
+        # Shared by all collections: vectors depend only on the model and text
+        self.embedder = CachedEmbedder(
+            Settings.embed_model,
+            cache=EmbeddingCache(self.chroma_persist_dir / "embedding_cache.sqlite3") if embedding_cache else None,
+            model_key=f"{provider}:{embedding_model}",
+            batch_size=embed_batch_size,
+            concurrency=embed_concurrency,
+            max_retries=embed_max_retries,
         )
 
         # Initialize text splitter
         self.text_splitter = SentenceSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
+            id_func=_chunk_id,
         )
 
         # Initialize Chroma
         self._init_chroma()
+        self.manifest = IngestionManifest.for_collection(self.chroma_persist_dir, collection_name)
+        if not self.manifest.files and self.chroma_collection.count() > 0:
+            logger.warning(
+                f"Collection {collection_name} has chunks not tracked by the ingestion manifest; "
+                "clear it and re-ingest once to avoid duplicate chunks"
+            )
 
     def _init_chroma(self):
         """Initialize Chroma vector store."""
@@ -86,9 +305,30 @@ class IngestionPipeline:
             chroma_collection=self.chroma_collection
         )
 
-        self.storage_context = StorageContext.from_defaults(
-            vector_store=self.vector_store
-        )
+    def _notify_change(self, reason: str) -> None:
+        """Emit a collection change event; listener errors never fail ingestion."""
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(self.collection_name, reason)
+        except Exception as e:
+            logger.error(f"Collection change listener failed for {self.collection_name}: {e}")
+
+    @contextmanager
+    def _notify_on_commit(self):
+        """
+        Emit "ingested" once the block ends if it committed any batch or purge.
+
+        Runs even when the block raises: batches committed before a failure
+        are already in Chroma and the manifest, so caches and retrievers built
+        on the previous chunks must still be invalidated.
+        """
+        commits_before = self._commits
+        try:
+            yield
+        finally:
+            if self._commits > commits_before:
+                self._notify_change("ingested")
 
     def load_documents_from_path(
         self, path: Path, priority: str = "normal"
@@ -99,64 +339,243 @@ class IngestionPipeline:
             path: Path to the document file
             priority: Document priority level (critical, high, normal, low)
         """
-        documents = []
-        suffix = path.suffix.lower()
-        name_lower = path.stem.lower()
+        try:
+            return load_documents(path, priority)
+        except Exception as e:
+            logger.error(f"Error loading {path}: {e}")
+            return []
+
+    def _load_files(self, items: List[tuple[Path, str]]) -> Iterator[dict]:
+        """
+        Yield load_file_timed() reports for (path, priority) items.
+
+        With workers > 1 files load in a process pool and reports arrive in
+        completion order (largest files are submitted first). Files are
+        submitted as earlier ones are consumed, so finished results never
+        pile up faster than they are indexed.
+        """
+        if self.workers <= 1 or len(items) < 2:
+            for file_path, priority in items:
+                yield load_file_timed(str(file_path), priority)
+            return
+
+        items = sorted(items, key=lambda item: item[0].stat().st_size, reverse=True)
+        remaining = iter(items)
+        max_pending = self.workers * PENDING_FILES_PER_WORKER
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            pending = {}
+
+            def submit_next() -> None:
+                for file_path, priority in remaining:
+                    pending[pool.submit(load_file_timed, str(file_path), priority)] = file_path
+                    if len(pending) >= max_pending:
+                        return
+
+            try:
+                submit_next()
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        file_path = pending.pop(future)
+                        try:
+                            report = future.result()
+                        except Exception as e:
+                            # Worker died or the result couldn't be sent back
+                            report = {
+                                "file": str(file_path),
+                                "documents": [],
+                                "seconds": 0.0,
+                                "error": f"Worker failed: {e}",
+                            }
+                        submit_next()
+                        yield report
+            finally:
+                # Closed early (indexing failed): don't wait for loads nobody will index
+                for future in pending:
+                    future.cancel()
+
+    def _fingerprint(self, priority: str) -> str:
+        """Loader/chunking settings a file's chunks depend on."""
+        return f"{LOADER_VERSION}|{self.chunk_size}/{self.chunk_overlap}|{priority}"
+
+    def _sync_files(self, items: List[tuple[Path, str]], force: bool = False) -> List[dict]:
+        """
+        Ingest new or changed files, replacing their previous chunks.
+
+        Files matching the manifest are skipped unless force is set. Loaded
+        files are chunked with deterministic IDs and indexed in batches of
+        index_batch_size chunks; the manifest is saved after each batch.
+
+        Returns:
+            One report per file with status "unchanged", "added", "updated"
+            or "error", plus load time and document/chunk counts
+        """
+        reports = []
+        to_load = []
+        hashes: dict[str, str] = {}
+
+        for file_path, priority in items:
+            current, sha256 = False, None
+            if not force:
+                current, sha256 = self.manifest.is_current(file_path, self._fingerprint(priority))
+            if current:
+                reports.append({"file": str(file_path), "status": "unchanged"})
+                continue
+            # Hash before loading, so the manifest describes the content that was loaded
+            hashes[str(file_path)] = sha256 or file_sha256(file_path)
+            to_load.append((file_path, priority))
+
+        batch: List[tuple[Path, str, str, List[BaseNode], int]] = []
+        batch_chunks = 0
 
         try:
-            if suffix == ".csv":
-                # Determine CSV type based on filename
-                if "return" in name_lower:
-                    documents = load_returns_csv(path)
-                elif any(x in name_lower for x in ["sma", "intl", "lp", "holdings"]):
-                    documents = load_fund_holdings_csv(path)
-                elif "portfolio" in name_lower or "universe" in name_lower:
-                    documents = load_portfolio_csv(path)
-                else:
-                    documents = load_portfolio_csv(path)  # Default to portfolio
-
-            elif suffix in [".xlsx", ".xls", ".xlsm"]:
-                # Special handling for Model Archetypes
-                if "model" in name_lower and "archetype" in name_lower:
-                    documents = load_model_archetypes(path)
-                    logger.info(f"Loaded PRIORITY document: Model Archetypes")
-                else:
-                    documents = load_cma_excel(path)
-
-            elif suffix == ".pptx":
-                # PowerPoint files (investment profiles)
-                documents = load_powerpoint(path, priority=priority)
-
-            elif suffix == ".pdf":
-                documents = load_pdf_documents(path)
-
-            elif suffix == ".json":
-                documents = load_qualtrics_json(path)
-
-            elif suffix == ".md":
-                documents = load_markdown_documents(path)
+            for report, nodes in iter_in_background(self._split_files(to_load, hashes), self.queue_size):
+                reports.append(report)
+                if report["error"]:
+                    logger.error(f"Failed to process {report['file']}: {report['error']}")
+                    continue
+
+                file_path = Path(report["file"])
+                report["status"] = "updated" if self.manifest.get(file_path) else "added"
+                logger.info(
+                    f"Loaded {report['documents_created']} documents ({len(nodes)} chunks) "
+                    f"from {file_path.name} in {report['seconds']:.2f}s"
+                )
 
-            else:
-                logger.warning(f"Unsupported file type: {suffix} for {path}")
+                batch.append((
+                    file_path, hashes[report["file"]], report.pop("fingerprint"),
+                    nodes, report["documents_created"],
+                ))
+                batch_chunks += len(nodes)
+                if batch_chunks >= self.index_batch_size:
+                    self._index_batch(batch)
+                    batch, batch_chunks = [], 0
+
+            if batch:
+                self._index_batch(batch)
+        finally:
+            if self.manifest.dirty:
+                self.manifest.save()  # Refreshed mtimes of touched but unchanged files
+        return reports
+
+    def _split_files(
+        self, items: List[tuple[Path, str]], hashes: dict[str, str]
+    ) -> Iterator[tuple[dict, List[BaseNode]]]:
+        """
+        Load and chunk files, yielding (report, nodes) per file.
 
-        except Exception as e:
-            logger.error(f"Error loading {path}: {e}")
+        Documents get deterministic IDs from the file's path and content hash,
+        so chunk IDs are stable across runs.
+        """
+        priorities = {str(file_path): priority for file_path, priority in items}
+        for report in self._load_files(items):
+            docs = report.pop("documents")
+            report["documents_created"] = len(docs)
+            if report["error"]:
+                report["status"] = "error"
+                yield report, []
+                continue
+
+            prefix = chunk_id_prefix(file_key(Path(report["file"])), hashes[report["file"]])
+            for i, doc in enumerate(docs):
+                doc.id_ = f"{prefix}-d{i}"
+            nodes = self.text_splitter.get_nodes_from_documents(docs)
+            report["chunks"] = len(nodes)
+            report["fingerprint"] = self._fingerprint(priorities[report["file"]])
+            yield report, nodes
+
+    def _index_batch(self, batch: List[tuple[Path, str, str, List[BaseNode], int]]) -> None:
+        """
+        Replace the chunks of a batch of files and record them in the manifest.
+
+        New chunks are embedded and upserted before any old chunk is deleted,
+        so a failed embedding or write leaves the previous version searchable.
+        Only old chunk IDs the new version doesn't reuse are deleted.
+        """
+        # A single large file can exceed index_batch_size; upsert it in slices
+        nodes = [node for _, _, _, file_nodes, _ in batch for node in file_nodes]
+        for start in range(0, len(nodes), self.index_batch_size):
+            batch_nodes = nodes[start:start + self.index_batch_size]
+            self.embedder.embed_nodes(batch_nodes)
+            self._upsert_nodes(batch_nodes)
+
+        new_ids = {node.node_id for node in nodes}
+        stale_ids = [
+            chunk_id
+            for file_path, *_ in batch
+            for chunk_id in (self.manifest.get(file_path) or {}).get("chunk_ids", [])
+            if chunk_id not in new_ids
+        ]
+        self._delete_chunks(stale_ids)
+
+        for file_path, sha256, fingerprint, file_nodes, documents in batch:
+            self.manifest.record(
+                file_path, sha256, fingerprint,
+                chunk_ids=[node.node_id for node in file_nodes],
+                documents=documents,
+            )
+        self.manifest.save()
+        self._commits += 1
+
+    def _upsert_nodes(self, nodes: List[BaseNode]) -> None:
+        """
+        Write embedded nodes to Chroma, overwriting chunks with the same ID.
+
+        Stored like ChromaVectorStore.add, which can't be used here: Chroma
+        ignores adds of IDs that already exist, and a re-indexed file reuses
+        its chunk IDs when only its chunking or metadata changed.
+        """
+        if not nodes:
+            return
+        metadatas = []
+        for node in nodes:
+            metadata = node_to_metadata_dict(
+                node, remove_text=True, flat_metadata=self.vector_store.flat_metadata
+            )
+            metadatas.append({key: "" if value is None else value for key, value in metadata.items()})
+        self.chroma_collection.upsert(
+            ids=[node.node_id for node in nodes],
+            embeddings=[node.get_embedding() for node in nodes],
+            metadatas=metadatas,
+            documents=[node.get_content(metadata_mode=MetadataMode.NONE) for node in nodes],
+        )
 
-        return documents
+    def _delete_chunks(self, chunk_ids: List[str]) -> None:
+        for start in range(0, len(chunk_ids), DELETE_BATCH_SIZE):
+            self.chroma_collection.delete(ids=chunk_ids[start:start + DELETE_BATCH_SIZE])
+
+    def _purge_files(self, keys: List[str]) -> int:
+        """Delete the chunks of files removed from disk. Returns chunks deleted."""
+        chunk_ids = []
+        for key in keys:
+            entry = self.manifest.remove(key)
+            chunk_ids.extend(entry.get("chunk_ids", []) if entry else [])
+            logger.info(f"Purging {Path(key).name}: file no longer exists")
+        self._delete_chunks(chunk_ids)
+        if self.manifest.dirty:
+            self.manifest.save()
+        if chunk_ids:
+            self._commits += 1
+        return len(chunk_ids)
 
     def ingest_directory(
         self,
         directory: Path,
         recursive: bool = True,
         extensions: Optional[List[str]] = None,
+        force: bool = False,
     ) -> dict:
         """
-        Ingest all supported documents from a directory.
+        Incrementally ingest all supported documents from a directory.
+
+        New and changed files are (re)indexed, unchanged files are skipped
+        and files deleted from the directory since the last run are purged.
 
         Args:
             directory: Path to directory containing documents
             recursive: Whether to search subdirectories
             extensions: File extensions to include (default: all supported)
+            force: Re-ingest every file even if unchanged
 
         Returns:
             Summary of ingestion results
@@ -168,64 +587,69 @@ class IngestionPipeline:
         if not directory.exists():
             raise ValueError(f"Directory not found: {directory}")
 
-        all_documents = []
-        files_processed = 0
-        errors = []
-
         # Find all matching files
         pattern = "**/*" if recursive else "*"
-        for ext in extensions:
-            for file_path in directory.glob(f"{pattern}{ext}"):
-                try:
-                    docs = self.load_documents_from_path(file_path)
-                    all_documents.extend(docs)
-                    files_processed += 1
-                    logger.info(f"Loaded {len(docs)} documents from {file_path.name}")
-                except Exception as e:
-                    errors.append({"file": str(file_path), "error": str(e)})
-                    logger.error(f"Failed to process {file_path}: {e}")
-
-        # Index documents
-        if all_documents:
-            index = VectorStoreIndex.from_documents(
-                all_documents,
-                storage_context=self.storage_context,
-                transformations=[self.text_splitter],
-                show_progress=True,
+        files = [
+            file_path
+            for ext in extensions
+            for file_path in directory.glob(f"{pattern}{ext}")
+        ]
+
+        start_time = time.perf_counter()
+        hits_before, misses_before = self.embedder.cache_hits, self.embedder.cache_misses
+        with self._notify_on_commit():
+            try:
+                reports = self._sync_files([(file_path, "normal") for file_path in files], force=force)
+            finally:
+                # Files deleted from disk are purged even if indexing failed partway
+                chunks_purged = self._purge_files(self.manifest.missing_files(directory, recursive, extensions))
+
+        statuses = [report["status"] for report in reports]
+        changed = statuses.count("added") + statuses.count("updated")
+        documents_created = sum(report.get("documents_created", 0) for report in reports)
+        if changed or chunks_purged:
+            logger.info(
+                f"Ingested {directory}: {statuses.count('added')} added, {statuses.count('updated')} "
+                f"updated, {statuses.count('unchanged')} unchanged, {chunks_purged} chunks purged "
+                f"in {time.perf_counter() - start_time:.1f}s ({self.workers} workers)"
             )
-            logger.info(f"Indexed {len(all_documents)} documents")
 
         return {
-            "files_processed": files_processed,
-            "documents_created": len(all_documents),
-            "errors": errors,
+            "files_processed": changed,
+            "files_unchanged": statuses.count("unchanged"),
+            "chunks_purged": chunks_purged,
+            "documents_created": documents_created,
+            "errors": [
+                {"file": report["file"], "error": report["error"]}
+                for report in reports if report["status"] == "error"
+            ],
             "collection_count": self.chroma_collection.count(),
+            "files": reports,
+            "workers": self.workers,
+            "duration_seconds": round(time.perf_counter() - start_time, 2),
+            "embeddings_cached": self.embedder.cache_hits - hits_before,
+            "embeddings_computed": self.embedder.cache_misses - misses_before,
         }
 
-    def ingest_file(self, file_path: Path, priority: str = "normal") -> dict:
-        """Ingest a single file with optional priority level."""
+    def ingest_file(self, file_path: Path, priority: str = "normal", force: bool = False) -> dict:
+        """Ingest a single file with optional priority level (skipped if unchanged)."""
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise ValueError(f"File not found: {file_path}")
 
-        documents = self.load_documents_from_path(file_path, priority=priority)
-
-        if documents:
-            VectorStoreIndex.from_documents(
-                documents,
-                storage_context=self.storage_context,
-                transformations=[self.text_splitter],
-            )
+        with self._notify_on_commit():
+            [report] = self._sync_files([(file_path, priority)], force=force)
 
         return {
             "file": str(file_path),
-            "documents_created": len(documents),
+            "status": report["status"],
+            "documents_created": report.get("documents_created", 0),
             "collection_count": self.chroma_collection.count(),
             "priority": priority,
         }
 
-    def ingest_priority_documents(self, file_paths: List[Path]) -> dict:
+    def ingest_priority_documents(self, file_paths: List[Path], force: bool = False) -> dict:
         """
         Ingest documents marked as priority/must-know.
 
@@ -234,7 +658,7 @@ class IngestionPipeline:
         - Enhanced retrieval boosting
         - Detailed document breakdowns for better semantic matching
         """
-        all_documents = []
+        items = []
         results = []
 
         for file_path in file_paths:
@@ -244,51 +668,38 @@ class IngestionPipeline:
                 results.append({"file": str(file_path), "status": "not_found"})
                 continue
 
-            try:
-                # Determine priority level based on filename
-                name_lower = file_path.stem.lower()
-                if "model" in name_lower and "archetype" in name_lower:
-                    # Model Archetypes - absolute top priority
-                    priority = "critical"
-                else:
-                    # Other priority documents
-                    priority = "high"
-
-                documents = self.load_documents_from_path(file_path, priority=priority)
-                all_documents.extend(documents)
-
-                results.append({
-                    "file": str(file_path),
-                    "status": "loaded",
-                    "documents_created": len(documents),
-                    "priority": priority,
-                })
-
-                logger.info(
-                    f"Loaded {len(documents)} documents from {file_path.name} "
-                    f"(priority: {priority})"
-                )
+            # Determine priority level based on filename
+            name_lower = file_path.stem.lower()
+            if "model" in name_lower and "archetype" in name_lower:
+                # Model Archetypes - absolute top priority
+                priority = "critical"
+            else:
+                # Other priority documents
+                priority = "high"
+            items.append((file_path, priority))
+
+        priorities = {str(file_path): priority for file_path, priority in items}
+        with self._notify_on_commit():
+            reports = self._sync_files(items, force=force)
+
+        for report in reports:
+            result = {
+                "file": report["file"],
+                "status": "loaded" if report["status"] in ("added", "updated") else report["status"],
+                "priority": priorities[report["file"]],
+            }
+            if report["status"] == "error":
+                result["error"] = report["error"]
+            else:
+                result["documents_created"] = report.get("documents_created", 0)
+            results.append(result)
 
-            except Exception as e:
-                results.append({
-                    "file": str(file_path),
-                    "status": "error",
-                    "error": str(e),
-                })
-                logger.error(f"Failed to process priority document {file_path}: {e}")
-
-        # Index all priority documents together
-        if all_documents:
-            VectorStoreIndex.from_documents(
-                all_documents,
-                storage_context=self.storage_context,
-                transformations=[self.text_splitter],
-                show_progress=True,
-            )
-            logger.info(f"Indexed {len(all_documents)} priority documents")
+        total_documents = sum(result.get("documents_created", 0) for result in results)
+        if any(result["status"] == "loaded" for result in results):
+            logger.info(f"Indexed {total_documents} priority documents")
 
         return {
-            "total_documents": len(all_documents),
+            "total_documents": total_documents,
             "files": results,
             "collection_count": self.chroma_collection.count(),
         }
@@ -298,6 +709,8 @@ class IngestionPipeline:
         # Delete and recreate collection
         self.chroma_client.delete_collection(self.collection_name)
         self._init_chroma()
+        self.manifest.clear()
+        self._notify_change("cleared")
 
         return {"status": "cleared", "collection_count": 0}
 
@@ -307,4 +720,6 @@ class IngestionPipeline:
             "collection_name": self.collection_name,
             "document_count": self.chroma_collection.count(),
             "persist_directory": str(self.chroma_persist_dir),
+            "manifest_files": len(self.manifest.files),
+            "embeddings": self.embedder.stats(),
         }
@@ -0,0 +1,133 @@
+"""Single-pass Excel workbook parsing with an on-disk sheet cache.
+
+openpyxl XML parsing dominates ingest time for the CMA and Model Archetypes
+workbooks. Each sheet a loader needs is parsed exactly once (openpyxl
+read-only mode) into raw cell frames: object columns holding the cell values
+exactly as read, with "" for empty cells. sheet_frame() then builds the
+frame pd.read_excel would have returned for a given header row from the
+raw cells, without touching the file again.
+
+Raw sheets are cached as pickled DataFrames keyed by the workbook's content
+hash, so re-ingesting an unchanged workbook skips XML parsing entirely.
+
+Usage:
+    sheets = read_workbook(path)                 # {sheet_name: raw cells}
+    df = sheet_frame(sheets["LIST"], header=0)   # == pd.read_excel(path, "LIST")
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from .manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached raw sheet format changes
+WORKBOOK_CACHE_VERSION = 1
+
+# Cached workbooks kept (least recently used are removed)
+MAX_CACHED_WORKBOOKS = 64
+
+
+def _default_cache_dir() -> Optional[Path]:
+    from config import get_workbook_cache_dir, settings
+    return get_workbook_cache_dir() if settings.workbook_cache_enabled else None
+
+
+def _cache_path(cache_dir: Path, sha256: str, sheet_names: Optional[list[str]]) -> Path:
+    selection = ""
+    if sheet_names is not None:
+        selection = "-" + hashlib.sha256("\0".join(sheet_names).encode()).hexdigest()[:8]
+    # Pickles are tied to the pandas version that wrote them
+    return cache_dir / f"{sha256[:32]}{selection}-v{WORKBOOK_CACHE_VERSION}-pd{pd.__version__}.pkl"
+
+
+def _parse_workbook(file_path: Path, sheet_names: Optional[list[str]] = None) -> dict[str, pd.DataFrame]:
+    """Parse sheets (default: all) once into raw cell frames."""
+    with pd.ExcelFile(file_path, engine="openpyxl") as xl:
+        if sheet_names is not None:
+            # Workbook order; sheets missing from the workbook are left out
+            sheet_names = [name for name in xl.sheet_names if name in sheet_names]
+            if not sheet_names:
+                return {}
+        return pd.read_excel(
+            xl,
+            sheet_name=sheet_names,
+            header=None,
+            dtype=object,
+            na_filter=False,
+        )
+
+
+def _prune(cache_dir: Path) -> None:
+    files = sorted(cache_dir.glob("*.pkl"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in files[MAX_CACHED_WORKBOOKS:]:
+        path.unlink(missing_ok=True)
+
+
+def read_workbook(
+    file_path: Path,
+    sheet_names: Optional[list[str]] = None,
+    cache_dir: Optional[Path] = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Raw cell frames for the sheets of a workbook, in sheet order.
+
+    Args:
+        file_path: Excel workbook (.xlsx, .xlsm)
+        sheet_names: Only parse these sheets (missing ones are skipped)
+        cache_dir: Sheet cache directory (default: WORKBOOK_CACHE_DIR from
+                   settings, or no caching when the workbook cache is disabled)
+    """
+    file_path = Path(file_path)
+    if cache_dir is None:
+        cache_dir = _default_cache_dir()
+    if cache_dir is None:
+        return _parse_workbook(file_path, sheet_names)
+
+    cache_path = _cache_path(Path(cache_dir), file_sha256(file_path), sheet_names)
+    if cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                sheets = pickle.load(f)
+            os.utime(cache_path)  # Recently used, kept by _prune
+            return sheets
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable workbook cache {cache_path.name}: {e}")
+
+    sheets = _parse_workbook(file_path, sheet_names)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(sheets, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        _prune(cache_path.parent)
+    except OSError as e:
+        logger.warning(f"Could not cache parsed workbook {file_path.name}: {e}")
+    return sheets
+
+
+def is_blank(raw: pd.DataFrame) -> bool:
+    """Whether a raw sheet has no values."""
+    return raw.empty or not (raw != "").to_numpy().any()
+
+
+def sheet_frame(raw: pd.DataFrame, header: Optional[int] = None) -> pd.DataFrame:
+    """
+    The frame pd.read_excel(..., header=header) returns, built from raw cells.
+
+    Runs the same TextParser (NA detection, dtype inference, header naming)
+    that read_excel applies to the cells it reads.
+    """
+    if raw.empty:
+        return pd.DataFrame()
+    with TextParser(raw.to_numpy().tolist(), header=header) as parser:
+        return parser.read()
@@ -11,7 +11,9 @@ if platform.system() == "Windows" or os.getenv("USE_TRUSTSTORE", "0") == "1":
     except ImportError:
         pass  # truststore not installed, skip
 
+import asyncio
 import logging
+import multiprocessing
 import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -20,11 +22,12 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse
 
 from api import router, feedback_router
 from config import settings, get_log_dir, get_chroma_dir, validate_environment, configure_langsmith
 from utils.logging import setup_structured_logging
+from utils.metrics import render_metrics
 
 # Load environment variables
 load_dotenv()
@@ -78,6 +81,23 @@ async def warmup_service():
         logger.warning(f"Warmup failed (service will still start): {e}")
 
 
+def snapshot_caches() -> int:
+    """Snapshot the response caches with the current collection fingerprints."""
+    from api.routes import get_collection_fingerprints
+    from utils.cache import save_cache_snapshots
+    return save_cache_snapshots(get_collection_fingerprints())
+
+
+async def snapshot_caches_periodically():
+    """Snapshot the response caches every cache_snapshot_interval seconds."""
+    while True:
+        await asyncio.sleep(settings.cache_snapshot_interval)
+        try:
+            await asyncio.to_thread(snapshot_caches)
+        except Exception as e:
+            logger.warning(f"Cache snapshot failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
@@ -92,12 +112,38 @@ async def lifespan(app: FastAPI):
     langsmith_enabled = configure_langsmith()
     logger.info(f"LangSmith tracing: {'enabled' if langsmith_enabled else 'disabled'}")
 
+    # Reload cached answers from the last run (before warming, which skips cached queries)
+    snapshot_task = None
+    if settings.cache_enabled and settings.cache_snapshot_enabled:
+        try:
+            from api.routes import get_collection_fingerprints
+            from utils.cache import load_cache_snapshots
+            fingerprints = await asyncio.to_thread(get_collection_fingerprints)
+            loaded = await asyncio.to_thread(load_cache_snapshots, fingerprints)
+            logger.info(f"Restored {loaded} cached responses from snapshot")
+        except Exception as e:
+            logger.warning(f"Cache snapshot restore failed: {e}")
+        snapshot_task = asyncio.create_task(snapshot_caches_periodically())
+
     # Warmup to avoid cold start latency on first real query
     await warmup_service()
 
+    # Precompute the most frequent logged queries in the background
+    if settings.cache_enabled and settings.cache_warm_enabled:
+        from api.routes import get_cache_warmer
+        get_cache_warmer().start()
+        logger.info(f"Cache warming started (top {settings.cache_warm_top_n} logged queries)")
+
     yield
     logger.info("Shutting down...")
 
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        try:
+            snapshot_caches()
+        except Exception as e:
+            logger.warning(f"Cache snapshot on shutdown failed: {e}")
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -150,6 +196,12 @@ async def playground():
     return RedirectResponse(url="/static/playground.html")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (stage latency histograms, cache, LLM tokens, circuit breakers)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -159,6 +211,7 @@ async def root():
         "docs": "/docs",
         "health": "/api/v1/health",
         "playground": "/playground",
+        "metrics": "/metrics",
     }
 
 
@@ -199,4 +252,6 @@ def run_server():
 
 
 if __name__ == "__main__":
+    # Needed for process-pool ingestion in the frozen Windows executable
+    multiprocessing.freeze_support()
     run_server()
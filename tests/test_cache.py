@@ -0,0 +1,383 @@
+"""
+Unit tests for the response cache and single-flight call coalescing
+(utils/cache.py).
+
+Run: pytest tests/test_cache.py -v
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from utils.cache import ResponseCache, SingleFlight
+
+_names = itertools.count()
+
+
+def _cache(**kwargs) -> ResponseCache:
+    # Each cache gets its own name, so its single-flight isn't shared with other tests
+    return ResponseCache(name=f"test-{next(_names)}", **kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for TTL tests."""
+
+    class Clock:
+        now = time.time()
+
+        def advance(self, seconds: float) -> None:
+            self.now += seconds
+
+    fake = Clock()
+    monkeypatch.setattr(time, "time", lambda: fake.now)
+    return fake
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_run_once(self):
+        flight = SingleFlight("test-threads")
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "answer"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", compute)))
+        leader.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=lambda: results.append(flight.do("k", compute))) for _ in range(3)]
+        for thread in waiters:
+            thread.start()
+        while flight.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader, *waiters]:
+            thread.join(5)
+
+        assert calls == [1]
+        assert results == ["answer"] * 4
+        assert flight.stats() == {"calls": 4, "coalesced": 3, "coalescing_rate": 0.75, "in_flight": 0}
+
+    def test_exception_reaches_every_waiter(self):
+        flight = SingleFlight("test-errors")
+
+        async def main():
+            async def fail():
+                await asyncio.sleep(0.01)
+                raise ValueError("boom")
+
+            return await asyncio.gather(
+                *(flight.do_async("k", fail) for _ in range(3)), return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+        assert [type(r) for r in results] == [ValueError] * 3
+        assert flight.stats()["in_flight"] == 0
+
+    def test_finished_calls_are_not_reused(self):
+        flight = SingleFlight("test-sequential")
+        assert flight.do("k", lambda: 1) == 1
+        assert flight.do("k", lambda: 2) == 2
+        assert flight.coalesced == 0
+
+    def test_cancelled_waiter_does_not_cancel_the_leader(self):
+        flight = SingleFlight("test-cancel")
+
+        async def main():
+            async def compute():
+                await asyncio.sleep(0.05)
+                return "answer"
+
+            leader = asyncio.ensure_future(flight.do_async("k", compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(flight.do_async("k", compute))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            return await leader, waiter
+
+        result, waiter = asyncio.run(main())
+        assert result == "answer"
+        assert waiter.cancelled()
+
+    def test_cancelled_leader_hands_off_to_a_waiter(self):
+        flight = SingleFlight("test-leader-cancel")
+        calls = []
+
+        async def main():
+            async def compute():
+                calls.append(1)
+                await asyncio.sleep(0.05)
+                return "answer"
+
+            leader = asyncio.ensure_future(flight.do_async("k", compute))
+            await asyncio.sleep(0)
+            waiters = [asyncio.ensure_future(flight.do_async("k", compute)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return leader, await asyncio.gather(*waiters)
+
+        leader, results = asyncio.run(main())
+        assert leader.cancelled()
+        assert results == ["answer", "answer"]
+        assert calls == [1, 1]
+        assert flight.stats()["in_flight"] == 0
+
+
+class TestResponseCacheTTL:
+    def test_roundtrip_and_query_normalization(self):
+        cache = _cache()
+        cache.set("What is IBI?", "investments", {"answer": "a"})
+
+        assert cache.get("  what is ibi?", "investments") == {"answer": "a"}
+        assert cache.get("What is IBI?", "estate_planning") is None
+        assert cache.get("What is IBI?", "investments", profile="fast") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_entries_expire_after_their_ttl(self, clock):
+        cache = _cache(default_ttl=60)
+        cache.set("q", "investments", {"answer": "a"})
+        cache.set("short", "investments", {"answer": "b"}, ttl=10)
+
+        clock.advance(30)
+        assert cache.get("short", "investments") is None
+        assert cache.get("q", "investments") == {"answer": "a"}
+        clock.advance(31)
+        assert cache.get("q", "investments") is None
+        assert cache.stats()["expirations"] == 2
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = _cache(max_size=2)
+        cache.set("a", "investments", {"answer": "a"})
+        cache.set("b", "investments", {"answer": "b"})
+        cache.get("a", "investments")
+        cache.set("c", "investments", {"answer": "c"})
+
+        assert cache.contains("a", "investments")
+        assert not cache.contains("b", "investments")
+        assert cache.stats()["evictions"] == 1
+
+
+class TestInvalidation:
+    def test_invalidate_domain(self):
+        cache = _cache()
+        cache.set("q", "investments", {"answer": "a"})
+        cache.set("q", "estate_planning", {"answer": "b"})
+
+        assert cache.invalidate("investments") == 1
+        assert cache.get("q", "investments") is None
+        assert cache.get("q", "estate_planning") == {"answer": "b"}
+
+    def test_invalidate_prompt_and_custom_tags(self):
+        cache = _cache()
+        cache.set("q", "investments", {"answer": "a"}, prompt_name="monte_carlo")
+        cache.set("r", "investments", {"answer": "b"}, tags=["fund:ibi"])
+        cache.set("s", "investments", {"answer": "c"})
+
+        assert cache.invalidate_tag("prompt:monte_carlo") == 1
+        assert cache.invalidate_tag("fund:ibi") == 1
+        assert cache.get("s", "investments") == {"answer": "c"}
+        assert cache.stats()["invalidations"] == 2
+
+    def test_invalidate_collection_bumps_its_version(self):
+        cache = _cache()
+        cache.set("q", "investments", {"answer": "a"})
+        cache.set("q", "estate_planning", {"answer": "b"})
+
+        assert cache.invalidate_collection("alti_investments") == 1
+        assert cache.collection_version("alti_investments") == 1
+        assert cache.get("q", "investments") is None
+        assert cache.get("q", "estate_planning") == {"answer": "b"}
+
+        # New entries are tagged with the new version and stay valid
+        cache.set("q", "investments", {"answer": "c"})
+        assert cache.get("q", "investments") == {"answer": "c"}
+        assert cache.stats()["collection_versions"] == {"alti_investments": 1}
+
+    def test_invalidate_everything(self):
+        cache = _cache()
+        cache.set("q", "investments", {"answer": "a"})
+        cache.set("q", "estate_planning", {"answer": "b"})
+
+        assert cache.invalidate() == 2
+        assert cache.stats()["size"] == 0
+        assert cache.stats()["memory_bytes"] == 0
+
+
+class TestContextualEntries:
+    def test_app_context_entries(self, clock):
+        bypass = _cache()
+        bypass.set("q", "investments", {"answer": "a"}, app_context={"page": "home"})
+        assert bypass.get("q", "investments", app_context={"page": "home"}) is None
+        assert bypass.stats()["size"] == 0
+
+        cache = _cache(default_ttl=3600, context_ttl=60)
+        cache.set("q", "investments", {"answer": "a"}, app_context={"page": "home"})
+        assert cache.get("q", "investments", app_context={"page": "home"}) == {"answer": "a"}
+        assert cache.get("q", "investments", app_context={"page": "portfolio"}) is None
+        clock.advance(61)
+        assert cache.get("q", "investments", app_context={"page": "home"}) is None
+
+    def test_volatile_fields_and_key_order_share_an_entry(self):
+        cache = _cache(context_ttl=60)
+        cache.set("q", "investments", {"answer": "a"}, app_context={"page": "home", "value": 1.00001, "timestamp": 1})
+
+        same = {"timestamp": 2, "value": 1.0, "page": "home"}
+        assert cache.get("q", "investments", app_context=same) == {"answer": "a"}
+
+
+class TestStaleWhileRevalidate:
+    def test_stale_entries_are_served_only_by_lookup(self, clock):
+        cache = _cache(default_ttl=10, stale_ttl=30)
+        cache.set("q", "investments", {"answer": "a"})
+
+        assert cache.lookup("q", "investments") == ({"answer": "a"}, "fresh")
+        clock.advance(15)
+        assert cache.lookup("q", "investments") == ({"answer": "a"}, "stale")
+        assert cache.get("q", "investments") is None
+        assert not cache.contains("q", "investments")
+        assert cache.stats()["stale_hits"] == 1
+
+        clock.advance(30)
+        assert cache.lookup("q", "investments") is None
+
+    def test_without_stale_ttl_nothing_is_stale(self, clock):
+        cache = _cache(default_ttl=10)
+        cache.set("q", "investments", {"answer": "a"})
+        clock.advance(11)
+        assert cache.lookup("q", "investments") is None
+
+    def test_refresh_runs_once_per_key(self):
+        cache = _cache(default_ttl=10, stale_ttl=30)
+        calls = []
+
+        async def main():
+            async def compute():
+                calls.append(1)
+                await asyncio.sleep(0.01)
+                cache.set("q", "investments", {"answer": "new"})
+
+            started = [cache.refresh("q", "investments", compute) for _ in range(3)]
+            await asyncio.gather(*cache._refresh_tasks)
+            return started
+
+        assert asyncio.run(main()) == [True, False, False]
+        assert calls == [1]
+        assert cache.get("q", "investments") == {"answer": "new"}
+        assert (cache.refreshes, cache.refreshes_skipped) == (1, 2)
+
+    def test_refreshes_are_rate_limited(self):
+        cache = _cache(stale_ttl=30, refresh_per_minute=1)
+
+        async def main():
+            async def compute():
+                pass
+
+            started = [cache.refresh(query, "investments", compute) for query in ("a", "b")]
+            await asyncio.gather(*cache._refresh_tasks)
+            return started
+
+        assert asyncio.run(main()) == [True, False]
+
+    def test_failed_refresh_can_be_retried(self):
+        cache = _cache(stale_ttl=30)
+
+        async def main():
+            async def fail():
+                raise RuntimeError("upstream down")
+
+            first = cache.refresh("q", "investments", fail)
+            await asyncio.gather(*cache._refresh_tasks)
+            return first, cache.refresh("q", "investments", fail)
+
+        assert asyncio.run(main()) == (True, True)
+
+
+class TestMemoryBudget:
+    def test_memory_budget_evicts_and_skips_oversized(self):
+        cache = _cache(max_bytes=100)
+        cache.set("a", "investments", {"answer": "x" * 40})
+        cache.set("b", "investments", {"answer": "y" * 40})
+        cache.set("huge", "investments", {"answer": "z" * 200})
+
+        assert not cache.contains("a", "investments")
+        assert cache.contains("b", "investments")
+        assert not cache.contains("huge", "investments")
+        assert cache.stats()["memory_bytes"] <= 100
+
+    def test_large_payloads_are_compressed(self):
+        cache = _cache(compress_min_bytes=256)
+        response = {"answer": "Allocation to private equity. " * 50}
+        cache.set("q", "investments", response)
+
+        assert cache.get("q", "investments") == response
+        stats = cache.stats()
+        assert stats["compressed_entries"] == 1
+        assert stats["memory_bytes"] < stats["raw_bytes"]
+
+
+class TestSnapshots:
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / "responses.jsonl.gz"
+        cache = _cache()
+        cache.set("q", "investments", {"answer": "a"}, tags=["fund:ibi"])
+        cache.set("q", "estate_planning", {"answer": "b"})
+        assert cache.save_snapshot(path) == 2
+
+        restored = _cache()
+        assert restored.load_snapshot(path) == 2
+        assert restored.get("q", "investments") == {"answer": "a"}
+        assert restored.invalidate_tag("fund:ibi") == 1
+
+    def test_expired_entries_are_skipped(self, tmp_path, clock):
+        path = tmp_path / "responses.jsonl.gz"
+        cache = _cache(default_ttl=10)
+        cache.set("q", "investments", {"answer": "a"})
+        cache.set("long", "investments", {"answer": "b"}, ttl=100)
+        cache.save_snapshot(path)
+
+        clock.advance(20)
+        restored = _cache()
+        assert restored.load_snapshot(path) == 1
+        assert restored.get("long", "investments") == {"answer": "b"}
+
+    def test_changed_collections_are_dropped(self, tmp_path):
+        path = tmp_path / "responses.jsonl.gz"
+        cache = _cache()
+        cache.set("q", "investments", {"answer": "a"})
+        cache.set("q", "estate_planning", {"answer": "b"})
+        cache.save_snapshot(path, fingerprints={"alti_investments": "v1", "estate_documents": "v1"})
+
+        restored = _cache()
+        loaded = restored.load_snapshot(path, fingerprints={"alti_investments": "v2", "estate_documents": "v1"})
+        assert loaded == 1
+        assert restored.get("q", "investments") is None
+        assert restored.get("q", "estate_planning") == {"answer": "b"}
+
+    def test_entries_are_retagged_with_current_versions(self, tmp_path):
+        path = tmp_path / "responses.jsonl.gz"
+        cache = _cache()
+        cache.invalidate_collection("alti_investments")
+        cache.set("q", "investments", {"answer": "a"})
+        cache.save_snapshot(path)
+
+        restored = _cache()
+        assert restored.load_snapshot(path) == 1
+        assert restored.get("q", "investments") == {"answer": "a"}
+        assert restored.invalidate_collection("alti_investments") == 1
+
+    def test_missing_or_corrupt_snapshots_load_nothing(self, tmp_path):
+        assert _cache().load_snapshot(tmp_path / "missing.jsonl.gz") == 0
+
+        corrupt = tmp_path / "corrupt.jsonl.gz"
+        corrupt.write_bytes(b"not a gzip file")
+        assert _cache().load_snapshot(corrupt) == 0
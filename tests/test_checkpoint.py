@@ -0,0 +1,239 @@
+"""
+Unit tests for the slim checkpoint serializer and bounded checkpointers
+(graph/checkpoint.py).
+
+Run: pytest tests/test_checkpoint.py -v
+"""
+
+import operator
+import time
+from types import SimpleNamespace
+from typing import Annotated, TypedDict
+
+import cohere
+import pytest
+from langchain_core.documents import Document
+from langgraph.graph import END, START, StateGraph
+
+from graph.checkpoint import (
+    CHECKPOINT_WRITE_NODE,
+    CHUNK_REF_KEY,
+    SQLITE_SAVER_AVAILABLE,
+    ZLIB_SUFFIX,
+    BoundedMemorySaver,
+    BoundedSqliteSaver,
+    ChunkStore,
+    SlimCheckpointSerializer,
+)
+from graph.nodes.grade import cohere_rerank
+
+
+@pytest.fixture
+def chunk_store():
+    store = ChunkStore()
+    store.register(
+        [
+            Document(page_content="IBI holds 12 funds.", metadata={"file_name": "ibi.xlsx"}, id="c1"),
+            Document(page_content="Carbon intensity is tCO2e/$M.", metadata={}, id="c2"),
+        ],
+        "alti_investments",
+    )
+    return store
+
+
+class TestSlimCheckpointSerializer:
+    def test_registered_documents_are_stored_by_reference(self, chunk_store):
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=0)
+        doc = Document(page_content="IBI holds 12 funds.", metadata={"file_name": "ibi.xlsx"}, id="c1")
+
+        type_, data = serde.dumps_typed({"retrieved_docs": [doc]})
+        assert CHUNK_REF_KEY.encode() in data
+        assert b"IBI holds 12 funds" not in data
+
+        (restored,) = serde.loads_typed((type_, data))["retrieved_docs"]
+        assert restored.page_content == doc.page_content
+        assert restored.metadata == doc.metadata
+        assert restored.id == "c1"
+        assert serde.stats()["docs_referenced"] == 1
+
+    def test_metadata_added_after_retrieval_is_kept(self, chunk_store):
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=0)
+        doc = Document(
+            page_content="IBI holds 12 funds.",
+            metadata={"file_name": "ibi.xlsx", "relevance_score": 0.91},
+            id="c1",
+        )
+        (restored,) = serde.loads_typed(serde.dumps_typed([doc]))
+        assert restored.metadata == {"file_name": "ibi.xlsx", "relevance_score": 0.91}
+
+    def test_reranked_documents_are_stored_by_reference(self, chunk_store, monkeypatch):
+        class FakeClient:
+            def __init__(self, api_key):
+                pass
+
+            def rerank(self, **kwargs):
+                return SimpleNamespace(results=[SimpleNamespace(index=1, relevance_score=0.87)])
+
+        monkeypatch.setattr(cohere, "ClientV2", FakeClient)
+        docs = [
+            Document(page_content="Carbon intensity is tCO2e/$M.", metadata={}, id="c2"),
+            Document(page_content="IBI holds 12 funds.", metadata={"file_name": "ibi.xlsx"}, id="c1"),
+        ]
+        (reranked,) = cohere_rerank(docs, "How many funds?", top_n=1, api_key="test")
+        assert reranked.id == "c1"
+
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=0)
+        type_, data = serde.dumps_typed({"retrieved_docs": [reranked]})
+        assert b"IBI holds 12 funds" not in data
+
+        (restored,) = serde.loads_typed((type_, data))["retrieved_docs"]
+        assert restored.id == "c1"
+        assert restored.page_content == "IBI holds 12 funds."
+        assert restored.metadata == {"file_name": "ibi.xlsx", "relevance_score": 0.87}
+
+    def test_unregistered_or_edited_documents_stay_inline(self, chunk_store):
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=0)
+        web = Document(page_content="From the web", metadata={"source": "web"})
+        edited = Document(page_content="IBI holds 13 funds.", id="c1")
+
+        type_, data = serde.dumps_typed([web, edited])
+        assert b"From the web" in data and b"IBI holds 13 funds" in data
+        restored = serde.loads_typed((type_, data))
+        assert [d.page_content for d in restored] == ["From the web", "IBI holds 13 funds."]
+        assert serde.stats()["docs_inline"] == 2
+
+    def test_slimming_can_be_disabled(self, chunk_store):
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=0, slim_documents=False)
+        _, data = serde.dumps_typed([Document(page_content="IBI holds 12 funds.", id="c1")])
+        assert CHUNK_REF_KEY.encode() not in data
+
+    def test_large_payloads_are_compressed(self, chunk_store):
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=1024)
+        value = {"generation": "Allocation to private equity. " * 200}
+
+        type_, data = serde.dumps_typed(value)
+        assert type_.endswith(ZLIB_SUFFIX)
+        assert serde.loads_typed((type_, data)) == value
+
+        raw, stored = serde.bytes_written()
+        assert stored < raw
+
+        small_type, _ = serde.dumps_typed({"generation": "short"})
+        assert not small_type.endswith(ZLIB_SUFFIX)
+
+    def test_deleted_chunks_are_dropped(self, chunk_store, monkeypatch, caplog):
+        import graph.nodes.retrieve as retrieve
+
+        def deleted(**kwargs):
+            raise RuntimeError("collection was re-ingested")
+
+        monkeypatch.setattr(retrieve, "get_chroma_retriever", deleted)
+        serde = SlimCheckpointSerializer(chunk_store=chunk_store, compress_threshold=0)
+        kept = Document(page_content="IBI holds 12 funds.", metadata={"file_name": "ibi.xlsx"}, id="c1")
+        lost = Document(page_content="Carbon intensity is tCO2e/$M.", metadata={}, id="c2")
+        type_, data = serde.dumps_typed({"retrieved_docs": [kept, lost], "top_doc": lost})
+
+        # Re-ingestion removed c2 from the collection
+        chunk_store.unregister_collection("alti_investments")
+        chunk_store.register([kept], "alti_investments")
+
+        restored = serde.loads_typed((type_, data))
+        assert [doc.id for doc in restored["retrieved_docs"]] == ["c1"]
+        assert restored["top_doc"] is None
+        assert serde.stats()["docs_missing"] == 2
+        assert "Chunk c2 no longer in alti_investments" in caplog.text
+
+    def test_unregister_collection(self, chunk_store):
+        assert chunk_store.unregister_collection("alti_investments") == 2
+        assert len(chunk_store) == 0
+        assert chunk_store.lookup(Document(page_content="IBI holds 12 funds.", id="c1")) is None
+
+
+class _State(TypedDict):
+    turns: Annotated[list, operator.add]
+
+
+def _build_graph(saver):
+    graph = StateGraph(_State)
+    graph.add_node("answer", lambda state: {"turns": ["x" * 500]})
+    graph.add_edge(START, "answer")
+    graph.add_edge("answer", END)
+    return graph.compile(checkpointer=saver)
+
+
+def _run(app, thread_id: str) -> dict:
+    return app.invoke({"turns": []}, {"configurable": {"thread_id": thread_id}})
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class TestBoundedMemorySaver:
+    def test_least_recently_used_threads_are_evicted(self):
+        saver = BoundedMemorySaver(max_threads=2, idle_ttl_seconds=0, max_thread_bytes=0)
+        app = _build_graph(saver)
+        for thread_id in ("t1", "t2", "t3"):
+            _run(app, thread_id)
+
+        assert saver.get_tuple(_config("t1")) is None
+        assert saver.get_tuple(_config("t3")) is not None
+        stats = saver.bounds_stats()
+        assert stats["threads"] == 2
+        assert stats["evicted_lru"] == 1
+
+    def test_reading_a_thread_keeps_it(self):
+        saver = BoundedMemorySaver(max_threads=2, idle_ttl_seconds=0, max_thread_bytes=0)
+        app = _build_graph(saver)
+        _run(app, "t1")
+        _run(app, "t2")
+        saver.get_tuple(_config("t1"))
+        _run(app, "t3")
+
+        assert saver.get_tuple(_config("t1")) is not None
+        assert saver.get_tuple(_config("t2")) is None
+
+    def test_idle_threads_expire(self):
+        saver = BoundedMemorySaver(max_threads=0, idle_ttl_seconds=60, max_thread_bytes=0)
+        app = _build_graph(saver)
+        _run(app, "t1")
+        saver._last_access["t1"] = time.time() - 120
+        _run(app, "t2")
+
+        assert saver.get_tuple(_config("t1")) is None
+        assert saver.bounds_stats()["evicted_ttl"] == 1
+
+    def test_oversized_threads_keep_only_the_latest_checkpoint(self):
+        saver = BoundedMemorySaver(max_threads=0, idle_ttl_seconds=0, max_thread_bytes=2000)
+        app = _build_graph(saver)
+        for _ in range(4):
+            result = _run(app, "t1")
+
+        # The conversation continues: every turn is still in the latest state
+        assert len(result["turns"]) == 4
+        assert len(list(saver.list(_config("t1")))) == 1
+        assert saver.bounds_stats()["threads_pruned"] > 0
+
+    def test_writes_are_recorded_per_node(self):
+        saver = BoundedMemorySaver(serde=SlimCheckpointSerializer(chunk_store=ChunkStore()))
+        _run(_build_graph(saver), "t1")
+
+        writes = saver.bounds_stats()["writes_by_node"]
+        assert writes[CHECKPOINT_WRITE_NODE]["writes"] > 0
+        assert writes["answer"]["writes"] == 1
+        assert writes["answer"]["stored_bytes"] > 0
+
+
+@pytest.mark.skipif(not SQLITE_SAVER_AVAILABLE, reason="langgraph-checkpoint-sqlite not installed")
+class TestBoundedSqliteSaver:
+    def test_eviction_survives_restart(self, tmp_path):
+        path = tmp_path / "checkpoints.sqlite"
+        saver = BoundedSqliteSaver.from_path(path, max_threads=2, idle_ttl_seconds=0, max_thread_bytes=0)
+        app = _build_graph(saver)
+        _run(app, "t1")
+        _run(app, "t2")
+
+        reopened = BoundedSqliteSaver.from_path(path, max_threads=2, idle_ttl_seconds=0, max_thread_bytes=0)
+        _run(_build_graph(reopened), "t3")
+        assert reopened.get_tuple(_config("t1")) is None
+        assert reopened.get_tuple(_config("t2")) is not None
@@ -0,0 +1,108 @@
+"""
+Unit tests for the local intent classifier (graph/nodes/classify.py).
+
+Run: pytest tests/test_classify.py -v
+"""
+
+from pathlib import Path
+
+import pytest
+
+from graph.nodes.classify import (
+    SEED_EXAMPLES,
+    UNCORROBORATED_MAX_CONFIDENCE,
+    IntentClassifier,
+    keyword_intent,
+    load_training_examples,
+    match_archetype,
+    match_keywords,
+    match_region,
+)
+from graph.nodes.route import RouterStats
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IntentClassifier().fit(SEED_EXAMPLES)
+
+
+class TestKeywords:
+    def test_match_keywords_counts_per_intent(self):
+        hits = match_keywords("Carbon intensity and ESG of the IBI holdings")
+        assert hits == {"archetype": 2, "pipeline": 0, "clarity": 2, "general": 0}
+
+    def test_keyword_intent(self):
+        assert keyword_intent({"archetype": 2, "pipeline": 1, "clarity": 0, "general": 0}) == "archetype"
+        assert keyword_intent({"archetype": 0, "pipeline": 0, "clarity": 0, "general": 0}) == "general"
+        assert keyword_intent({"archetype": 1, "pipeline": 1, "clarity": 0, "general": 0}) is None
+
+    def test_archetype_and_region(self):
+        assert match_archetype("What's in IBI?") == "Integrated Best Ideas"
+        assert match_region("How does the international version differ?") == "INT"
+        assert match_region("Tell us about the model") is None
+        assert match_region("the US allocation") == "US"
+
+
+class TestIntentClassifier:
+    @pytest.mark.parametrize("query, intent", [
+        ("What's in IBI?", "archetype"),
+        ("What's in the pipeline?", "pipeline"),
+        ("What is carbon intensity?", "clarity"),
+        ("What is tracking error?", "general"),
+    ])
+    def test_classifies_seed_intents(self, classifier, query, intent):
+        assert classifier.classify(query).intent == intent
+
+    def test_keyword_backed_prediction_keeps_its_confidence(self, classifier):
+        result = classifier.classify("What's in IBI?")
+        assert result.confidence > 0.9
+        assert result.keyword_hits == 1
+
+    def test_uncorroborated_prediction_is_capped(self, classifier):
+        # No archetype keyword: Naive Bayes alone is not trusted with a non-general intent
+        result = classifier.classify("How volatile is the balanced model?")
+        assert result.intent != "general"
+        assert result.keyword_hits == 0
+        assert result.confidence <= UNCORROBORATED_MAX_CONFIDENCE
+
+    def test_tied_keywords_cap_confidence(self, classifier):
+        # One clarity and one pipeline keyword: the keywords don't pick an intent
+        result = classifier.classify("What is the ESG score of the upcoming fund?")
+        assert result.keyword_hits == 2
+        assert result.confidence <= UNCORROBORATED_MAX_CONFIDENCE
+
+    def test_probabilities_sum_to_one(self, classifier):
+        probabilities, hits = classifier.predict_proba("New opportunities in the pipeline")
+        assert sum(probabilities.values()) == pytest.approx(1.0)
+        assert hits["pipeline"] == 2
+
+
+def test_load_training_examples(tmp_path: Path):
+    queries = tmp_path / "queries.yaml"
+    queries.write_text(
+        "queries:\n"
+        "  - id: a\n    query: \"CMA for bonds\"\n    intent: general\n"
+        "  - id: b\n    query: \"ESG of my portfolio\"\n    tags: [clarity_ai]\n"
+        "  - id: c\n    query: \"Unlabelled\"\n    tags: [edge_case]\n"
+    )
+    log = tmp_path / "intent_routing.jsonl"
+    log.write_text('{"query": "Closing soon?", "llm_intent": "pipeline"}\nnot json\n')
+
+    examples = load_training_examples(eval_queries_path=queries, routing_log_path=log)
+    assert examples[:len(SEED_EXAMPLES)] == SEED_EXAMPLES
+    assert examples[len(SEED_EXAMPLES):] == [
+        ("CMA for bonds", "general"),
+        ("ESG of my portfolio", "clarity"),
+        ("Closing soon?", "pipeline"),
+    ]
+
+
+def test_router_stats_counts_llm_failures():
+    stats = RouterStats()
+    stats.record_decision("local")
+    stats.record_decision("llm")
+    stats.record_decision("llm_failed")
+    summary = stats.stats()
+    assert summary["local_decisions"] == 2
+    assert summary["llm_decisions"] == 1
+    assert summary["llm_failures"] == 1
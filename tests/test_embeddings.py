@@ -0,0 +1,118 @@
+"""
+Unit tests for the ingestion embedding cache and batched embedder
+(ingestion/embeddings.py).
+
+Run: pytest tests/test_embeddings.py -v
+"""
+
+import pytest
+from llama_index.core import MockEmbedding
+from llama_index.core.schema import TextNode
+
+from ingestion.embeddings import CachedEmbedder, EmbeddingCache, text_hash
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(tmp_path / "cache" / "embeddings.sqlite")
+
+
+class _FakeBatches:
+    """Stands in for the model's batch call: one vector per text, derived from its length."""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail_on is not None and self.fail_on in texts:
+            raise RuntimeError("rate limited")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def _embedder(cache, fake=None, **kwargs) -> CachedEmbedder:
+    embedder = CachedEmbedder(MockEmbedding(embed_dim=2), cache, model_key="mock:2", **kwargs)
+    if fake is not None:
+        embedder._embed_batch = fake
+    return embedder
+
+
+class TestEmbeddingCache:
+    def test_roundtrip_per_model(self, cache):
+        cache.put_many("a", {"h1": [0.25, 0.5], "h2": [1.0, 2.0]})
+        cache.put_many("b", {"h1": [3.0, 4.0]})
+
+        assert cache.get_many("a", ["h1", "h2", "h3", "h1"]) == {"h1": [0.25, 0.5], "h2": [1.0, 2.0]}
+        assert cache.get_many("b", ["h1"]) == {"h1": [3.0, 4.0]}
+        assert (cache.count(), cache.count("a"), cache.count("c")) == (3, 2, 0)
+
+    def test_vectors_are_stored_as_float32(self, cache):
+        cache.put_many("a", {"h1": [0.1]})
+        (value,) = cache.get_many("a", ["h1"])["h1"]
+        assert value == pytest.approx(0.1, rel=1e-6)
+
+    def test_replaces_existing_vectors(self, cache):
+        cache.put_many("a", {"h1": [1.0]})
+        cache.put_many("a", {"h1": [2.0]})
+        assert cache.get_many("a", ["h1"]) == {"h1": [2.0]}
+        assert cache.count() == 1
+
+    def test_lookups_larger_than_one_query(self, cache):
+        items = {f"h{i}": [float(i)] for i in range(1200)}
+        cache.put_many("a", items)
+        assert cache.get_many("a", list(items)) == items
+
+    def test_persists_across_connections(self, cache):
+        cache.put_many("a", {"h1": [1.0]})
+        assert EmbeddingCache(cache.path).get_many("a", ["h1"]) == {"h1": [1.0]}
+
+
+class TestCachedEmbedder:
+    def test_misses_are_embedded_once_and_cached(self, cache):
+        fake = _FakeBatches()
+        embedder = _embedder(cache, fake)
+
+        assert embedder.embed_texts(["ab", "abc", "ab"]) == [[2.0, 1.0], [3.0, 1.0], [2.0, 1.0]]
+        assert fake.batches == [["ab", "abc"]]
+
+        assert embedder.embed_texts(["abc", "abcd"]) == [[3.0, 1.0], [4.0, 1.0]]
+        assert fake.batches[1:] == [["abcd"]]
+        stats = embedder.stats()
+        assert (stats["cache_hits"], stats["cache_misses"]) == (1, 3)
+        assert stats["cached_embeddings"] == 3
+
+    def test_misses_are_split_into_batches(self, cache):
+        fake = _FakeBatches()
+        embedder = _embedder(cache, fake, batch_size=2, concurrency=2)
+
+        texts = [f"text {i}" for i in range(5)]
+        assert embedder.embed_texts(texts) == [[6.0, 1.0]] * 5
+        assert sorted(len(batch) for batch in fake.batches) == [1, 2, 2]
+        assert embedder.requests == 3
+
+    def test_finished_batches_survive_a_failure(self, cache):
+        embedder = _embedder(cache, _FakeBatches(fail_on="c"), batch_size=2, concurrency=1)
+
+        with pytest.raises(RuntimeError):
+            embedder.embed_texts(["a", "b", "c"])
+        assert set(cache.get_many("mock:2", [text_hash("a"), text_hash("b"), text_hash("c")])) == {
+            text_hash("a"), text_hash("b"),
+        }
+
+    def test_without_a_cache(self):
+        fake = _FakeBatches()
+        embedder = _embedder(None, fake)
+        embedder.embed_texts(["a"])
+        embedder.embed_texts(["a"])
+        assert len(fake.batches) == 2
+        assert embedder.stats()["cached_embeddings"] == 0
+
+    def test_embed_nodes_skips_embedded_nodes(self, cache):
+        embedder = _embedder(cache)
+        nodes = [TextNode(text="IBI holds 12 funds."), TextNode(text="done", embedding=[9.0, 9.0])]
+
+        embedder.embed_nodes(nodes)
+        assert nodes[0].embedding == [0.5, 0.5]
+        assert nodes[1].embedding == [9.0, 9.0]
+        assert embedder.cache_misses == 1
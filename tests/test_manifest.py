@@ -0,0 +1,132 @@
+"""
+Unit tests for the incremental ingestion manifest (ingestion/manifest.py).
+
+Run: pytest tests/test_manifest.py -v
+"""
+
+import os
+
+import pytest
+
+from ingestion.manifest import IngestionManifest, chunk_id_prefix, file_key, file_sha256
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return IngestionManifest.for_collection(tmp_path / "chroma", "alti_investments")
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data" / "holdings.csv"
+    path.parent.mkdir()
+    path.write_text("fund,weight\nIBI,0.5\n")
+    return path
+
+
+def _record(manifest, path, fingerprint="fp1"):
+    manifest.record(path, file_sha256(path), fingerprint, chunk_ids=["c1", "c2"], documents=1)
+
+
+class TestIsCurrent:
+    def test_unknown_file_is_not_current(self, manifest, data_file):
+        assert manifest.is_current(data_file, "fp1") == (False, None)
+
+    def test_recorded_file_is_current_without_hashing(self, manifest, data_file):
+        _record(manifest, data_file)
+        assert manifest.is_current(data_file, "fp1") == (True, file_sha256(data_file))
+
+    def test_fingerprint_change_reingests(self, manifest, data_file):
+        _record(manifest, data_file)
+        assert manifest.is_current(data_file, "fp2") == (False, None)
+
+    def test_touched_but_unchanged_file_is_current(self, manifest, data_file):
+        _record(manifest, data_file)
+        manifest.save()
+        stat = data_file.stat()
+        os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert manifest.is_current(data_file, "fp1") == (True, file_sha256(data_file))
+        # The new mtime is remembered, so the next check skips hashing
+        assert manifest.get(data_file)["mtime_ns"] == data_file.stat().st_mtime_ns
+        assert manifest.dirty
+
+    def test_edited_file_is_not_current(self, manifest, data_file):
+        _record(manifest, data_file)
+        data_file.write_text("fund,weight\nIBI,0.6\n")
+
+        current, sha256 = manifest.is_current(data_file, "fp1")
+        assert not current
+        assert sha256 == file_sha256(data_file)
+
+
+class TestPersistence:
+    def test_save_and_reload(self, manifest, data_file):
+        _record(manifest, data_file)
+        assert manifest.dirty
+        manifest.save()
+        assert not manifest.dirty
+
+        reloaded = IngestionManifest(manifest.path)
+        assert reloaded.get(data_file)["chunk_ids"] == ["c1", "c2"]
+        assert list(manifest.path.parent.glob(".*.tmp")) == []
+
+    def test_unreadable_manifest_is_ignored(self, manifest):
+        manifest.path.parent.mkdir(parents=True)
+        manifest.path.write_text("{not json")
+        assert IngestionManifest(manifest.path).files == {}
+
+    def test_other_versions_are_ignored(self, manifest):
+        manifest.path.parent.mkdir(parents=True)
+        manifest.path.write_text('{"version": 0, "files": {"x": {}}}')
+        assert IngestionManifest(manifest.path).files == {}
+
+    def test_clear(self, manifest, data_file):
+        _record(manifest, data_file)
+        manifest.clear()
+        assert IngestionManifest(manifest.path).files == {}
+
+    def test_content_fingerprint_tracks_same_size_edits(self, manifest, data_file):
+        _record(manifest, data_file)
+        before = manifest.content_fingerprint()
+        assert IngestionManifest(manifest.path).content_fingerprint() != before  # Not saved yet
+
+        manifest.save()
+        assert IngestionManifest(manifest.path).content_fingerprint() == before
+
+        data_file.write_text("fund,weight\nIBI,0.6\n")
+        _record(manifest, data_file)
+        assert manifest.content_fingerprint() != before
+
+
+class TestMissingFiles:
+    def test_deleted_files_matching_the_scan(self, manifest, data_file, tmp_path):
+        nested = data_file.parent / "archive" / "old.csv"
+        nested.parent.mkdir()
+        nested.write_text("x")
+        other = tmp_path / "elsewhere.csv"
+        other.write_text("x")
+        for path in (data_file, nested, other):
+            _record(manifest, path)
+        for path in (data_file, nested, other):
+            path.unlink()
+
+        directory = data_file.parent
+        assert manifest.missing_files(directory, recursive=False, extensions=[".csv"]) == [file_key(data_file)]
+        assert set(manifest.missing_files(directory, recursive=True, extensions=[".CSV"])) == {
+            file_key(data_file), file_key(nested),
+        }
+        assert manifest.missing_files(directory, recursive=True, extensions=[".xlsx"]) == []
+
+    def test_remove(self, manifest, data_file):
+        _record(manifest, data_file)
+        manifest.save()
+        assert manifest.remove(file_key(data_file))["documents"] == 1
+        assert manifest.dirty
+        assert manifest.remove(file_key(data_file)) is None
+
+
+def test_chunk_id_prefix_is_per_file_version():
+    assert chunk_id_prefix("/a.csv", "h1") == chunk_id_prefix("/a.csv", "h1")
+    assert chunk_id_prefix("/a.csv", "h1") != chunk_id_prefix("/a.csv", "h2")
+    assert chunk_id_prefix("/a.csv", "h1") != chunk_id_prefix("/b.csv", "h1")
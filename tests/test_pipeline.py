@@ -0,0 +1,150 @@
+"""
+Unit tests for streaming, batched ingestion (ingestion/pipeline.py).
+
+Run: pytest tests/test_pipeline.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from ingestion.manifest import IngestionManifest
+from ingestion.pipeline import IngestionPipeline, iter_in_background
+
+SECTION = "Allocation guidance for the model portfolio, reviewed every quarter by the committee."
+
+
+class _FakeBatches:
+    """Stands in for the embedding model's batch call, failing on batches containing fail_on."""
+
+    def __init__(self, fail_on=None):
+        self.texts = []
+        self.fail_on = fail_on
+
+    def __call__(self, texts):
+        if self.fail_on is not None and any(self.fail_on in text for text in texts):
+            raise RuntimeError("embedding service unavailable")
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    pipeline = IngestionPipeline(
+        chroma_persist_dir=str(tmp_path / "chroma"),
+        collection_name="test_docs",
+        provider="openai",
+        embedding_model="text-embedding-3-small",
+        index_batch_size=1,  # One file per indexing batch
+        queue_size=1,
+        embedding_cache=False,
+    )
+    pipeline.embedder._embed_batch = _FakeBatches()
+    return pipeline
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    """Three markdown files, one chunk each; returns (directory, files in ingestion order)."""
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    for name in ("alpha", "beta", "gamma"):
+        (directory / f"{name}.md").write_text(f"# {name}\n\n## Overview\n{SECTION} ({name})\n")
+    # ingest_directory visits files in glob order
+    return directory, list(directory.glob("*.md"))
+
+
+class TestPartialFailure:
+    def test_committed_batches_survive_a_failed_batch(self, pipeline, docs_dir):
+        directory, files = docs_dir
+        first, failing, last = files
+        failing.write_text(f"# failing\n\n## Overview\n{SECTION} FAIL\n")
+        pipeline.embedder._embed_batch = _FakeBatches(fail_on="FAIL")
+
+        with pytest.raises(RuntimeError, match="embedding service unavailable"):
+            pipeline.ingest_directory(directory)
+
+        # The batch before the failure is committed to disk and to the collection
+        manifest = IngestionManifest.for_collection(pipeline.chroma_persist_dir, "test_docs")
+        assert manifest.get(first) is not None
+        assert manifest.get(failing) is None
+        assert manifest.get(last) is None
+        stored = pipeline.chroma_collection.get(ids=manifest.get(first)["chunk_ids"])
+        assert len(stored["ids"]) == len(manifest.get(first)["chunk_ids"]) > 0
+        assert pipeline.chroma_collection.count() == len(stored["ids"])
+
+    def test_rerun_skips_committed_files(self, pipeline, docs_dir):
+        directory, files = docs_dir
+        first, failing, last = files
+        failing.write_text(f"# failing\n\n## Overview\n{SECTION} FAIL\n")
+        pipeline.embedder._embed_batch = _FakeBatches(fail_on="FAIL")
+        with pytest.raises(RuntimeError, match="embedding service unavailable"):
+            pipeline.ingest_directory(directory)
+
+        # The service recovers: only the files that weren't committed are embedded
+        fake = pipeline.embedder._embed_batch = _FakeBatches()
+        result = pipeline.ingest_directory(directory)
+
+        statuses = {report["file"]: report["status"] for report in result["files"]}
+        assert statuses == {str(first): "unchanged", str(failing): "added", str(last): "added"}
+        assert all(first.stem not in text for text in fake.texts)
+        assert result["collection_count"] == sum(
+            len(pipeline.manifest.get(path)["chunk_ids"]) for path in files
+        )
+
+    def test_failed_run_still_invalidates_committed_batches(self, pipeline, docs_dir):
+        directory, files = docs_dir
+        changes = []
+        pipeline.on_change = lambda collection, reason: changes.append((collection, reason))
+        files[1].write_text(f"# failing\n\n## Overview\n{SECTION} FAIL\n")
+        pipeline.embedder._embed_batch = _FakeBatches(fail_on="FAIL")
+
+        with pytest.raises(RuntimeError, match="embedding service unavailable"):
+            pipeline.ingest_directory(directory)
+        assert changes == [("test_docs", "ingested")]
+
+    def test_failed_run_still_purges_deleted_files(self, pipeline, docs_dir):
+        directory, files = docs_dir
+        pipeline.ingest_directory(directory)
+        files[0].unlink()
+        files[1].write_text(f"# failing\n\n## Overview\n{SECTION} FAIL\n")
+        pipeline.embedder._embed_batch = _FakeBatches(fail_on="FAIL")
+        changes = []
+        pipeline.on_change = lambda collection, reason: changes.append(reason)
+
+        with pytest.raises(RuntimeError, match="embedding service unavailable"):
+            pipeline.ingest_directory(directory)
+        assert pipeline.manifest.get(files[0]) is None
+        assert changes == ["ingested"]
+
+    def test_failure_before_any_commit_does_not_invalidate(self, pipeline, docs_dir):
+        directory, files = docs_dir
+        changes = []
+        pipeline.on_change = lambda collection, reason: changes.append(reason)
+        pipeline.embedder._embed_batch = _FakeBatches(fail_on="FAIL")
+        files[0].write_text(f"# failing\n\n## Overview\n{SECTION} FAIL\n")
+
+        with pytest.raises(RuntimeError, match="embedding service unavailable"):
+            pipeline.ingest_file(files[0])
+        assert changes == []
+
+
+def test_background_iterator_buffers_at_most_maxsize_items():
+    produced = []
+    lock = threading.Lock()
+
+    def items():
+        for i in range(100):
+            with lock:
+                produced.append(i)
+            yield i
+
+    stream = iter_in_background(items(), maxsize=2)
+    assert next(stream) == 0
+    time.sleep(0.3)  # Let the producer run ahead as far as the buffer allows
+    with lock:
+        # Two buffered items, plus one the producer holds while the buffer is full
+        assert len(produced) <= 1 + 2 + 1
+    stream.close()
@@ -0,0 +1,50 @@
+"""
+Unit tests for the retriever caches (graph/nodes/retrieve.py).
+
+Run: pytest tests/test_retrieve.py -v
+"""
+
+import threading
+
+import pytest
+
+import graph.nodes.retrieve as retrieve
+
+
+@pytest.fixture
+def slow_chroma(monkeypatch):
+    """Chroma stand-in whose construction blocks until released."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(retrieve, "_vectorstores", {})
+    monkeypatch.setattr(retrieve, "_retrievers", {})
+    started, release = threading.Event(), threading.Event()
+
+    class SlowChroma:
+        def __init__(self, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+
+        def as_retriever(self, **kwargs):
+            return object()
+
+    monkeypatch.setattr(retrieve, "Chroma", SlowChroma)
+    return started, release
+
+
+def test_invalidation_waits_for_an_in_progress_build(slow_chroma):
+    started, release = slow_chroma
+    builder = threading.Thread(target=retrieve.get_chroma_retriever, kwargs={"collection_name": "docs", "k": 5})
+    builder.start()
+    assert started.wait(timeout=5)
+
+    invalidator = threading.Thread(target=retrieve.invalidate_retrievers, args=("docs",))
+    invalidator.start()
+    invalidator.join(timeout=0.2)
+    assert invalidator.is_alive()  # Blocked behind the build
+
+    release.set()
+    builder.join(timeout=5)
+    invalidator.join(timeout=5)
+    # The invalidation ran after the build, so nothing stale is left cached
+    assert retrieve._vectorstores == {}
+    assert retrieve._retrievers == {}
@@ -0,0 +1,63 @@
+"""
+Unit tests for how coalesced v2 queries are answered and logged (api/routes.py).
+
+Run: pytest tests/test_routes.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import api.routes as routes
+from api.routes import PrismQueryRequest, PrismQueryResponse
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    """Capture the metrics.jsonl and queries_full.jsonl records instead of writing them."""
+    records = {"metrics": [], "full": []}
+    monkeypatch.setattr(routes.QueryMetrics, "log", lambda self: records["metrics"].append(self))
+    monkeypatch.setattr(routes, "log_full_query", lambda **kwargs: records["full"].append(kwargs))
+    return records
+
+
+def _shared(**kwargs) -> PrismQueryResponse:
+    fields = dict(
+        answer="IBI holds global equity funds.",
+        sources=[{"file_name": "ibi.md"}],
+        intent="archetype",
+        retrieval_quality="good",
+        turn_count=1,
+        thread_id="leader-thread",
+        query_id="leader-t",
+    )
+    fields.update(kwargs)
+    return PrismQueryResponse(**fields)
+
+
+class TestAdoptCoalescedResponse:
+    def test_waiter_is_logged_under_its_own_query_id(self, logged):
+        request = PrismQueryRequest(query="What's in IBI?", thread_id="waiter-thread-id")
+        response = asyncio.run(
+            routes._adopt_coalesced_response(request, "balanced", None, _shared(), time.monotonic())
+        )
+
+        assert (response.thread_id, response.query_id) == ("waiter-thread-id", "waiter-t")
+        (metrics,) = logged["metrics"]
+        assert (metrics.query_id, metrics.endpoint, metrics.coalesced) == ("waiter-t", "v2", True)
+        assert metrics.top_sources == [{"file": "ibi.md"}]
+        (full,) = logged["full"]
+        assert (full["query_id"], full["coalesced"]) == ("waiter-t", True)
+        assert full["response_text"] == "IBI holds global equity funds."
+
+    def test_rerun_is_logged_by_the_rerun(self, logged, monkeypatch):
+        async def rerun(request, profile, timeout_ms):
+            return _shared(thread_id=request.thread_id, query_id=request.thread_id[:8])
+
+        monkeypatch.setattr(routes, "_run_prism_query", rerun)
+        request = PrismQueryRequest(query="What's in IBI?", thread_id="waiter-thread-id")
+        shared = _shared(degradations=["skipped rerank"])
+        asyncio.run(routes._adopt_coalesced_response(request, "balanced", None, shared, time.monotonic()))
+
+        assert logged == {"metrics": [], "full": []}
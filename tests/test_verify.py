@@ -0,0 +1,168 @@
+"""
+Unit tests for the deterministic grounding verifier (graph/nodes/verify.py).
+
+Run: pytest tests/test_verify.py -v
+"""
+
+import time
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+import graph.nodes.generate as generate
+from graph.nodes.generate import SHORT_CONTEXT_MAX_CHARS, check_hallucination
+from graph.nodes.verify import _parse_numbers, extract_fund_names, verify_grounding
+
+
+class TestParseNumbers:
+    def test_percent_and_precision(self):
+        (number,) = _parse_numbers("returned 5.23%")
+        assert number.value == 5.23
+        assert number.is_claim and number.is_percent
+        assert abs(number.tolerance - 0.005) < 1e-6
+
+    def test_whole_numbers_are_exact(self):
+        (number,) = _parse_numbers("8%")
+        assert number.tolerance < 1e-6
+
+    def test_scale_suffixes(self):
+        values = [n.value for n in _parse_numbers("$7.5M, 7.5 million and $7,500,000")]
+        assert values == [7.5e6, 7.5e6, 7.5e6]
+
+    def test_basis_points(self):
+        (number,) = _parse_numbers("25 bps")
+        assert number.value == 0.25
+        assert number.is_percent
+
+    def test_bare_integers_are_not_claims(self):
+        assert [n.is_claim for n in _parse_numbers("in 2024 across 12 funds")] == [False, False]
+
+
+class TestVerifyGrounding:
+    def test_matching_claims_are_grounded(self):
+        result = verify_grounding("Returns were 7.6% with 12.1% volatility.", "Return 7.6%, volatility 12.1%")
+        assert result.verdict == "grounded"
+        assert result.matched == ["7.6%", "12.1%"]
+
+    def test_whole_number_claim_does_not_absorb_rounding(self):
+        result = verify_grounding("Returns were 8% and volatility 12.1%.", "Return 7.6, volatility 12.1%")
+        assert result.unmatched == ["8%"]
+        assert result.verdict is None
+
+    def test_decimal_claim_allows_its_rounding(self):
+        result = verify_grounding("Returns were 7.6% and volatility 12.1%.", "Return 7.64%, volatility 12.08%")
+        assert result.verdict == "grounded"
+
+    def test_fraction_matches_percent_claim(self):
+        result = verify_grounding("Yield of 5.23% and fees of 0.75%.", "yield: 0.0523, fees: 0.0075")
+        assert result.verdict == "grounded"
+
+    def test_percent_context_matches_fraction_claim(self):
+        result = verify_grounding("Weights 0.25 and 0.40.", "Equity 25%, bonds 40%")
+        assert result.verdict == "grounded"
+
+    def test_no_percent_scaling_without_a_percent_sign(self):
+        # 1.5 vs 150 only match as fraction/percent, and neither side is a percentage
+        result = verify_grounding("A ratio of 1.5 and 2.5x leverage.", "Ratio 150, leverage 2.5x")
+        assert result.unmatched == ["1.5"]
+
+    def test_single_matched_claim_defers_to_llm(self):
+        result = verify_grounding("The allocation is 12.5%.", "Allocation 12.5%")
+        assert result.matched == ["12.5%"]
+        assert result.verdict is None
+
+    def test_fund_names_alone_defer_to_llm(self):
+        result = verify_grounding(
+            "Consider the Example Growth Fund.", "Holdings: Example Growth Fund",
+        )
+        assert result.matched == ["Example Growth Fund"]
+        assert result.verdict is None
+
+        result = verify_grounding(
+            "Compare the Example Growth Fund with the Example Income Fund.",
+            "Holdings: Example Growth Fund, Example Income Fund",
+        )
+        assert len(result.matched) == 2
+        assert result.verdict is None
+
+    def test_fund_name_counts_as_a_matched_claim(self):
+        result = verify_grounding(
+            "The Example Growth Fund returned 9.1%.", "Example Growth Fund returned 9.1%",
+        )
+        assert result.verdict == "grounded"  # Two matched claims (name and number)
+
+        result = verify_grounding("It returned 9.1%.", "Example Growth Fund returned 9.1%")
+        assert result.verdict is None
+
+    def test_known_names_count_as_context(self):
+        result = verify_grounding(
+            "we recommend Example Impact Partners at 4.5%.",
+            "Target allocation 4.5%",
+            known_names=["Example Impact Partners"],
+        )
+        assert result.matched == ["4.5%", "Example Impact Partners"]
+        assert result.verdict == "grounded"
+
+    def test_mostly_unmatched_is_not_grounded(self):
+        result = verify_grounding("Returns of 9.4% and 3.2% with 1.1% fees.", "Returns 7.6%")
+        assert result.verdict == "not_grounded"
+        assert result.unmatched == ["9.4%", "3.2%", "1.1%"]
+
+    def test_no_claims_is_undecided(self):
+        assert verify_grounding("Happy to help with that.", "context").verdict is None
+        assert verify_grounding("", "context").verdict is None
+
+
+def test_extract_fund_names_strips_leading_stopwords():
+    assert extract_fund_names("The Example Growth Fund II LP") == ["Example Growth Fund II LP"]
+
+
+def test_numbers_echoed_from_the_query_are_not_evidence():
+    doc = Document(page_content="Equity allocation was 60% last year.", metadata={})
+    state = {
+        "query": "My portfolio returned 9.4% with 3.2% volatility. Is that good?",
+        "generation": "Your portfolio returned 9.4% with 3.2% volatility.",
+        "context_docs": [doc],
+    }
+    result = check_hallucination(state)
+    assert result["hallucination_check"] == "not_grounded"
+
+
+def test_only_the_generation_context_is_evidence():
+    # The claims are in a relevant doc that was dropped from the prompt, and
+    # past the character limit of a doc that was included
+    included = Document(page_content="Overview. " + "x" * 900 + " Returned 9.4% with 3.2% volatility.")
+    dropped = Document(page_content="The fund returned 9.4% with 3.2% volatility.")
+    state = {
+        "query": "How did the fund do?",
+        "generation": "The fund returned 9.4% with 3.2% volatility.",
+        "graded_docs": [
+            {"document": included, "relevance": "relevant"},
+            {"document": dropped, "relevance": "relevant"},
+        ],
+        "context_docs": [included],
+        "context_max_chars": 800,
+    }
+    assert check_hallucination(state)["hallucination_check"] == "not_grounded"
+
+    state["context_max_chars"] = 1500
+    assert check_hallucination(state)["hallucination_check"] == "grounded"
+
+
+def test_generation_records_the_short_context_it_used(monkeypatch):
+    monkeypatch.setattr(
+        generate, "ChatOpenAI", lambda **kwargs: RunnableLambda(lambda _: AIMessage(content="answer")),
+    )
+    docs = [Document(page_content=f"Fund {i} returned {i}.5%.") for i in range(5)]
+    state = {
+        "query": "How did the funds do?",
+        "messages": [],
+        "graded_docs": [{"document": doc, "relevance": "relevant", "score": 0.9} for doc in docs],
+        "deadline": time.time() + 3,  # Inside SHORT_CONTEXT_MS
+    }
+    result = generate.generate_response(state)
+
+    assert result["generation"] == "answer"
+    assert result["context_docs"] == docs[:3]
+    assert result["context_max_chars"] == SHORT_CONTEXT_MAX_CHARS
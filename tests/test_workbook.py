@@ -0,0 +1,118 @@
+"""
+Unit tests for single-pass workbook parsing and the sheet cache
+(ingestion/workbook.py).
+
+Run: pytest tests/test_workbook.py -v
+"""
+
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from ingestion import workbook
+from ingestion.manifest import file_sha256
+from ingestion.workbook import is_blank, read_workbook, sheet_frame
+
+
+@pytest.fixture
+def xlsx(tmp_path):
+    """Small workbook with blanks, dates and mixed-type columns."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "LIST"
+    rows = [
+        ["Fund", "Weight", "Inception", "Notes", None],
+        ["Example Growth Fund", 0.25, datetime(2019, 3, 1), "core", None],
+        ["Example Income Fund", None, datetime(2021, 7, 15), 42, None],
+        [None, None, None, None, None],
+        ["Example Impact Partners", "n/a", None, 3.5, "late"],
+        ["Example Climate Fund", 1, datetime(2024, 1, 31, 9, 30), "", None],
+    ]
+    for row in rows:
+        ws.append(row)
+
+    title = wb.create_sheet("Summary")
+    title.append(["Capital Market Assumptions"])
+    title.append([])
+    title.append(["Asset Class", "Return", "Volatility"])
+    title.append(["US Equity", 0.065, 0.16])
+    title.append(["Cash", 0.03, None])
+
+    wb.create_sheet("Empty")
+
+    path = tmp_path / "holdings.xlsx"
+    wb.save(path)
+    return path
+
+
+class TestSheetFrame:
+    @pytest.mark.parametrize(
+        "sheet, header",
+        [("LIST", 0), ("LIST", None), ("Summary", 2), ("Summary", None)],
+    )
+    def test_matches_read_excel(self, xlsx, tmp_path, sheet, header):
+        sheets = read_workbook(xlsx, cache_dir=tmp_path / "cache")
+        expected = pd.read_excel(xlsx, sheet, header=header)
+        pd.testing.assert_frame_equal(sheet_frame(sheets[sheet], header), expected)
+
+    def test_blank_sheet(self, xlsx, tmp_path):
+        sheets = read_workbook(xlsx, cache_dir=tmp_path / "cache")
+        assert is_blank(sheets["Empty"])
+        assert not is_blank(sheets["LIST"])
+        assert sheet_frame(sheets["Empty"], 0).empty
+
+    def test_selected_sheets_in_workbook_order(self, xlsx, tmp_path):
+        sheets = read_workbook(xlsx, sheet_names=["Summary", "LIST", "Missing"], cache_dir=tmp_path / "cache")
+        assert list(sheets) == ["LIST", "Summary"]
+
+
+class TestWorkbookCache:
+    def test_unchanged_workbook_is_not_parsed_again(self, xlsx, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        first = read_workbook(xlsx, cache_dir=cache_dir)
+        assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("workbook parsed despite a cache hit")
+
+        monkeypatch.setattr(workbook, "_parse_workbook", fail)
+        cached = read_workbook(xlsx, cache_dir=cache_dir)
+        assert list(cached) == list(first)
+        pd.testing.assert_frame_equal(cached["LIST"], first["LIST"])
+
+    def test_sheet_selections_are_cached_separately(self, xlsx, tmp_path):
+        cache_dir = tmp_path / "cache"
+        read_workbook(xlsx, cache_dir=cache_dir)
+        assert list(read_workbook(xlsx, sheet_names=["Summary"], cache_dir=cache_dir)) == ["Summary"]
+        assert len(list(cache_dir.glob("*.pkl"))) == 2
+
+    def test_unreadable_cache_is_reparsed(self, xlsx, tmp_path):
+        cache_dir = tmp_path / "cache"
+        read_workbook(xlsx, cache_dir=cache_dir)
+        (cache_path,) = cache_dir.glob("*.pkl")
+        cache_path.write_bytes(b"not a pickle")
+
+        sheets = read_workbook(xlsx, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(sheet_frame(sheets["LIST"], 0), pd.read_excel(xlsx, "LIST"))
+
+    def test_least_recently_used_entries_are_pruned(self, xlsx, tmp_path, monkeypatch):
+        monkeypatch.setattr(workbook, "MAX_CACHED_WORKBOOKS", 2)
+        cache_dir = tmp_path / "cache"
+        sha256 = file_sha256(xlsx)
+
+        # Oldest first, with explicit mtimes so filesystem resolution doesn't matter
+        for age, sheet_names in ((300, ["LIST"]), (200, ["Summary"])):
+            read_workbook(xlsx, sheet_names=sheet_names, cache_dir=cache_dir)
+            path = workbook._cache_path(cache_dir, sha256, sheet_names)
+            os.utime(path, (path.stat().st_atime, path.stat().st_mtime - age))
+
+        # A cache hit marks the entry as recently used
+        read_workbook(xlsx, sheet_names=["LIST"], cache_dir=cache_dir)
+        read_workbook(xlsx, sheet_names=["Empty"], cache_dir=cache_dir)
+
+        assert workbook._cache_path(cache_dir, sha256, ["LIST"]).exists()
+        assert not workbook._cache_path(cache_dir, sha256, ["Summary"]).exists()
+        assert workbook._cache_path(cache_dir, sha256, ["Empty"]).exists()
@@ -0,0 +1,84 @@
+"""
+Unit tests for the parallel route/retrieve topology (graph/workflow.py).
+
+Run: pytest tests/test_workflow.py -v
+"""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
+
+import graph.workflow as workflow
+from graph.state import get_initial_state
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Stub the LLM and vector store nodes, recording what each one received."""
+    calls = {}
+
+    def route_intent(state, expand=True):
+        calls["route_expand"] = expand
+        state.update(
+            query="What's in IBI?",
+            intent="archetype",
+            archetype="Integrated Best Ideas",
+            expanded_query="What's in IBI? fund allocations",
+        )
+        return state
+
+    def retrieve_candidates(state):
+        calls["retrieve_intent"] = state.get("intent")
+        return {
+            "retrieved_docs": [
+                Document(page_content="Market commentary", metadata={"document_type": "commentary"}),
+                Document(
+                    page_content="IBI allocations",
+                    metadata={"document_type": "fund_model_allocation", "model_name": "Integrated Best Ideas"},
+                ),
+            ]
+        }
+
+    def grade_documents(state):
+        calls["grade_state"] = dict(state)
+        return state
+
+    def generate_response(state):
+        state["generation"] = "answer"
+        return state
+
+    monkeypatch.setattr(workflow, "route_intent", route_intent)
+    monkeypatch.setattr(workflow, "retrieve_candidates", retrieve_candidates)
+    monkeypatch.setattr(workflow, "grade_documents", grade_documents)
+    monkeypatch.setattr(workflow, "rerank_documents", lambda state: state)
+    monkeypatch.setattr(workflow, "generate_response", generate_response)
+    return calls
+
+
+def _invoke(app, query: str) -> dict:
+    state = get_initial_state(thread_id="t1")
+    state["messages"] = [HumanMessage(content=query)]
+    return app.invoke(state, {"configurable": {"thread_id": "t1"}})
+
+
+class TestParallelWorkflow:
+    def test_branches_merge_at_apply_intent_filter(self, recorded):
+        app = workflow.create_parallel_workflow().compile()
+        result = _invoke(app, "What's in IBI?")
+
+        # Retrieval ran on the raw query, before routing chose an intent
+        assert recorded["retrieve_intent"] == "general"
+
+        # The join applied the routed intent and archetype to the retrieved candidates
+        graded = recorded["grade_state"]
+        assert graded["intent"] == "archetype"
+        assert graded["archetype"] == "Integrated Best Ideas"
+        assert [d.page_content for d in graded["retrieved_docs"]] == ["IBI allocations", "Market commentary"]
+        assert result["generation"] == "answer"
+
+    def test_routing_branch_skips_query_expansion(self, recorded):
+        app = workflow.create_parallel_workflow().compile()
+        _invoke(app, "What's in IBI?")
+
+        assert recorded["route_expand"] is False
+        assert recorded["grade_state"]["expanded_query"] is None
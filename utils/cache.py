@@ -1,69 +1,706 @@
 """TTL-based response caching for RAG queries.
 
 Caches common queries to reduce latency from ~5s to <500ms.
-Skips caching when app_context is provided (dynamic results).
+Contextual queries (app_context) are cached under a canonical fingerprint
+of the context with a shorter TTL, so identical dashboard contexts (same
+model portfolios and defaults) share answers.
+
+Entries are tagged with domain, collection version and prompt_name, and a
+tag -> keys index makes invalidating one domain or collection proportional
+to its entry count. Ingestion bumps the collection version (see
+invalidate_collection), so re-ingesting one domain leaves others cached.
+
+Expired answers can be served stale for a grace window (cache_stale_ttl)
+while one rate-limited background refresh recomputes them.
+
+With cache_backend "sqlite", each worker's in-memory cache (L1) sits in
+front of a SQLite (WAL) cache (L2) shared by every worker on the host.
+
+Concurrent identical work is coalesced (single-flight): identical v2
+queries, embedding calls and grading calls that are already in flight are
+awaited instead of being run again.
 """
 
+import asyncio
+import gzip
 import hashlib
+import heapq
+import json
 import logging
+import math
+import os
+import sqlite3
+import threading
 import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Any, Optional
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from .metrics import CACHE_REQUESTS
 
 logger = logging.getLogger(__name__)
 
 
+class _LeaderAbandoned(Exception):
+    """Set on a SingleFlight future when its leader is cancelled or interrupted."""
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key.
+
+    The first caller (leader) runs the function; callers arriving while it
+    is in flight wait for its result (or exception) instead of running it
+    again. Results aren't kept once the call finishes - that's the cache's job.
+    If the leader is cancelled (client disconnect) or interrupted, its waiters
+    aren't: the key is released and the first waiter to rejoin reruns fn.
+
+    Waiting works from threads (do) and from any event loop (do_async), so
+    calls made from per-request asyncio.run() loops are coalesced too.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        """Get the in-flight future for key, and whether the caller leads."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _abandon(self, key: str, future: Future) -> None:
+        """Release key after the leader was cancelled, so a waiter reruns fn."""
+        self._finish(key, future, error=_LeaderAbandoned())
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn once for concurrent callers with the same key (blocking)."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except _LeaderAbandoned:
+                continue
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await fn once for concurrent callers with the same key."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shield so a cancelled waiter doesn't cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderAbandoned:
+                continue
+
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # Cancellation (e.g. client disconnect) is the leader's own; waiters rerun
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def stats(self) -> dict:
+        """Leader/coalesced call counts and the coalescing rate."""
+        total = self.leaders + self.coalesced
+        return {
+            "calls": total,
+            "coalesced": self.coalesced,
+            "coalescing_rate": round(self.coalesced / total, 3) if total > 0 else 0,
+            "in_flight": len(self._calls),
+        }
+
+
+_single_flights: dict[str, SingleFlight] = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the named global SingleFlight (e.g. "embeddings", "grading")."""
+    with _single_flights_lock:
+        if name not in _single_flights:
+            _single_flights[name] = SingleFlight(name)
+        return _single_flights[name]
+
+
+def get_coalescing_stats() -> dict:
+    """Coalescing stats for every SingleFlight."""
+    return {name: flight.stats() for name, flight in sorted(_single_flights.items())}
+
+
+def make_call_key(*parts: Any) -> str:
+    """Deterministic single-flight key for JSON-serializable call inputs."""
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()[:32]
+
+
+class CoalescedEmbeddings(Embeddings):
+    """Embeddings wrapper that coalesces identical concurrent embedding calls."""
+
+    def __init__(self, embeddings: Embeddings, namespace: str = "default"):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self._flight = get_single_flight("embeddings")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        key = make_call_key(self.namespace, "documents", texts)
+        return self._flight.do(key, self.embeddings.embed_documents, texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = make_call_key(self.namespace, "query", text)
+        return self._flight.do(key, self.embeddings.embed_query, text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        key = make_call_key(self.namespace, "documents", texts)
+        return await self._flight.do_async(key, self.embeddings.aembed_documents, texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = make_call_key(self.namespace, "query", text)
+        return await self._flight.do_async(key, self.embeddings.aembed_query, text)
+
+
+# app_context fields that differ between otherwise identical requests
+VOLATILE_CONTEXT_FIELDS = frozenset({
+    "timestamp", "generated_at", "computed_at", "updated_at", "last_updated",
+    "session_id", "request_id", "user_id", "client_id", "nonce",
+})
+
+# Decimal places floats are rounded to (prompts show at most 3)
+CONTEXT_FLOAT_DECIMALS = 4
+
+
+def canonicalize_app_context(value: Any) -> Any:
+    """
+    Normalize an app_context for fingerprinting.
+
+    Sorts dict keys, drops VOLATILE_CONTEXT_FIELDS at any depth, rounds
+    floats to CONTEXT_FLOAT_DECIMALS and writes integral floats as ints.
+    List order is kept (e.g. ranked risk contributors).
+    """
+    if isinstance(value, dict):
+        return {
+            str(k): canonicalize_app_context(v)
+            for k, v in sorted(value.items(), key=lambda item: str(item[0]))
+            if str(k) not in VOLATILE_CONTEXT_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        return [canonicalize_app_context(v) for v in value]
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return str(value)
+        rounded = round(value, CONTEXT_FLOAT_DECIMALS) + 0.0  # + 0.0 folds -0.0
+        return int(rounded) if rounded.is_integer() else rounded
+    return value
+
+
+def fingerprint_app_context(app_context: dict) -> str:
+    """Stable fingerprint of an app_context for cache keys."""
+    canonical = json.dumps(
+        canonicalize_app_context(app_context), sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
 @dataclass
 class CacheEntry:
-    """Cached response entry with TTL."""
+    """
+    Cached response entry with a soft and a hard TTL.
 
-    response: dict
+    The entry is fresh for ttl_seconds, then stale (servable while it is
+    refreshed in the background) for another stale_seconds.
+
+    Large responses are held zlib-compressed in `compressed` (response is
+    then None); use load_response() to read either form.
+    """
+
+    response: Optional[dict]
     created_at: float
     ttl_seconds: int
     query_hash: str
+    tags: tuple[str, ...] = ()
+    stale_seconds: int = 0
+    size_bytes: int = 0  # Serialized (uncompressed) JSON size
+    compressed: Optional[bytes] = None
+
+    def load_response(self) -> dict:
+        """Get the response, decompressing it if needed."""
+        if self.compressed is not None:
+            return json.loads(zlib.decompress(self.compressed))
+        return self.response
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes the entry's payload accounts for in the memory budget."""
+        return len(self.compressed) if self.compressed is not None else self.size_bytes
+
+    @property
+    def fresh_until(self) -> float:
+        """Epoch time at which the entry becomes stale (soft TTL)."""
+        return self.created_at + self.ttl_seconds
+
+    @property
+    def expires_at(self) -> float:
+        """Epoch time at which the entry expires (hard TTL)."""
+        return self.fresh_until + self.stale_seconds
+
+    def is_fresh(self) -> bool:
+        """Check if entry is within its soft TTL."""
+        return time.time() < self.fresh_until
 
     def is_expired(self) -> bool:
-        """Check if entry has exceeded its TTL."""
-        return time.time() - self.created_at > self.ttl_seconds
+        """Check if entry has exceeded its hard TTL."""
+        return time.time() >= self.expires_at
 
     def age_seconds(self) -> float:
         """Get age of cache entry in seconds."""
         return time.time() - self.created_at
 
 
+def collection_tag(collection: str, version: int) -> str:
+    """Tag for entries computed against a collection version."""
+    return f"collection:{collection}@{version}"
+
+
+def parse_collection_tag(tag: str) -> Optional[tuple[str, int]]:
+    """Split a collection tag into (collection, version), or None for other tags."""
+    if not tag.startswith("collection:"):
+        return None
+    collection, _, version = tag[len("collection:"):].rpartition("@")
+    return collection, int(version)
+
+
+# First-line marker of snapshot files written by ResponseCache.save_snapshot()
+SNAPSHOT_FORMAT = "prism-response-cache/1"
+
+# zlib level for compressing large in-memory payloads (fastest; JSON still shrinks 3-5x)
+COMPRESS_LEVEL = 1
+
+# How often (seconds) a worker checks the shared cache for invalidations and
+# publishes its hit/miss counters
+SHARED_SYNC_INTERVAL = 1.0
+
+_SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    ttl_seconds INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_access ON cache_entries(last_access);
+CREATE TABLE IF NOT EXISTS cache_entry_tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entry_tags_key ON cache_entry_tags(key);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_worker_stats (
+    worker TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    l2_hits INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SharedCacheStore:
+    """
+    SQLite (WAL) response cache shared by the worker processes on a host.
+
+    Used as the L2 tier behind each worker's in-memory ResponseCache.
+    Responses are stored as zlib-compressed JSON. WAL mode lets workers
+    read concurrently while one writes.
+
+    Workers publish their hit/miss counters to cache_worker_stats so stats
+    can be aggregated. Invalidations bump counters in cache_meta that other
+    workers poll to drop the matching L1 entries:
+    - generation: full clear
+    - tag:<tag>: tag invalidation (e.g. tag:domain:investments)
+    - collection_version:<name>: collection re-ingested or cleared
+    """
+
+    PRUNE_EVERY = 100  # Puts between expiry/size pruning passes
+
+    def __init__(self, path: Path, max_entries: int = 20000, compress_level: int = 6):
+        """
+        Initialize shared cache store.
+
+        Args:
+            path: SQLite database path (created if missing)
+            max_entries: Least recently used entries are pruned past this
+            compress_level: zlib level for stored responses
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.compress_level = compress_level
+        self.worker_id = str(os.getpid())
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        # Autocommit; each statement is its own short transaction
+        self._conn = sqlite3.connect(
+            str(path), timeout=5.0, isolation_level=None, check_same_thread=False,
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SHARED_CACHE_SCHEMA)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an unexpired entry, or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, raw_bytes, created_at, ttl_seconds, expires_at FROM cache_entries "
+                "WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+            tags = self._conn.execute(
+                "SELECT tag FROM cache_entry_tags WHERE key = ?", (key,)
+            ).fetchall()
+
+        payload, raw_bytes, created_at, ttl_seconds, expires_at = row
+        # Left compressed; ResponseCache decompresses small payloads when promoting
+        return CacheEntry(
+            response=None,
+            created_at=created_at,
+            ttl_seconds=ttl_seconds,
+            query_hash=key,
+            tags=tuple(tag for (tag,) in tags),
+            # The stale window is implied by the hard expiry
+            stale_seconds=max(0, round(expires_at - created_at - ttl_seconds)),
+            size_bytes=raw_bytes,
+            compressed=payload,
+        )
+
+    def put(self, entry: CacheEntry) -> None:
+        """Store an entry (replacing any existing one for its key)."""
+        if entry.compressed is not None:
+            payload, raw_bytes = entry.compressed, entry.size_bytes
+        else:
+            raw = json.dumps(entry.response, default=str).encode()
+            payload, raw_bytes = zlib.compress(raw, self.compress_level), len(raw)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(key, payload, raw_bytes, created_at, ttl_seconds, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.query_hash, payload, raw_bytes, entry.created_at,
+                    entry.ttl_seconds, entry.expires_at, time.time(),
+                ),
+            )
+            self._conn.execute("DELETE FROM cache_entry_tags WHERE key = ?", (entry.query_hash,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO cache_entry_tags (tag, key) VALUES (?, ?)",
+                [(tag, entry.query_hash) for tag in entry.tags],
+            )
+            self._puts += 1
+            if self._puts % self.PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Delete expired entries, then LRU entries past max_entries (lock held)."""
+        self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY last_access LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        self._conn.execute(
+            "DELETE FROM cache_entry_tags WHERE key NOT IN (SELECT key FROM cache_entries)"
+        )
+
+    def clear(self) -> int:
+        """Delete all entries and bump the generation. Returns count deleted."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                count = self._conn.execute("DELETE FROM cache_entries").rowcount
+                self._conn.execute("DELETE FROM cache_entry_tags")
+                self._conn.execute(
+                    "INSERT INTO cache_meta (name, value) VALUES ('generation', 1) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def invalidate_tags(self, tags: list[str], counter: str) -> int:
+        """
+        Delete entries carrying any of tags and bump the counter in cache_meta.
+
+        The counter is bumped even when no tags are given, so other workers
+        still see the invalidation. Returns count deleted.
+        """
+        placeholders = ",".join("?" * len(tags))
+        count = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if tags:
+                    count = self._conn.execute(
+                        f"DELETE FROM cache_entries WHERE key IN ("
+                        f"SELECT key FROM cache_entry_tags WHERE tag IN ({placeholders}))",
+                        tags,
+                    ).rowcount
+                    self._conn.execute(
+                        f"DELETE FROM cache_entry_tags WHERE key IN ("
+                        f"SELECT key FROM cache_entry_tags WHERE tag IN ({placeholders}))",
+                        tags,
+                    )
+                self._conn.execute(
+                    "INSERT INTO cache_meta (name, value) VALUES (?, 1) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                    (counter,),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def tags_with_prefix(self, prefix: str) -> list[str]:
+        """Distinct stored tags starting with prefix."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT tag FROM cache_entry_tags WHERE substr(tag, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+        return [tag for (tag,) in rows]
+
+    def meta(self) -> dict[str, int]:
+        """All invalidation counters (generation, tag:*, collection_version:*)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, value FROM cache_meta").fetchall()
+        return dict(rows)
+
+    def generation(self) -> int:
+        """Invalidation generation; changes whenever any worker clears the cache."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_meta WHERE name = 'generation'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def publish_worker_stats(self, hits: int, misses: int, l2_hits: int) -> None:
+        """Record this worker's counters for aggregated stats."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_worker_stats "
+                "(worker, hits, misses, l2_hits, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (self.worker_id, hits, misses, l2_hits, time.time()),
+            )
+
+    def stats(self) -> dict:
+        """Shared entry counts/bytes and counters aggregated across workers."""
+        with self._lock:
+            entries, raw_bytes, stored_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(LENGTH(payload)), 0) "
+                "FROM cache_entries WHERE expires_at > ?",
+                (time.time(),),
+            ).fetchone()
+            # Counters of exited workers stay in the totals; only recently synced ones count as active
+            workers, hits, misses, l2_hits = self._conn.execute(
+                "SELECT COALESCE(SUM(updated_at > ?), 0), COALESCE(SUM(hits), 0), "
+                "COALESCE(SUM(misses), 0), COALESCE(SUM(l2_hits), 0) FROM cache_worker_stats",
+                (time.time() - 300,),
+            ).fetchone()
+
+        total_requests = hits + misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "compression_ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else 0,
+            "active_workers": workers,
+            "hits": hits,
+            "misses": misses,
+            "l2_hits": l2_hits,
+            "hit_rate": round(hits / total_requests, 3) if total_requests > 0 else 0,
+        }
+
+
 class ResponseCache:
     """
-    TTL-based cache for RAG query responses.
+    LRU + TTL cache for RAG query responses.
+
+    Cache key: hash of (query, domain, prompt_name[, profile, params,
+    app_context fingerprint])
+    Contextual entries use context_ttl (shorter than the default TTL).
+
+    Stale-while-revalidate: with stale_ttl > 0 an entry stays servable for
+    stale_ttl seconds after its TTL. lookup() returns it marked "stale" and
+    the caller schedules refresh(), which recomputes it in the background
+    (one refresh per key, at most refresh_per_minute per cache). get()
+    only returns fresh entries.
 
-    Cache key: hash of (query, domain, prompt_name)
-    Does not cache when app_context is provided (dynamic results).
+    Memory: each entry's serialized JSON size is measured on insert, and
+    LRU entries are evicted while the total exceeds max_bytes (as well as
+    max_size entries). Payloads of at least compress_min_bytes are held
+    zlib-compressed (fastest level) and decompressed on read.
 
-    Thread-safety: This implementation uses a simple dict and is suitable
-    for single-process deployments. For multi-process, use Redis instead.
+    Entries live in an OrderedDict kept in recency order, so get/set and
+    LRU eviction are O(1). Expiry times go in a min-heap that is drained on
+    every access, so expired entries are dropped proactively instead of
+    only when read (O(log n) per expiry).
+
+    Thread-safety: all operations hold a lock, so the cache can be shared
+    by the event loop and threadpool workers. The in-memory tier is
+    per-process; pass a SharedCacheStore to share entries across workers.
     """
 
-    def __init__(self, default_ttl: int = 3600, max_size: int = 1000):
+    def __init__(
+        self,
+        default_ttl: int = 3600,
+        max_size: int = 1000,
+        shared: Optional[SharedCacheStore] = None,
+        name: str = "responses",
+        context_ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        refresh_per_minute: int = 30,
+        max_bytes: Optional[int] = None,
+        compress_min_bytes: Optional[int] = None,
+    ):
         """
         Initialize response cache.
 
         Args:
             default_ttl: Default time-to-live in seconds (1 hour)
             max_size: Maximum cache entries before eviction
+            shared: Optional L2 store shared across worker processes
+            name: Cache name (for logs, stats and single-flight)
+            context_ttl: Max TTL for contextual (app_context) entries;
+                         None disables caching them
+            stale_ttl: Seconds past the TTL an entry may be served stale
+                       while it is refreshed (0 disables)
+            refresh_per_minute: Max background refreshes started per minute
+            max_bytes: Memory budget for cached payloads (None = entry count only)
+            compress_min_bytes: Compress payloads at least this large
+                                (None disables compression)
         """
-        self._cache: dict[str, CacheEntry] = {}
+        self.name = name
+        self.context_ttl = context_ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_per_minute = refresh_per_minute
+        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()  # LRU first
+        self._expiry_heap: list[tuple[float, str]] = []  # (expires_at, key)
+        self._lock = threading.RLock()
         self.default_ttl = default_ttl
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self._bytes = 0  # Sum of memory_bytes over entries
+        self._raw_bytes = 0  # Sum of size_bytes over entries
+        self._domain_bytes: dict[str, int] = {}
+        self._compressed_entries = 0
         self.hits = 0
         self.misses = 0
         self.evictions = 0
+        self.expirations = 0
+        self.l2_hits = 0
+        self.invalidations = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refreshes_skipped = 0
+        self.inflight = get_single_flight(name)
+
+        self._refreshing: set[str] = set()  # Keys with a background refresh running
+        self._refresh_starts: deque[float] = deque()  # Monotonic start times, last minute
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+        self._tag_index: dict[str, set[str]] = {}  # tag -> keys
+        self._collection_versions: dict[str, int] = {}
+
+        self.shared = shared
+        # Invalidation counters last seen in the shared store
+        self._shared_meta: dict[str, int] = self._shared_call(shared.meta, {}) if shared else {}
+        self._last_shared_sync = time.monotonic()
+        for name, value in self._shared_meta.items():
+            if name.startswith("collection_version:"):
+                self._collection_versions[name[len("collection_version:"):]] = value
 
     def _make_key(
-        self, query: str, domain: str, prompt_name: Optional[str] = None
+        self,
+        query: str,
+        domain: str,
+        prompt_name: Optional[str] = None,
+        profile: Optional[str] = None,
+        params: Optional[dict] = None,
+        app_context: Optional[dict] = None,
     ) -> str:
         """Generate deterministic cache key from query parameters."""
         # Normalize query (lowercase, strip whitespace)
         normalized_query = query.lower().strip()
         key_data = f"{normalized_query}|{domain}|{prompt_name or 'default'}"
+        if profile:
+            # Answers from different latency profiles aren't interchangeable
+            key_data += f"|{profile}"
+        if params:
+            # Endpoint-specific retrieval/synthesis settings (V1 mode, top_k, ...)
+            key_data += "|" + json.dumps(params, sort_keys=True, default=str)
+        if app_context:
+            key_data += f"|ctx:{fingerprint_app_context(app_context)}"
         return hashlib.sha256(key_data.encode()).hexdigest()[:32]
 
     def get(
@@ -72,40 +709,123 @@ class ResponseCache:
         domain: str,
         prompt_name: Optional[str] = None,
         app_context: Optional[dict] = None,
+        profile: Optional[str] = None,
+        params: Optional[dict] = None,
     ) -> Optional[dict]:
         """
-        Get cached response if available and not expired.
+        Get cached response if available and fresh.
 
         Args:
             query: The user's query text
             domain: The collection domain
             prompt_name: Optional prompt template name
-            app_context: Optional dynamic context (bypasses cache)
+            app_context: Optional dynamic context (keyed by fingerprint;
+                         bypasses the cache if context_ttl is None)
+            profile: Optional latency profile (v2 fast/balanced/thorough)
+            params: Optional endpoint parameters that are part of the key
 
         Returns:
-            Cached response dict, or None if not cached/expired
+            Cached response dict, or None if not cached/stale/expired
         """
-        # Never use cache when app_context is provided (dynamic results)
-        if app_context:
+        cached = self.lookup(query, domain, prompt_name, app_context, profile, params, allow_stale=False)
+        return cached[0] if cached else None
+
+    def lookup(
+        self,
+        query: str,
+        domain: str,
+        prompt_name: Optional[str] = None,
+        app_context: Optional[dict] = None,
+        profile: Optional[str] = None,
+        params: Optional[dict] = None,
+        allow_stale: bool = True,
+    ) -> Optional[tuple[dict, str]]:
+        """
+        Get a cached response and its freshness ("fresh" or "stale").
+
+        Args:
+            query: The user's query text
+            domain: The collection domain
+            prompt_name: Optional prompt template name
+            app_context: Optional dynamic context (keyed by fingerprint;
+                         bypasses the cache if context_ttl is None)
+            profile: Optional latency profile (v2 fast/balanced/thorough)
+            params: Optional endpoint parameters that are part of the key
+            allow_stale: Return entries past their TTL but within stale_ttl
+
+        Returns:
+            (response dict, freshness), or None if not cached/expired
+        """
+        if app_context and self.context_ttl is None:
             logger.debug("Cache bypass: app_context provided")
+            CACHE_REQUESTS.inc(result="bypass")
             return None
 
-        key = self._make_key(query, domain, prompt_name)
-        entry = self._cache.get(key)
+        key = self._make_key(query, domain, prompt_name, profile, params, app_context)
+        self._sync_shared()
+        with self._lock:
+            self._expire()
+            entry = self._cache.get(key)
+            if entry is not None and self._is_stale(entry):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._cache.move_to_end(key)
 
-        if entry is None:
-            self.misses += 1
-            return None
+        if (entry is None or not entry.is_fresh()) and self.shared is not None:
+            # L1 miss (or stale): another worker may have cached a newer answer
+            shared_entry = self._shared_call(self.shared.get, None, key)
+            if shared_entry is not None and (entry is None or shared_entry.created_at > entry.created_at):
+                with self._lock:
+                    if not self._is_stale(shared_entry):
+                        self._store(key, shared_entry)
+                        entry = shared_entry
+                        self.l2_hits += 1
 
-        if entry.is_expired():
-            del self._cache[key]
-            self.misses += 1
-            logger.debug(f"Cache miss (expired after {entry.age_seconds():.1f}s): {key[:8]}...")
+        fresh = entry is not None and entry.is_fresh()
+        if entry is None or not (fresh or allow_stale):
+            with self._lock:
+                self.misses += 1
+            CACHE_REQUESTS.inc(result="miss")
             return None
 
-        self.hits += 1
-        logger.debug(f"Cache hit (age {entry.age_seconds():.1f}s): {key[:8]}...")
-        return entry.response
+        with self._lock:
+            self.hits += 1
+            if not fresh:
+                self.stale_hits += 1
+        CACHE_REQUESTS.inc(result="hit" if fresh else "stale")
+        logger.debug(
+            f"Cache {'hit' if fresh else 'stale hit'} (age {entry.age_seconds():.1f}s): {key[:8]}..."
+        )
+        return entry.load_response(), "fresh" if fresh else "stale"
+
+    def contains(
+        self,
+        query: str,
+        domain: str,
+        prompt_name: Optional[str] = None,
+        app_context: Optional[dict] = None,
+        profile: Optional[str] = None,
+        params: Optional[dict] = None,
+    ) -> bool:
+        """Check for a fresh entry without counting a hit or miss (used by the warmer)."""
+        if app_context and self.context_ttl is None:
+            return False
+
+        key = self._make_key(query, domain, prompt_name, profile, params, app_context)
+        self._sync_shared()
+        with self._lock:
+            self._expire()
+            entry = self._cache.get(key)
+            if entry is not None and entry.is_fresh() and not self._is_stale(entry):
+                return True
+
+        if self.shared is not None:
+            entry = self._shared_call(self.shared.get, None, key)
+            if entry is not None and entry.is_fresh():
+                with self._lock:
+                    return not self._is_stale(entry)
+        return False
 
     def set(
         self,
@@ -114,6 +834,10 @@ class ResponseCache:
         response: dict,
         prompt_name: Optional[str] = None,
         ttl: Optional[int] = None,
+        profile: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        params: Optional[dict] = None,
+        app_context: Optional[dict] = None,
     ) -> None:
         """
         Store response in cache.
@@ -124,37 +848,292 @@ class ResponseCache:
             response: The response dict to cache
             prompt_name: Optional prompt template name
             ttl: Optional TTL override (seconds)
+            profile: Optional latency profile (v2 fast/balanced/thorough)
+            tags: Extra invalidation tags (domain, collection version and
+                  prompt tags are always added)
+            params: Optional endpoint parameters that are part of the key
+            app_context: Optional dynamic context (keyed by fingerprint,
+                         TTL capped at context_ttl)
         """
-        # Evict oldest entries if at capacity
-        if len(self._cache) >= self.max_size:
-            self._evict_oldest()
+        ttl = ttl or self.default_ttl
+        tags = list(tags or ())
+        if app_context:
+            if self.context_ttl is None:
+                return
+            ttl = min(ttl, self.context_ttl)
+            tags.append(f"context:{app_context.get('page', 'unknown')}")
+
+        key = self._make_key(query, domain, prompt_name, profile, params, app_context)
+        entry = self._build_entry(
+            key, response, time.time(), ttl, self.stale_ttl,
+            self._make_tags(domain, prompt_name) + tuple(tags),
+        )
+
+        with self._lock:
+            self._expire()
+            self._store(key, entry)
+        if self.shared is not None:
+            self._shared_call(self.shared.put, None, entry)
+
+        logger.debug(f"Cache set: {key[:8]}... (TTL={ttl}s)")
+
+    async def coalesce(
+        self,
+        query: str,
+        domain: str,
+        compute: Callable[[], Awaitable[Any]],
+        prompt_name: Optional[str] = None,
+        profile: Optional[str] = None,
+        params: Optional[dict] = None,
+        app_context: Optional[dict] = None,
+    ) -> Any:
+        """
+        Run compute once for concurrent requests with the same cache key.
+
+        Call after a cache miss; the first request runs compute (which is
+        expected to fill the cache) and identical requests arriving while it
+        runs await its result.
+        """
+        key = self._make_key(query, domain, prompt_name, profile, params, app_context)
+        return await self.inflight.do_async(key, compute)
+
+    def refresh(
+        self,
+        query: str,
+        domain: str,
+        compute: Callable[[], Awaitable[Any]],
+        prompt_name: Optional[str] = None,
+        profile: Optional[str] = None,
+        params: Optional[dict] = None,
+        app_context: Optional[dict] = None,
+    ) -> bool:
+        """
+        Recompute a stale entry in the background (call from the event loop).
+
+        compute is expected to fill the cache, as for coalesce(). Refreshes
+        are deduplicated per key (and share the single-flight with foreground
+        misses) and rate-limited to refresh_per_minute.
+
+        Returns:
+            True if a refresh was started
+        """
+        key = self._make_key(query, domain, prompt_name, profile, params, app_context)
+        now = time.monotonic()
+        with self._lock:
+            while self._refresh_starts and now - self._refresh_starts[0] > 60:
+                self._refresh_starts.popleft()
+            if key in self._refreshing or len(self._refresh_starts) >= self.refresh_per_minute:
+                self.refreshes_skipped += 1
+                return False
+            self._refreshing.add(key)
+            self._refresh_starts.append(now)
+            self.refreshes += 1
+
+        task = asyncio.get_running_loop().create_task(self._run_refresh(key, compute))
+        self._refresh_tasks.add(task)  # Keep a reference until it finishes
+        task.add_done_callback(self._refresh_tasks.discard)
+        return True
+
+    async def _run_refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self.inflight.do_async(key, compute)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key[:8]}...: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
 
-        key = self._make_key(query, domain, prompt_name)
-        self._cache[key] = CacheEntry(
+    def _build_entry(
+        self,
+        key: str,
+        response: dict,
+        created_at: float,
+        ttl: int,
+        stale_seconds: int,
+        tags: tuple[str, ...],
+    ) -> CacheEntry:
+        """Measure a response and compress it if it's over compress_min_bytes."""
+        raw = json.dumps(response, default=str).encode()
+        entry = CacheEntry(
             response=response,
-            created_at=time.time(),
-            ttl_seconds=ttl or self.default_ttl,
+            created_at=created_at,
+            ttl_seconds=ttl,
             query_hash=key,
+            tags=tags,
+            stale_seconds=stale_seconds,
+            size_bytes=len(raw),
         )
-        logger.debug(f"Cache set: {key[:8]}... (TTL={ttl or self.default_ttl}s)")
+        if self.compress_min_bytes is not None and len(raw) >= self.compress_min_bytes:
+            entry.response, entry.compressed = None, zlib.compress(raw, COMPRESS_LEVEL)
+        return entry
 
-    def _evict_oldest(self, count: int = 100) -> None:
-        """Evict oldest cache entries to make room."""
-        if not self._cache:
-            return
+    def _make_tags(self, domain: str, prompt_name: Optional[str]) -> tuple[str, ...]:
+        """Domain, collection version and prompt tags for an entry."""
+        from config import settings
 
-        # Sort by creation time, oldest first
-        sorted_keys = sorted(
-            self._cache.keys(), key=lambda k: self._cache[k].created_at
+        collection = settings.domain_collections.get(domain, settings.collection_name)
+        return (
+            f"domain:{domain}",
+            collection_tag(collection, self.collection_version(collection)),
+            f"prompt:{prompt_name or 'default'}",
         )
 
-        # Evict oldest entries
-        evict_count = min(count, len(sorted_keys))
-        for key in sorted_keys[:evict_count]:
-            del self._cache[key]
+    def _is_stale(self, entry: CacheEntry) -> bool:
+        """Check if an entry was computed against an older collection version."""
+        for tag in entry.tags:
+            parsed = parse_collection_tag(tag)
+            if parsed and parsed[1] != self._collection_versions.get(parsed[0], 0):
+                return True
+        return False
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        """Insert an entry as most recently used, evicting if full (lock held)."""
+        if entry.compressed is not None and (
+            self.compress_min_bytes is None or entry.size_bytes < self.compress_min_bytes
+        ):
+            # Promoted from L2 (always compressed) below the compression threshold
+            entry.response, entry.compressed = entry.load_response(), None
+
+        if self.max_bytes is not None and entry.memory_bytes > self.max_bytes:
+            logger.debug(f"Not caching {key[:8]}...: {entry.memory_bytes} bytes exceeds the budget")
+            self._remove(key)
+            return
+
+        if key in self._cache:
+            self._remove(key)
+        elif len(self._cache) >= self.max_size:
+            self._evict_lru()
+        if self.max_bytes is not None:
+            while self._cache and self._bytes + entry.memory_bytes > self.max_bytes:
+                self._evict_lru()
+
+        self._cache[key] = entry
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        self._account(entry, 1)
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+        self._compact_heap()
+
+    def _account(self, entry: CacheEntry, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) an entry's bytes from the totals (lock held)."""
+        self._bytes += sign * entry.memory_bytes
+        self._raw_bytes += sign * entry.size_bytes
+        self._compressed_entries += sign * (entry.compressed is not None)
+        for tag in entry.tags:
+            if tag.startswith("domain:"):
+                domain = tag[len("domain:"):]
+                self._domain_bytes[domain] = self._domain_bytes.get(domain, 0) + sign * entry.memory_bytes
+                if not self._domain_bytes[domain]:
+                    del self._domain_bytes[domain]
 
-        self.evictions += evict_count
-        logger.info(f"Evicted {evict_count} oldest cache entries")
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry and its tag index references (lock held)."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._unindex(key, entry)
+        return entry
+
+    def _unindex(self, key: str, entry: CacheEntry) -> None:
+        self._account(entry, -1)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _invalidate_local(self, tags: list[str]) -> int:
+        """Remove every L1 entry carrying any of tags (lock held)."""
+        count = 0
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                if self._remove(key) is not None:
+                    count += 1
+        return count
+
+    def _clear_local(self) -> int:
+        """Remove every L1 entry (lock held)."""
+        count = len(self._cache)
+        self._cache.clear()
+        self._expiry_heap.clear()
+        self._tag_index.clear()
+        self._domain_bytes.clear()
+        self._bytes = self._raw_bytes = self._compressed_entries = 0
+        return count
+
+    def _shared_call(self, fn: Callable[..., Any], default: Any, *args) -> Any:
+        """Call the shared store; errors are logged so the cache never fails a query."""
+        try:
+            return fn(*args)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"Shared cache {fn.__name__} failed: {e}")
+            return default
+
+    def _sync_shared(self, force: bool = False) -> None:
+        """
+        Drop L1 if another worker invalidated the shared cache, and publish
+        this worker's counters. Runs at most every SHARED_SYNC_INTERVAL.
+        """
+        if self.shared is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_shared_sync < SHARED_SYNC_INTERVAL:
+            return
+        self._last_shared_sync = now
+
+        meta = self._shared_call(self.shared.meta, None)
+        if meta is not None:
+            self._apply_shared_meta(meta)
+
+        self._shared_call(self.shared.publish_worker_stats, None, self.hits, self.misses, self.l2_hits)
+
+    def _apply_shared_meta(self, meta: dict[str, int]) -> None:
+        """Drop L1 entries invalidated by other workers since the last sync."""
+        changed = [name for name, value in meta.items() if self._shared_meta.get(name) != value]
+        self._shared_meta = meta
+        if not changed:
+            return
+
+        with self._lock:
+            if "generation" in changed:
+                self._clear_local()
+                logger.info("Shared cache cleared by another worker, cleared local entries")
+                changed.remove("generation")
+
+            for name in changed:
+                if name.startswith("tag:"):
+                    self._invalidate_local([name[len("tag:"):]])
+                elif name.startswith("collection_version:"):
+                    collection = name[len("collection_version:"):]
+                    self._collection_versions[collection] = meta[name]
+                    prefix = f"collection:{collection}@"
+                    self._invalidate_local([t for t in self._tag_index if t.startswith(prefix)])
+            logger.info(f"Applied shared cache invalidations: {changed}")
+
+    def _evict_lru(self) -> None:
+        """Evict the least recently used entry to make room (lock held)."""
+        key, entry = self._cache.popitem(last=False)
+        self._unindex(key, entry)
+        self.evictions += 1
+        logger.debug(f"Evicted LRU cache entry: {key[:8]}...")
+
+    def _expire(self) -> None:
+        """Drop every entry whose TTL has passed (lock held)."""
+        now = time.time()
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Skip stale heap items for keys that were overwritten or evicted
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+    def _compact_heap(self) -> None:
+        """Rebuild the expiry heap once stale items outnumber live entries (lock held)."""
+        if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [(entry.expires_at, key) for key, entry in self._cache.items()]
+            heapq.heapify(self._expiry_heap)
 
     def invalidate(self, domain: Optional[str] = None) -> int:
         """
@@ -162,32 +1141,263 @@ class ResponseCache:
 
         Args:
             domain: If provided, only invalidate entries for this domain
-                   (requires storing domain in entry, currently clears all)
 
         Returns:
             Number of entries invalidated
         """
-        count = len(self._cache)
-        self._cache.clear()
+        if domain:
+            return self.invalidate_tag(f"domain:{domain}")
+
+        with self._lock:
+            count = self._clear_local()
+        if self.shared is not None:
+            count = max(count, self._shared_call(self.shared.clear, 0))
+            self._sync_shared(force=True)
+        with self._lock:
+            self.invalidations += 1
         logger.info(f"Cache invalidated: {count} entries cleared")
         return count
 
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Invalidate entries carrying a tag (e.g. "domain:estate_planning",
+        "prompt:monte_carlo_interpreter_cited").
+
+        Returns:
+            Number of entries invalidated
+        """
+        with self._lock:
+            count = self._invalidate_local([tag])
+        if self.shared is not None:
+            count = max(count, self._shared_call(self.shared.invalidate_tags, 0, [tag], f"tag:{tag}"))
+            self._sync_shared(force=True)
+        with self._lock:
+            self.invalidations += 1
+        logger.info(f"Cache invalidated tag {tag}: {count} entries cleared")
+        return count
+
+    def collection_version(self, collection: str) -> int:
+        """Current version of a collection (bumped on each ingestion or clear)."""
+        return self._collection_versions.get(collection, 0)
+
+    def invalidate_collection(self, collection: str) -> int:
+        """
+        Bump a collection's version and invalidate entries computed against it.
+
+        Returns:
+            Number of entries invalidated
+        """
+        prefix = f"collection:{collection}@"
+        with self._lock:
+            self._collection_versions[collection] = self.collection_version(collection) + 1
+            count = self._invalidate_local([t for t in self._tag_index if t.startswith(prefix)])
+
+        if self.shared is not None:
+            shared_tags = self._shared_call(self.shared.tags_with_prefix, [], prefix)
+            counter = f"collection_version:{collection}"
+            shared_count = self._shared_call(self.shared.invalidate_tags, 0, shared_tags, counter)
+            count = max(count, shared_count)
+            self._sync_shared(force=True)
+
+        with self._lock:
+            self.invalidations += 1
+        logger.info(
+            f"Cache invalidated collection {collection} "
+            f"(now v{self.collection_version(collection)}): {count} entries cleared"
+        )
+        return count
+
+    def save_snapshot(self, path: Path, fingerprints: Optional[dict[str, str]] = None) -> int:
+        """
+        Write the in-memory entries to a gzip JSON-lines snapshot.
+
+        The first line records the collection versions (and optional
+        collection fingerprints) the entries were computed against; entries
+        follow in LRU order. The file is written to a temp file, fsynced and
+        renamed over path, so a crash leaves the previous snapshot intact.
+
+        Returns:
+            Number of entries written
+        """
+        with self._lock:
+            self._expire()
+            items = list(self._cache.items())
+            versions = dict(self._collection_versions)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "name": self.name,
+            "saved_at": time.time(),
+            "collection_versions": versions,
+            "fingerprints": fingerprints or {},
+        }
+        try:
+            with open(tmp_path, "wb") as raw_file:
+                with gzip.GzipFile(fileobj=raw_file, mode="wb", compresslevel=6) as f:
+                    f.write(json.dumps(header).encode() + b"\n")
+                    for key, entry in items:
+                        record = {
+                            "key": key,
+                            "created_at": entry.created_at,
+                            "ttl_seconds": entry.ttl_seconds,
+                            "stale_seconds": entry.stale_seconds,
+                            "tags": list(entry.tags),
+                            "response": entry.load_response(),
+                        }
+                        f.write(json.dumps(record, default=str).encode() + b"\n")
+                raw_file.flush()
+                os.fsync(raw_file.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        logger.info(f"Saved {self.name} cache snapshot: {len(items)} entries -> {path}")
+        return len(items)
+
+    def load_snapshot(self, path: Path, fingerprints: Optional[dict[str, str]] = None) -> int:
+        """
+        Load entries from a snapshot written by save_snapshot().
+
+        Expired entries are skipped (stale ones are kept and refresh on
+        use). Entries computed against a collection that has changed since
+        the snapshot - its version was bumped, or its fingerprint differs
+        from the one passed in - are dropped; the rest are retagged with the
+        current collection versions.
+
+        Returns:
+            Number of entries loaded
+        """
+        if not path.exists():
+            return 0
+
+        now = time.time()
+        loaded = skipped = 0
+        try:
+            with gzip.open(path, "rb") as f:
+                header = json.loads(f.readline())
+                if header.get("format") != SNAPSHOT_FORMAT:
+                    logger.warning(f"Ignoring cache snapshot {path}: unknown format")
+                    return 0
+
+                saved_versions = header.get("collection_versions", {})
+                saved_fingerprints = header.get("fingerprints", {})
+                changed = frozenset(
+                    collection
+                    for collection, fingerprint in (fingerprints or {}).items()
+                    if saved_fingerprints.get(collection) != fingerprint
+                )
+
+                for line in f:
+                    record = json.loads(line)
+                    tags = self._restore_tags(record["tags"], saved_versions, changed)
+                    expires_at = record["created_at"] + record["ttl_seconds"] + record["stale_seconds"]
+                    if tags is None or expires_at <= now:
+                        skipped += 1
+                        continue
+                    entry = self._build_entry(
+                        record["key"], record["response"], record["created_at"],
+                        record["ttl_seconds"], record["stale_seconds"], tags,
+                    )
+                    with self._lock:
+                        self._store(record["key"], entry)
+                    loaded += 1
+        except (OSError, EOFError, ValueError, KeyError, TypeError, zlib.error) as e:
+            # Truncated or corrupt: keep whatever loaded cleanly
+            logger.warning(f"Cache snapshot {path} unreadable after {loaded} entries: {e}")
+
+        logger.info(f"Loaded {self.name} cache snapshot: {loaded} entries ({skipped} expired or stale)")
+        return loaded
+
+    def _restore_tags(
+        self, tags: list[str], saved_versions: dict[str, int], changed: frozenset[str]
+    ) -> Optional[tuple[str, ...]]:
+        """Retag a snapshot entry with current collection versions, or None if its collection changed."""
+        restored = []
+        for tag in tags:
+            parsed = parse_collection_tag(tag)
+            if parsed is not None:
+                collection, version = parsed
+                if collection in changed or version != saved_versions.get(collection, 0):
+                    return None
+                # With a shared store the version persists, so a bump since the save shows up
+                if self.shared is not None and self.collection_version(collection) != version:
+                    return None
+                tag = collection_tag(collection, self.collection_version(collection))
+            restored.append(tag)
+        return tuple(restored)
+
     def stats(self) -> dict:
         """Get cache statistics."""
+        with self._lock:
+            self._expire()
+            size = len(self._cache)
         total_requests = self.hits + self.misses
-        return {
+        stats = {
             "hits": self.hits,
             "misses": self.misses,
             "hit_rate": round(self.hits / total_requests, 3) if total_requests > 0 else 0,
-            "size": len(self._cache),
+            "size": size,
             "max_size": self.max_size,
             "evictions": self.evictions,
+            "expirations": self.expirations,
             "default_ttl_seconds": self.default_ttl,
+            "context_ttl_seconds": self.context_ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refreshes_skipped": self.refreshes_skipped,
+            "coalesced": self.inflight.coalesced,
+            "coalescing_rate": self.inflight.stats()["coalescing_rate"],
+            "l2_hits": self.l2_hits,
+            "invalidations": self.invalidations,
+            "memory_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "raw_bytes": self._raw_bytes,
+            "compressed_entries": self._compressed_entries,
+            "compression_ratio": round(self._raw_bytes / self._bytes, 2) if self._bytes else 0,
+            "entries_by_domain": {
+                tag[len("domain:"):]: len(keys)
+                for tag, keys in sorted(self._tag_index.items())
+                if tag.startswith("domain:")
+            },
+            "bytes_by_domain": dict(sorted(self._domain_bytes.items())),
+            "collection_versions": dict(self._collection_versions),
         }
+        if self.shared is not None:
+            # Publish this worker's latest counters before aggregating
+            self._sync_shared(force=True)
+            stats["shared"] = self._shared_call(self.shared.stats, {"status": "unavailable"})
+        return stats
 
 
-# Global cache instance (singleton)
+# Global cache instances (singletons)
 _response_cache: Optional[ResponseCache] = None
+_search_cache: Optional[ResponseCache] = None
+
+
+def create_shared_store(name: str = "responses") -> Optional[SharedCacheStore]:
+    """
+    Create the shared L2 store if settings.cache_backend is "sqlite".
+
+    Each named cache gets its own database next to the response cache's.
+    """
+    from config import settings, get_cache_path
+
+    if settings.cache_backend != "sqlite":
+        return None
+    path = get_cache_path()
+    if name != "responses":
+        path = path.with_name(f"{path.stem}_{name}{path.suffix}")
+    try:
+        store = SharedCacheStore(path, max_entries=settings.cache_shared_max_entries)
+    except sqlite3.Error as e:
+        logger.warning(f"Shared {name} cache unavailable at {path}, using in-memory only: {e}")
+        return None
+    logger.info(f"Using shared {name} cache at {path}")
+    return store
 
 
 def get_response_cache(
@@ -205,22 +1415,103 @@ def get_response_cache(
     """
     global _response_cache
     if _response_cache is None:
-        _response_cache = ResponseCache(default_ttl=default_ttl, max_size=max_size)
+        from config import settings
+
+        _response_cache = ResponseCache(
+            default_ttl=default_ttl,
+            max_size=max_size,
+            shared=create_shared_store(),
+            context_ttl=settings.cache_context_ttl if settings.cache_contextual else None,
+            stale_ttl=settings.cache_stale_ttl,
+            refresh_per_minute=settings.cache_refresh_per_minute,
+            max_bytes=settings.cache_max_memory_mb * 1024 * 1024 or None,
+            compress_min_bytes=settings.cache_compress_min_bytes or None,
+        )
         logger.info(f"Initialized response cache (TTL={default_ttl}s, max={max_size})")
     return _response_cache
 
 
-def invalidate_cache() -> int:
-    """Invalidate the global cache. Returns count of entries cleared."""
-    global _response_cache
-    if _response_cache:
-        return _response_cache.invalidate()
-    return 0
+def get_search_cache() -> ResponseCache:
+    """
+    Get or create the global cache for search-only (/search) results.
+
+    Kept apart from answers so cheap, high-volume search results don't
+    evict expensive synthesized responses.
+    """
+    global _search_cache
+    if _search_cache is None:
+        from config import settings
+
+        _search_cache = ResponseCache(
+            default_ttl=settings.cache_search_ttl,
+            max_size=settings.cache_search_max_size,
+            shared=create_shared_store("search"),
+            name="search",
+            max_bytes=settings.cache_search_max_memory_mb * 1024 * 1024 or None,
+            compress_min_bytes=settings.cache_compress_min_bytes or None,
+        )
+        logger.info(
+            f"Initialized search cache (TTL={settings.cache_search_ttl}s, "
+            f"max={settings.cache_search_max_size})"
+        )
+    return _search_cache
+
+
+def _active_caches() -> list[ResponseCache]:
+    return [cache for cache in (_response_cache, _search_cache) if cache is not None]
+
+
+def invalidate_cache(domain: Optional[str] = None) -> int:
+    """Invalidate the global caches (or one domain). Returns count of entries cleared."""
+    return sum(cache.invalidate(domain) for cache in _active_caches())
+
+
+def invalidate_collection(collection: str, reason: str = "changed") -> int:
+    """
+    Invalidation event for a changed collection (ingestion, clear).
+
+    Bumps the collection version so only answers from that collection are
+    dropped. Returns count of entries cleared.
+    """
+    logger.info(f"Collection {collection} {reason}, invalidating cached responses")
+    get_response_cache()
+    get_search_cache()
+    return sum(cache.invalidate_collection(collection) for cache in _active_caches())
+
+
+def get_snapshot_path(name: str = "responses") -> Path:
+    """Snapshot file for a named cache (the response cache's, suffixed for others)."""
+    from config import get_cache_snapshot_path
+
+    path = get_cache_snapshot_path()
+    if name != "responses":
+        path = path.with_name(f"{path.stem}_{name}{path.suffix}")
+    return path
+
+
+def save_cache_snapshots(fingerprints: Optional[dict[str, str]] = None) -> int:
+    """Snapshot every active cache. Returns total entries written."""
+    total = 0
+    for cache in _active_caches():
+        try:
+            total += cache.save_snapshot(get_snapshot_path(cache.name), fingerprints)
+        except OSError as e:
+            logger.warning(f"Failed to save {cache.name} cache snapshot: {e}")
+    return total
+
+
+def load_cache_snapshots(fingerprints: Optional[dict[str, str]] = None) -> int:
+    """Create the caches and load their snapshots. Returns total entries loaded."""
+    caches = (get_response_cache(), get_search_cache())
+    return sum(cache.load_snapshot(get_snapshot_path(cache.name), fingerprints) for cache in caches)
 
 
 def get_cache_stats() -> dict:
     """Get global cache statistics."""
     global _response_cache
     if _response_cache:
-        return _response_cache.stats()
-    return {"status": "not_initialized"}
+        stats = {**_response_cache.stats(), "coalescing": get_coalescing_stats()}
+        if _search_cache:
+            stats["search"] = _search_cache.stats()
+        return stats
+    return {"status": "not_initialized", "coalescing": get_coalescing_stats()}
@@ -46,6 +46,9 @@ class QueryMetrics:
     # Errors
     error: Optional[str] = None
 
+    # Answered by joining an identical in-flight query (single-flight)
+    coalesced: bool = False
+
     # Full content logging (for detailed audit trail)
     full_query: Optional[str] = None  # Complete query text (no truncation)
     full_response: Optional[str] = None  # Complete LLM response
@@ -228,6 +231,7 @@ def log_full_query(
     app_context_page: Optional[str] = None,
     prompt_name: Optional[str] = None,
     duration_ms: float = 0.0,
+    coalesced: bool = False,
 ):
     """
     Log a complete query/response pair for audit and debugging.
@@ -239,6 +243,7 @@ def log_full_query(
         app_context_page: Page context (mcs, risk, eval, etc.)
         prompt_name: Name of the prompt template used
         duration_ms: Total query duration in milliseconds
+        coalesced: The response came from an identical in-flight query
     """
     logger = get_full_query_logger()
     record = {
@@ -247,7 +252,67 @@ def log_full_query(
         "app_context_page": app_context_page,
         "prompt_name": prompt_name,
         "duration_ms": round(duration_ms, 2),
+        "coalesced": coalesced,
         "query_text": query_text,
         "response_text": response_text,
     }
     logger.info(json.dumps(record))
+
+
+# Dedicated intent routing logger (LLM labels for training the local classifier)
+_intent_routing_logger: Optional[logging.Logger] = None
+
+
+def get_intent_routing_logger(log_dir: Optional[str] = None) -> logging.Logger:
+    """
+    Get a dedicated logger for intent routing decisions.
+
+    Writes to intent_routing.jsonl in the service log dir. Records with an
+    llm_intent are used as training data for the local intent classifier.
+    """
+    global _intent_routing_logger
+    if _intent_routing_logger is None:
+        from pathlib import Path
+        from config import get_log_dir
+
+        log_path = Path(log_dir) if log_dir else get_log_dir()
+        log_path.mkdir(parents=True, exist_ok=True)
+
+        _intent_routing_logger = logging.getLogger("rag.intent_routing")
+        _intent_routing_logger.setLevel(logging.INFO)
+        _intent_routing_logger.propagate = False
+
+        file_handler = logging.FileHandler(log_path / "intent_routing.jsonl")
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        _intent_routing_logger.addHandler(file_handler)
+
+    return _intent_routing_logger
+
+
+def log_intent_routing(
+    query: str,
+    llm_intent: Optional[str],
+    local_intent: Optional[str] = None,
+    local_confidence: Optional[float] = None,
+    source: str = "llm",
+):
+    """
+    Log an intent routing decision for agreement tracking and retraining.
+
+    Args:
+        query: Query text that was classified
+        llm_intent: Intent chosen by the LLM router (None if not called)
+        local_intent: Intent chosen by the local classifier
+        local_confidence: Local classifier confidence
+        source: "fallback" (LLM decided) or "shadow" (LLM only compared)
+    """
+    logger = get_intent_routing_logger()
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "source": source,
+        "query": query,
+        "llm_intent": llm_intent,
+        "local_intent": local_intent,
+        "local_confidence": round(local_confidence, 4) if local_confidence is not None else None,
+    }
+    logger.info(json.dumps(record))
@@ -0,0 +1,359 @@
+"""In-process latency histograms and counters with Prometheus text export.
+
+Spans time every LangGraph node, LLM call, embedding call, Chroma query and
+BM25 scoring. Durations are aggregated into fixed-bucket histograms labeled
+by stage, domain and intent; p50/p95/p99 are estimated from the buckets the
+same way Prometheus' histogram_quantile() does.
+
+Request labels (domain, intent) are carried in a contextvar so nested spans
+(e.g. an LLM call inside the grade node) pick them up automatically.
+
+Usage:
+    with span_labels(domain="investments", intent="archetype"):
+        with span("bm25"):
+            scores = bm25.get_scores(tokens)
+
+    GET /metrics  ->  render_metrics()
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers BM25 scoring (~ms) through slow LLM generations
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricCounter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels.get(name, "unknown") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(labels.get(name, "unknown") for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram with labels.
+
+    Observation is O(buckets) with no per-sample storage, so memory stays
+    constant no matter how much traffic is recorded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count, max]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels) -> None:
+        key = tuple(labels.get(name, "unknown") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0.0]
+            index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+            series[3] = max(series[3], seconds)
+
+    def quantile(self, q: float, key: tuple) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket (capped at the max seen)."""
+        series = self._series.get(key)
+        if not series or series[2] == 0:
+            return None
+
+        rank = q * series[2]
+        cumulative = 0
+        lower = 0.0
+        for i, count in enumerate(series[0]):
+            if cumulative + count >= rank and count > 0:
+                if i == len(self.buckets):
+                    return series[3]  # Beyond the last bucket
+                upper = self.buckets[i]
+                return min(lower + (upper - lower) * (rank - cumulative) / count, series[3])
+            cumulative += count
+            if i < len(self.buckets):
+                lower = self.buckets[i]
+        return series[3]
+
+    def summary(self) -> list[dict]:
+        """p50/p95/p99, count and mean per label set."""
+        with self._lock:
+            keys = sorted(self._series)
+            return [
+                {
+                    **dict(zip(self.labelnames, key)),
+                    "count": self._series[key][2],
+                    "mean_ms": round(self._series[key][1] / self._series[key][2] * 1000, 2),
+                    **{
+                        f"p{int(q * 100)}_ms": round(self.quantile(q, key) * 1000, 2)
+                        for q in QUANTILES
+                    },
+                }
+                for key in keys
+            ]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        quantile_lines = []
+
+        with self._lock:
+            for key, (counts, total, count, _) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+
+                for q in QUANTILES:
+                    labels = _format_labels(self.labelnames, key, f'quantile="{q:g}"')
+                    quantile_lines.append(f"{self.name}_quantile{labels} {self.quantile(q, key):.6f}")
+
+        if quantile_lines:
+            lines.append(f"# HELP {self.name}_quantile Estimated quantiles of {self.name}")
+            lines.append(f"# TYPE {self.name}_quantile gauge")
+            lines.extend(quantile_lines)
+        return lines
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+STAGE_DURATION = LatencyHistogram(
+    "prism_stage_duration_seconds",
+    "Duration of workflow nodes, LLM, embedding, Chroma and BM25 calls",
+    ("stage", "domain", "intent"),
+)
+REQUEST_DURATION = LatencyHistogram(
+    "prism_request_duration_seconds",
+    "End-to-end query duration",
+    ("endpoint", "domain", "intent"),
+)
+CACHE_REQUESTS = MetricCounter(
+    "prism_cache_requests_total",
+    "Response cache lookups by result",
+    ("result",),
+)
+LLM_TOKENS = MetricCounter(
+    "prism_llm_tokens_total",
+    "LLM tokens used",
+    ("model", "type"),
+)
+LLM_CALLS = MetricCounter(
+    "prism_llm_calls_total",
+    "LLM calls by outcome",
+    ("model", "outcome"),
+)
+CIRCUIT_TRANSITIONS = MetricCounter(
+    "prism_circuit_breaker_transitions_total",
+    "Circuit breaker state transitions",
+    ("breaker", "from_state", "to_state"),
+)
+
+_REGISTRY = [STAGE_DURATION, REQUEST_DURATION, CACHE_REQUESTS, LLM_TOKENS, LLM_CALLS, CIRCUIT_TRANSITIONS]
+
+
+def render_metrics() -> str:
+    """Render all metrics in Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Spans
+# =============================================================================
+
+_span_labels: contextvars.ContextVar[dict] = contextvars.ContextVar("prism_span_labels", default={})
+
+
+@contextmanager
+def span_labels(**labels) -> Iterator[None]:
+    """Set domain/intent labels for spans recorded in this context."""
+    token = _span_labels.set({**_span_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _span_labels.reset(token)
+
+
+def current_span_labels() -> dict:
+    """Get the labels spans in this context are recorded with."""
+    return _span_labels.get()
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """Time a block and record it under stage with the current labels."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(
+            time.perf_counter() - start_time,
+            stage=stage,
+            **{**_span_labels.get(), **labels},
+        )
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """
+    Wrap a LangGraph node so it runs inside a span.
+
+    The node's span is labeled with the intent after the node ran, so
+    route_intent is attributed to the intent it chose. Nested spans see
+    the intent from the state the node received.
+    """
+    @wraps(node)
+    def wrapper(state):
+        domain = state.get("domain") or "unknown"
+        intent = state.get("intent") or "unknown"
+        start_time = time.perf_counter()
+
+        with span_labels(domain=domain, intent=intent):
+            result = node(state)
+
+        if isinstance(result, dict) and result.get("intent"):
+            intent = result["intent"]
+        STAGE_DURATION.observe(
+            time.perf_counter() - start_time, stage=name, domain=domain, intent=intent,
+        )
+        return result
+
+    return wrapper
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callback recording LLM call duration, outcome and token usage."""
+
+    def __init__(self):
+        self._runs: dict[Any, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id) -> None:
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), _span_labels.get())
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        with self._lock:
+            start_time, labels = self._runs.pop(run_id, (None, {}))
+
+        llm_output = response.llm_output or {}
+        model = llm_output.get("model_name") or "unknown"
+        usage = llm_output.get("token_usage") or {}
+
+        if start_time is not None:
+            STAGE_DURATION.observe(time.perf_counter() - start_time, stage="llm", **labels)
+        LLM_CALLS.inc(model=model, outcome="success")
+        LLM_TOKENS.inc(usage.get("prompt_tokens", 0), model=model, type="prompt")
+        LLM_TOKENS.inc(usage.get("completion_tokens", 0), model=model, type="completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        with self._lock:
+            start_time, labels = self._runs.pop(run_id, (None, {}))
+        if start_time is not None:
+            STAGE_DURATION.observe(time.perf_counter() - start_time, stage="llm", **labels)
+        LLM_CALLS.inc(model="unknown", outcome="error")
+
+
+_llm_callback = MetricsCallbackHandler()
+
+
+def get_llm_callbacks() -> list[BaseCallbackHandler]:
+    """Callbacks to attach to ChatOpenAI instances."""
+    return [_llm_callback]
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper that records an "embedding" span per call."""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with span("embedding"):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with span("embedding"):
+            return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        with span("embedding"):
+            return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        with span("embedding"):
+            return await self.embeddings.aembed_query(text)
+
+
+def get_latency_summary() -> dict:
+    """JSON view of stage and request latency percentiles."""
+    return {
+        "stages": STAGE_DURATION.summary(),
+        "requests": REQUEST_DURATION.summary(),
+    }
@@ -48,6 +48,15 @@ class CircuitBreakerState:
     threshold: int = 5  # Failures before opening
     reset_timeout: int = 60  # Seconds before trying half-open
     half_open_success_threshold: int = 2  # Successes to close from half-open
+    name: str = "default"
+
+    def _transition(self, new_state: str) -> None:
+        """Change state and count the transition."""
+        from .metrics import CIRCUIT_TRANSITIONS
+
+        if new_state != self.state:
+            CIRCUIT_TRANSITIONS.inc(breaker=self.name, from_state=self.state, to_state=new_state)
+        self.state = new_state
 
     def record_failure(self) -> None:
         """Record a failure and potentially open the circuit."""
@@ -57,10 +66,10 @@ class CircuitBreakerState:
 
         if self.state == "half-open":
             # Failed during test, reopen
-            self.state = "open"
+            self._transition("open")
             logger.warning("Circuit breaker REOPENED after half-open failure")
         elif self.failures >= self.threshold:
-            self.state = "open"
+            self._transition("open")
             logger.warning(
                 f"Circuit breaker OPENED after {self.failures} consecutive failures"
             )
@@ -70,7 +79,7 @@ class CircuitBreakerState:
         if self.state == "half-open":
             self.successes_in_half_open += 1
             if self.successes_in_half_open >= self.half_open_success_threshold:
-                self.state = "closed"
+                self._transition("closed")
                 self.failures = 0
                 self.successes_in_half_open = 0
                 logger.info("Circuit breaker CLOSED after successful recovery")
@@ -88,7 +97,7 @@ class CircuitBreakerState:
             if self.last_failure and datetime.now() - self.last_failure > timedelta(
                 seconds=self.reset_timeout
             ):
-                self.state = "half-open"
+                self._transition("half-open")
                 logger.info(
                     "Circuit breaker HALF-OPEN, allowing test request"
                 )
@@ -131,7 +140,7 @@ def get_circuit_breaker(
     """
     if name not in _circuit_breakers:
         _circuit_breakers[name] = CircuitBreakerState(
-            threshold=threshold, reset_timeout=reset_timeout
+            threshold=threshold, reset_timeout=reset_timeout, name=name
         )
         logger.info(f"Created circuit breaker '{name}' (threshold={threshold})")
     return _circuit_breakers[name]
@@ -141,7 +150,7 @@ def reset_circuit_breaker(name: str) -> bool:
     """Manually reset a circuit breaker to closed state."""
     if name in _circuit_breakers:
         cb = _circuit_breakers[name]
-        cb.state = "closed"
+        cb._transition("closed")
         cb.failures = 0
         cb.successes_in_half_open = 0
         logger.info(f"Circuit breaker '{name}' manually reset")
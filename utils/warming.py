@@ -0,0 +1,248 @@
+"""Response cache warming from real query traffic.
+
+Streams the query logs line by line, counts the most frequent
+(query, domain, prompt_name) tuples and precomputes their v2 answers into
+the response cache in the background with bounded concurrency. Runs at
+startup and again for a domain after its collection version is bumped
+(ingestion, clear), so the answers that traffic asks for most are cached
+before users ask again.
+
+Sources:
+- logs/metrics.jsonl: v2 records give query_id -> domain (errors skipped)
+- logs/queries_full.jsonl: full query text and prompt_name per query_id
+
+Contextual queries (app_context) are skipped: the full log only has the
+enhanced query text, not the app_context needed to rebuild the cache key.
+
+Usage:
+    warmer = CacheWarmer(warm_fn=warm_prism_query)
+    warmer.start()                        # on the event loop, at startup
+    warmer.request(domains={"app_education"})  # any thread, after a version bump
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WarmQuery:
+    """One (query, domain, prompt_name) tuple to precompute."""
+
+    query: str
+    domain: str
+    prompt_name: Optional[str] = None
+
+
+def _read_jsonl(path: Path, since: Optional[datetime] = None) -> Iterator[dict]:
+    """Stream records from a JSONL log, skipping bad lines and old records."""
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            if since is not None:
+                try:
+                    if datetime.fromisoformat(record.get("timestamp", "")) < since:
+                        continue
+                except (TypeError, ValueError):
+                    continue
+            yield record
+
+
+def load_top_queries(
+    top_n: int,
+    log_dir: Optional[Path] = None,
+    min_count: int = 1,
+    lookback_days: Optional[int] = None,
+    domains: Optional[set[str]] = None,
+) -> list[tuple[WarmQuery, int]]:
+    """
+    Find the most frequent v2 (query, domain, prompt_name) tuples in the logs.
+
+    Queries are grouped the way the cache normalizes them (case and
+    surrounding whitespace); the most recent spelling is kept.
+
+    Args:
+        top_n: Number of tuples to return
+        log_dir: Directory with metrics.jsonl and queries_full.jsonl
+        min_count: Ignore tuples seen fewer times than this
+        lookback_days: Only count records from the last N days
+        domains: Only count these domains
+
+    Returns:
+        (WarmQuery, count) pairs, most frequent first
+    """
+    if log_dir is None:
+        from config import get_log_dir
+        log_dir = get_log_dir()
+    since = datetime.now() - timedelta(days=lookback_days) if lookback_days else None
+
+    # Pass 1: query_id -> domain for successful v2 queries
+    query_domains: dict[str, str] = {}
+    for record in _read_jsonl(log_dir / "metrics.jsonl", since):
+        if record.get("endpoint") != "v2" or record.get("error"):
+            continue
+        domain = record.get("domain")
+        if record.get("query_id") and domain and (domains is None or domain in domains):
+            query_domains[record["query_id"]] = domain
+
+    # Pass 2: count full query text per (query, domain, prompt_name)
+    counts: Counter = Counter()
+    spellings: dict[tuple, str] = {}
+    for record in _read_jsonl(log_dir / "queries_full.jsonl", since):
+        domain = query_domains.get(record.get("query_id"))
+        query = (record.get("query_text") or "").strip()
+        if domain is None or not query or record.get("app_context_page"):
+            continue
+        key = (query.lower(), domain, record.get("prompt_name"))
+        counts[key] += 1
+        spellings[key] = query
+
+    return [
+        (WarmQuery(query=spellings[key], domain=key[1], prompt_name=key[2]), count)
+        for key, count in counts.most_common(top_n)
+        if count >= min_count
+    ]
+
+
+class CacheWarmer:
+    """
+    Background warmer for the response cache.
+
+    warm_fn computes and caches one query; it returns False when the answer
+    was already cached. At most one warming run is active: requests made
+    while a run is in progress are merged and run once it finishes.
+    """
+
+    def __init__(
+        self,
+        warm_fn: Callable[[WarmQuery], Awaitable[bool]],
+        top_n: int = 50,
+        concurrency: int = 2,
+        min_count: int = 2,
+        lookback_days: Optional[int] = 14,
+        log_dir: Optional[Path] = None,
+    ):
+        self.warm_fn = warm_fn
+        self.top_n = top_n
+        self.concurrency = max(1, concurrency)
+        self.min_count = min_count
+        self.lookback_days = lookback_days
+        self.log_dir = log_dir
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # Domains requested while a run was active (None inside = all domains)
+        self._pending: Optional[set] = None
+        self._pending_all = False
+
+        # Stats
+        self.runs = 0
+        self.warmed = 0
+        self.already_cached = 0
+        self.failed = 0
+        self.last_run: Optional[dict] = None
+
+    def start(self, domains: Optional[set[str]] = None) -> None:
+        """Schedule a warming run on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._schedule(domains)
+
+    def request(self, domains: Optional[set[str]] = None) -> None:
+        """Schedule a warming run from any thread (no-op before start())."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._schedule, domains)
+
+    def _schedule(self, domains: Optional[set[str]]) -> None:
+        if self._task is not None and not self._task.done():
+            if domains is None:
+                self._pending_all = True
+            else:
+                self._pending = (self._pending or set()) | set(domains)
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(domains))
+
+    async def _run(self, domains: Optional[set[str]]) -> None:
+        while True:
+            try:
+                await self.warm(domains)
+            except Exception as e:
+                logger.warning(f"Cache warming failed: {e}")
+
+            if self._pending_all:
+                domains = None
+            elif self._pending:
+                domains = self._pending
+            else:
+                return
+            self._pending, self._pending_all = None, False
+
+    async def warm(self, domains: Optional[set[str]] = None) -> dict:
+        """Warm the top queries (optionally only some domains) and return run stats."""
+        start_time = time.time()
+        queries = await asyncio.to_thread(
+            load_top_queries,
+            self.top_n,
+            log_dir=self.log_dir,
+            min_count=self.min_count,
+            lookback_days=self.lookback_days,
+            domains=domains,
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = {"warmed": 0, "already_cached": 0, "failed": 0}
+
+        async def warm_one(item: WarmQuery) -> None:
+            async with semaphore:
+                try:
+                    computed = await self.warm_fn(item)
+                except Exception as e:
+                    results["failed"] += 1
+                    logger.debug(f"Cache warming failed for {item.query[:50]!r}: {e}")
+                    return
+                results["warmed" if computed else "already_cached"] += 1
+
+        await asyncio.gather(*(warm_one(item) for item, _ in queries))
+
+        self.runs += 1
+        self.warmed += results["warmed"]
+        self.already_cached += results["already_cached"]
+        self.failed += results["failed"]
+        self.last_run = {
+            "domains": sorted(domains) if domains is not None else "all",
+            "candidates": len(queries),
+            **results,
+            "duration_s": round(time.time() - start_time, 2),
+            "finished_at": datetime.now().isoformat(),
+        }
+        logger.info(
+            f"Cache warming: {results['warmed']} warmed, {results['already_cached']} "
+            f"already cached, {results['failed']} failed of {len(queries)} top queries"
+        )
+        return self.last_run
+
+    def stats(self) -> dict:
+        """Get warming statistics."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "runs": self.runs,
+            "warmed": self.warmed,
+            "already_cached": self.already_cached,
+            "failed": self.failed,
+            "last_run": self.last_run,
+        }